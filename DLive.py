@@ -2,133 +2,337 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import time
 from datetime import datetime, timedelta
 import random
+import os
+import threading
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configuration de la page
-st.set_page_config(
-    page_title="Skyrock Live - Dashboard Audience Temps Réel",
-    page_icon="📻",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# CSS personnalisé avec les couleurs Skyrock
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.8rem;
-        background: linear-gradient(45deg, #FF6B00, #FF8C00, #FFA500);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-align: center;
-        margin-bottom: 1rem;
-        font-weight: bold;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-    }
-    .live-badge {
-        background: linear-gradient(45deg, #FF6B00, #FF8C00);
-        color: white;
-        padding: 0.3rem 1rem;
-        border-radius: 20px;
-        font-weight: bold;
-        display: inline-block;
-        animation: pulse 2s infinite;
-    }
-    @keyframes pulse {
-        0% { transform: scale(1); }
-        50% { transform: scale(1.05); }
-        100% { transform: scale(1); }
-    }
-    .metric-card {
-        background: rgba(255, 107, 0, 0.1);
-        padding: 1.2rem;
-        border-radius: 15px;
-        border-left: 5px solid #FF6B00;
-        margin: 0.5rem 0;
-        backdrop-filter: blur(10px);
-    }
-    .section-header {
-        color: #FF6B00;
-        border-bottom: 3px solid #FF6B00;
-        padding-bottom: 0.5rem;
-        margin-top: 2rem;
-        font-weight: bold;
-        font-size: 1.5rem;
-    }
-    .skyrock-gradient {
-        background: linear-gradient(135deg, #FF6B00, #FF8C00);
-        color: white;
-        padding: 1rem;
-        border-radius: 10px;
-        text-align: center;
-    }
-</style>
-""", unsafe_allow_html=True)
+from batch_render import begin_rerun, escape_fields, render_section, render_stats_panel
+from social_feed import FeedSimulator, SocialFeedStore
+from stream_logs import LogSimulator, StreamLogCollector, sources_from_env
+from health_probe import HealthProber, StandInFleet, parse_targets
+from schedule import ProgramSchedule, load_weekly_grid
+from top_tracks import PlayoutSimulator, TopTracksEngine
+from stations import REGION_LISTENERS, StationEngine, hour_volatility, live_hour_profile
+from replay import ReplayDay, ReplayEngine
+from shared_state import SharedLiveState
+from metrics_api import MetricsAPI
+from startup import lazy_callable, lazy_import
+from assets import get_assets, inject_styles
+from alert_rules import SEVERITIES, AlertEngine, load_alert_rules
+from telemetry import BUILD_SECONDS, REGISTRY, RENDER_SECONDS, RERUNS, gauge, get_metrics_server
+from live_chart import iso_times, stream_chart
+from sessions import get_session_summary
+from reach import ReachFeed, ReachTracker, wall_seconds
+from render_planner import RenderPlan, get_figure_pool, render_timings_panel
+import figures
+
+# Plotly n'est chargé qu'au premier graphique
+go = lazy_import('plotly.graph_objects')
+make_subplots = lazy_callable('plotly.subplots', 'make_subplots')
+
+# Débit du simulateur de flux social (messages par minute)
+FEED_RATE_PER_MINUTE = 30
+# Pas de l'état live (secondes) : producteur du processus, ou publieur de l'état partagé entre workers
+LIVE_INTERVAL = float(os.environ.get('SKYROCK_SHARED_INTERVAL', 1))
+
+def configure_page():
+    """Configuration de la page et CSS (uniquement quand le script est lancé par Streamlit)"""
+    # Configuration de la page
+    st.set_page_config(
+        page_title="Skyrock Live - Dashboard Audience Temps Réel",
+        page_icon="📻",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # CSS personnalisé avec les couleurs Skyrock (assets/live.css, servi par Streamlit sous app/static/)
+    inject_styles('live.css')
+
+@st.cache_resource
+def get_social_feed():
+    """Flux social partagé entre les sessions, alimenté par le simulateur local"""
+    store = SocialFeedStore(capacity=5000)
+    simulator = FeedSimulator(store, rate_per_minute=FEED_RATE_PER_MINUTE)
+    simulator.seed()
+    return store, simulator.start()
+
+@st.cache_resource
+def get_top_tracks_engine():
+    """Classement des titres partagé, alimenté par le journal de diffusion (simulé ici)"""
+    engine = TopTracksEngine(capacity=10000)
+    playout = PlayoutSimulator(engine)
+    playout.backfill(days=7)
+    return engine, playout
+
+@st.cache_resource
+def get_stream_collector():
+    """Collecteur des journaux des serveurs de stream (SKYROCK_STREAM_LOGS), sinon flotte simulée"""
+    if os.environ.get('SKYROCK_STREAM_LOGS'):
+        return StreamLogCollector(sources_from_env(os.environ['SKYROCK_STREAM_LOGS']),
+                                  state_path=os.environ.get('SKYROCK_STREAM_STATE'))
+    simulator = LogSimulator(n_servers=20).start()
+    return StreamLogCollector(simulator.sources)
+
+@st.cache_resource
+def get_health_prober():
+    """Sondes de santé de la flotte (SKYROCK_HEALTH_TARGETS), sinon serveurs locaux de démonstration"""
+    if os.environ.get('SKYROCK_HEALTH_TARGETS'):
+        targets = parse_targets(os.environ['SKYROCK_HEALTH_TARGETS'])
+    else:
+        targets = StandInFleet(n_servers=20, refused=1, hanging=1).start_in_thread().targets
+    return HealthProber(targets).start_in_thread()
+
+@st.cache_resource
+def get_alert_engine():
+    """Règles d'alerte du processus (SKYROCK_ALERT_RULES, sinon règles par défaut), compilées une fois :
+    taux, maintiens et historique des transitions survivent aux reruns"""
+    return AlertEngine.from_rules(load_alert_rules(os.environ.get('SKYROCK_ALERT_RULES')), list(REGION_LISTENERS))
+
+@st.cache_resource
+def get_reach_tracker():
+    """Audience cumulée (HyperLogLog) partagée, alimentée par le flux d'événements d'écoute :
+    7 jours rattrapés au démarrage, puis le flux live"""
+    tracker = ReachTracker()
+    schedule = ProgramSchedule(load_weekly_grid(os.environ.get('SKYROCK_PROGRAMME')))
+    ReachFeed(tracker, schedule, REGION_LISTENERS).start()
+    return tracker
+
+@st.cache_resource
+def get_replay():
+    """Rejeu d'une journée enregistrée (SKYROCK_REPLAY, vitesse SKYROCK_REPLAY_SPEED), partagé entre sessions"""
+    if not os.environ.get('SKYROCK_REPLAY'):
+        return None
+    day = ReplayDay.load(os.environ['SKYROCK_REPLAY'])
+    return ReplayEngine(day, SkyrockLiveDashboard(), speed=float(os.environ.get('SKYROCK_REPLAY_SPEED', 60)))
+
+@st.cache_resource
+def get_shared_state():
+    """État live partagé entre workers Streamlit (SKYROCK_SHARED_STATE), None en mode mono-processus"""
+    if not os.environ.get('SKYROCK_SHARED_STATE'):
+        return None
+    return SharedLiveState(os.environ['SKYROCK_SHARED_STATE'])
+
+@st.cache_resource
+def get_live_source():
+    """Producteur de l'état live du processus (le tableau de bord du rejeu s'il est configuré) :
+    moteur multi-stations, grille et agrégats survivent aux reruns, qui n'en lisent qu'une copie"""
+    replay = get_replay()
+    source = replay.dashboard if replay is not None else SkyrockLiveDashboard()
+    # Avec l'état partagé, c'est le publieur de l'écrivain élu qui l'avance
+    if get_shared_state() is None:
+        source.start(LIVE_INTERVAL)
+    return source
+
+def load_live_state(dashboard, timeout=5.0):
+    """Charge l'état live persisté dans un tableau de bord lecteur : état partagé entre workers
+    (SKYROCK_SHARED_STATE), sinon producteur du processus ; False si rien n'est encore publié"""
+    shared = get_shared_state()
+    if shared is None:
+        dashboard.follow(get_live_source())
+        return True
+    shared.ensure_writer(get_live_source, LIVE_INTERVAL)
+    deadline = time.monotonic() + timeout
+    while not shared.apply(dashboard):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+class LiveStateReader:
+    """Lecteur de longue durée de l'état live persisté (endpoint /metrics, API JSON) : rechargé à la demande
+    depuis l'état partagé (shared) ou le producteur du processus (source), sans attendre un rerun"""
+
+    def __init__(self, source=None, shared=None):
+        if source is None and shared is None:
+            raise ValueError("source (producteur du processus) ou shared (état partagé) requis")
+        self.source = source
+        self.shared = shared
+        self.dashboard = SkyrockLiveDashboard(simulate=False)
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Recharge l'état s'il a avancé ; False tant que rien n'est publié"""
+        if self.shared is None:
+            self.dashboard.follow(self.source)
+            return True
+        return self.shared.apply(self.dashboard) or self.dashboard.version is not None
+
+    def exposition_samples(self):
+        """KPI live de l'état persisté au moment de la collecte (rien tant qu'il n'est pas publié)"""
+        with self.lock:
+            if not self.refresh():
+                return []
+            return self.dashboard.exposition_samples()
+
+@st.cache_resource
+def get_live_reader():
+    """Lecteur de l'état live du processus observé par /metrics"""
+    shared = get_shared_state()
+    return LiveStateReader(get_live_source() if shared is None else None, shared)
+
+@st.cache_resource
+def get_metrics_api():
+    """API JSON du processus (SKYROCK_API_PORT) sur l'état live persisté, None si non configurée ;
+    avec l'état partagé, les workers se partagent le port et servent la même publication"""
+    if not os.environ.get('SKYROCK_API_PORT'):
+        return None
+    shared = get_shared_state()
+    api = MetricsAPI(get_live_source() if shared is None else None, shared)
+    api.start_in_thread(os.environ.get('SKYROCK_API_HOST', '127.0.0.1'), int(os.environ['SKYROCK_API_PORT']),
+                        reuse_port=shared is not None)
+    return api
 
 class SkyrockLiveDashboard:
-    def __init__(self):
+    def __init__(self, simulate=True):
         self.current_time = datetime.now()
-        self.initialize_data()
+        # Rejeu historique qui alimente ce tableau de bord (None : simulation live)
+        self.replay = None
+        # Heure simulée et vitesse reçues du producteur quand il rejoue une journée
+        self.virtual_now = None
+        self.replay_speed = None
+        # Le producteur avance sous ce verrou ; les lecteurs en copient l'état
+        self.lock = threading.Lock()
+        # Moteur d'alerte partagé par les reruns du processus
+        self.alerts = get_alert_engine()
+        self.technical = None
+        if simulate:
+            with BUILD_SECONDS.labels('live_initial_state').time():
+                self.initialize_data()
+        else:
+            # Lecteur (un par rerun) : état chargé par load_live_state
+            self.version = None
+            self.historical_data = None
+            self.schedule = ProgramSchedule(load_weekly_grid(os.environ.get('SKYROCK_PROGRAMME')))
         
     def initialize_data(self):
         """Initialise les données de base"""
         # Données historiques récentes (dernières 48h)
         self.historical_data = self.generate_historical_data()
         
+        # Version de l'état live (incrémentée à chaque mise à jour)
+        self.version = 0
+        self.updated_at = datetime.now()
+        
         # Données en temps réel
         self.live_data = {
             'current_listeners': 2850000,
             'peak_today': 3120000,
-            'trend': 'up',
-            'mobile_listeners': 65,
-            'car_listeners': 22,
-            'home_listeners': 13
+            'trend': 'up'
         }
+        # Supports d'écoute du créneau, d'après les sessions reconstruites (sessions.py)
+        self.sync_device_mix(datetime.now())
+        
+        # Grille des programmes et agrégats par créneau (alimentés par record_live_point uniquement)
+        self.schedule = ProgramSchedule(load_weekly_grid(os.environ.get('SKYROCK_PROGRAMME')))
         
         # Programme actuel
-        self.current_show = {
-            'name': 'Le 6-9 avec Ali',
-            'host': 'Ali',
-            'start_time': '06:00',
-            'end_time': '09:00',
-            'listeners': 2850000,
-            'engagement': 78
-        }
+        slot = self.schedule.current()
+        if slot is not None:
+            self.current_show = self.show_from_slot(slot, 2850000, 78)
+        else:
+            self.current_show = {
+                'name': 'Le 6-9 avec Ali',
+                'host': 'Ali',
+                'start_time': '06:00',
+                'end_time': '09:00',
+                'listeners': 2850000,
+                'engagement': 78
+            }
         
-        # Top titres en cours
-        self.top_tracks = [
-            {'artist': 'Gazo', 'title': 'MAMI WATA', 'plays': 42, 'trend': 'up'},
-            {'artist': 'Ninho', 'title': 'DÉSOLÉ', 'plays': 38, 'trend': 'stable'},
-            {'artist': 'Tiakola', 'title': 'PAS BÊTE', 'plays': 35, 'trend': 'up'},
-            {'artist': 'SDM', 'title': 'BÉNÉFICE', 'plays': 32, 'trend': 'down'},
-            {'artist': 'Fresh', 'title': 'CELINE 3X', 'plays': 29, 'trend': 'up'}
-        ]
+        # Top titres en cours (fenêtre glissante de 24h sur le journal de diffusion)
+        self.top_tracks = self.refresh_top_tracks()
         
         # Données géographiques
-        self.geo_data = {
-            'Île-de-France': 850000,
-            'Auvergne-Rhône-Alpes': 420000,
-            'Provence-Alpes-Côte d\'Azur': 380000,
-            'Occitanie': 320000,
-            'Hauts-de-France': 280000,
-            'Nouvelle-Aquitaine': 250000,
-            'Grand Est': 220000,
-            'Normandie': 180000,
-            'Pays de la Loire': 160000,
-            'Bretagne': 140000,
-            'Bourgogne-Franche-Comté': 120000,
-            'Centre-Val de Loire': 110000,
-            'Corse': 40000,
-            'Outre-Mer': 90000
+        self.geo_data = dict(REGION_LISTENERS)
+        
+        # Radios concurrentes : auditeurs par région simulés ensemble, classement live
+        self.stations = StationEngine.for_radios(self.geo_data, self.live_data['current_listeners'])
+        self.live_data['current_listeners'] = int(self.stations.total('Skyrock'))
+        self.sync_station_state()
+
+    def now(self):
+        """Heure du tableau de bord (heure simulée pendant un rejeu)"""
+        if self.replay is not None:
+            return self.replay.virtual_now()
+        return self.virtual_now or datetime.now()
+
+    def advance(self):
+        """Mise à jour des données live (ou avancée du rejeu jusqu'à l'heure simulée)"""
+        if self.replay is not None:
+            self.replay.catch_up()
+        else:
+            self.update_live_data()
+
+    def start(self, interval=1.0):
+        """Producteur du processus : avance l'état live toutes les interval secondes, dans un thread"""
+        def run():
+            ticks = threading.Event()
+            while not ticks.wait(interval):
+                with self.lock:
+                    self.advance()
+
+        threading.Thread(target=run, daemon=True).start()
+        return self
+
+    def follow(self, source):
+        """Copie l'état du producteur du processus (rien à faire s'il n'a pas avancé depuis la dernière copie)"""
+        if source.version == self.version:
+            return
+        with source.lock:
+            state = source.snapshot()
+            series = source.historical_data
+        self.apply_snapshot(state, series)
+
+    def apply_snapshot(self, state, series=None):
+        """Charge un état live (snapshot() du producteur ou état partagé) ; series : série live, si remplacée"""
+        self.live_data = state['live_data']
+        self.geo_data = state['geo_data']
+        self.current_show = state['current_show']
+        self.top_tracks = state['top_tracks']
+        self.ranking = state['ranking']
+        self.show_stats = state['show_stats']
+        self.version = state['version']
+        self.updated_at = datetime.fromisoformat(state['updated_at'])
+        self.virtual_now = datetime.fromisoformat(state['virtual_now']) if state['virtual_now'] else None
+        self.replay_speed = state['replay_speed']
+        if series is not None:
+            self.historical_data = series
+
+    def sync_station_state(self):
+        """Reporte l'état de Skyrock (régions, rang) et le classement depuis le moteur multi-stations"""
+        self.live_data['rank'] = self.stations.rank_of('Skyrock')
+        self.live_data['rank_change'] = self.stations.rank_change('Skyrock')
+        self.geo_data = self.stations.region_listeners('Skyrock')
+        self.ranking = self.stations.ranking(10)
+
+    def sync_device_mix(self, moment):
+        """Répartition mobile / voiture / domicile (%) du créneau horaire de moment"""
+        mix = get_session_summary().device_mix(moment.hour)
+        self.live_data['car_listeners'] = round(mix['car'])
+        self.live_data['home_listeners'] = round(mix['home'])
+        self.live_data['mobile_listeners'] = 100 - self.live_data['car_listeners'] - self.live_data['home_listeners']
+
+    def show_from_slot(self, slot, listeners, engagement):
+        """Émission courante à partir d'un créneau de la grille"""
+        return {
+            'name': slot['name'],
+            'host': slot['host'],
+            'start_time': slot['start'],
+            'end_time': slot['end'],
+            'listeners': listeners,
+            'engagement': engagement
         }
 
+    def refresh_top_tracks(self):
+        """Intègre les diffusions récentes et retourne le top 5 des dernières 24h"""
+        engine, playout = get_top_tracks_engine()
+        playout.run_until()
+        return engine.top(5, window='day')
+
     def generate_historical_data(self):
         """Génère des données historiques pour les dernières 48 heures"""
         end_time = datetime.now()
@@ -138,18 +342,10 @@ class SkyrockLiveDashboard:
         current_time = start_time
         
         while current_time <= end_time:
-            # Variation circadienne réaliste
+            # Variation circadienne réaliste (profil horaire partagé avec le générateur d'événements)
             hour = current_time.hour
-            if 6 <= hour <= 9:  # Morning show
-                base_listeners = 2800000 + random.randint(-100000, 200000)
-            elif 16 <= hour <= 19:  # Afternoon/evening
-                base_listeners = 2600000 + random.randint(-150000, 150000)
-            elif 20 <= hour <= 23:  # Prime time
-                base_listeners = 3000000 + random.randint(-200000, 300000)
-            elif 0 <= hour <= 5:  # Night
-                base_listeners = 1200000 + random.randint(-200000, 300000)
-            else:  # Day time
-                base_listeners = 2200000 + random.randint(-150000, 150000)
+            base, low, high = live_hour_profile(hour)
+            base_listeners = base + random.randint(low, high)
             
             # Bruit aléatoire
             listeners = max(base_listeners + random.randint(-50000, 50000), 500000)
@@ -169,35 +365,26 @@ class SkyrockLiveDashboard:
     def update_live_data(self):
         """Met à jour les données en temps réel avec des variations réalistes"""
         # Variation basée sur l'heure actuelle
-        current_hour = datetime.now().hour
-        
-        # Facteur saisonnier basé sur l'heure
-        if 6 <= current_hour <= 9:  # Morning peak
-            base_factor = 1.0
-            volatility = 0.1
-        elif 16 <= current_hour <= 19:  # Evening commute
-            base_factor = 0.9
-            volatility = 0.08
-        elif 20 <= current_hour <= 23:  # Prime time
-            base_factor = 1.1
-            volatility = 0.12
-        elif 0 <= current_hour <= 5:  # Night
-            base_factor = 0.5
-            volatility = 0.15
-        else:  # Day time
-            base_factor = 0.8
-            volatility = 0.06
-        
-        # Mise à jour des auditeurs
-        current_listeners = self.live_data['current_listeners']
-        change = random.randint(-int(current_listeners * volatility), int(current_listeners * volatility))
-        new_listeners = max(int(current_listeners * base_factor + change), 500000)
-        
-        self.live_data['current_listeners'] = new_listeners
+        now = datetime.now()
+        current_hour = now.hour
+        
+        # Un pas vectorisé pour toutes les radios et régions (audience cible selon le profil horaire)
+        self.stations.step(current_hour, hour_volatility(current_hour))
+        self.sync_station_state()
+        
+        # Classement des titres
+        self.top_tracks = self.refresh_top_tracks()
+        
+        self.record_live_point(now, int(self.stations.total('Skyrock')))
+
+    def record_live_point(self, moment, listeners, engagement=None):
+        """Étapes communes à la simulation et au rejeu : pic, tendance, émission, agrégats"""
+        change = listeners - self.live_data['current_listeners']
+        self.live_data['current_listeners'] = listeners
         
         # Mise à jour du pic
-        if new_listeners > self.live_data['peak_today']:
-            self.live_data['peak_today'] = new_listeners
+        if listeners > self.live_data['peak_today']:
+            self.live_data['peak_today'] = listeners
         
         # Mise à jour de la tendance
         if change > 0:
@@ -207,31 +394,129 @@ class SkyrockLiveDashboard:
         else:
             self.live_data['trend'] = 'stable'
         
-        # Mise à jour des données géographiques (légères variations)
-        for region in self.geo_data:
-            current = self.geo_data[region]
-            variation = random.randint(-int(current * 0.05), int(current * 0.05))
-            self.geo_data[region] = max(current + variation, 10000)
-        
-        # Mise à jour du programme si nécessaire
-        current_hour_minute = datetime.now().strftime('%H:%M')
-        if current_hour_minute >= '09:00' and self.current_show['name'] == 'Le 6-9 avec Ali':
-            self.current_show = {
-                'name': 'Skyrock Non Stop',
-                'host': 'Playlist Automatisée',
-                'start_time': '09:00',
-                'end_time': '12:00',
-                'listeners': new_listeners,
-                'engagement': random.randint(60, 75)
-            }
+        # Mise à jour du programme d'après la grille hebdomadaire
+        slot = self.schedule.current(moment)
+        if slot is not None and (slot['name'], slot['start']) != (self.current_show['name'], self.current_show['start_time']):
+            self.current_show = self.show_from_slot(slot, listeners, random.randint(60, 75))
+        self.current_show['listeners'] = listeners
+        if engagement is not None:
+            self.current_show['engagement'] = engagement
+        
+        # Agrégats par émission, mis à jour au fil de la série live
+        self.schedule.observe(moment, listeners, self.current_show['engagement'])
+        self.sync_device_mix(moment)
+        
+        # Série servie (graphiques, API, état partagé) : un point toutes les 5 minutes sur 48h glissantes ;
+        # remplacée plutôt que modifiée, les lecteurs gardent la version qu'ils ont copiée
+        series = self.historical_data
+        if moment - series['timestamp'].iloc[-1] >= timedelta(minutes=5):
+            point = pd.DataFrame([{
+                'timestamp': moment,
+                'listeners': listeners,
+                'hour': moment.hour,
+                'mobile_percent': self.live_data['mobile_listeners'],
+                'engagement': self.current_show['engagement']
+            }])
+            series = pd.concat([series, point], ignore_index=True)
+            self.historical_data = series[series['timestamp'] > moment - timedelta(hours=48)].reset_index(drop=True)
+        
+        self.version += 1
+        self.updated_at = datetime.now()
+
+    def snapshot(self):
+        """État live sérialisable en JSON (publication, API, lecteurs du processus)"""
+        virtual_now = self.now() if self.replay is not None else self.virtual_now
+        return {
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat(timespec='seconds'),
+            # Heure simulée d'un rejeu : les lecteurs n'ont pas le moteur de rejeu
+            'virtual_now': virtual_now.isoformat() if virtual_now is not None else None,
+            'replay_speed': self.replay.speed if self.replay is not None else None,
+            'live_data': dict(self.live_data),
+            'current_show': dict(self.current_show),
+            'top_tracks': [dict(track) for track in self.top_tracks],
+            'geo_data': dict(self.geo_data),
+            'ranking': [dict(entry) for entry in self.ranking],
+            # Agrégats du créneau en cours : les lecteurs n'ont que la grille
+            'show_stats': self.schedule.show_stats(virtual_now or datetime.now())
+        }
+
+    def alert_metrics(self, technical, health):
+        """Métriques live et techniques d'un tick, sous les noms utilisés par les règles d'alerte"""
+        loads = [server['load'] for server in technical['servers'].values() if server['online']]
+        metrics = {
+            'listeners': self.live_data['current_listeners'],
+            'peak_today': self.live_data['peak_today'],
+            'mobile_percent': self.live_data['mobile_listeners'],
+            'rank': self.live_data['rank'],
+            'engagement': self.current_show['engagement'],
+            'latency_p95_ms': technical['p95_ms'],
+            'stream_quality': technical['quality'],
+            'bandwidth_mbps': technical['bandwidth_mbps'],
+            'server_load': max(loads, default=0.0),
+            'servers_online': health['online'],
+            'servers_offline': health['total'] - health['online']
+        }
+        metrics.update({f"region:{region}": listeners for region, listeners in self.geo_data.items()})
+        return metrics
+
+    def evaluate_alerts(self):
+        """Métriques techniques du rerun et évaluation des règles une fois par mise à jour de l'état live"""
+        collector = get_stream_collector()
+        collector.poll()
+        self.technical = (collector.panel_metrics(), get_health_prober().table.summary())
+        # Version et heure de mise à jour : un nouveau tableau de bord par rerun repart de la même version
+        self.alerts.evaluate_tick((self.version, self.updated_at), self.alert_metrics(*self.technical), self.now())
+
+    def display_alerts(self):
+        """Alertes en cours (une carte par règle déclenchée) et historique des transitions"""
+        active = self.alerts.active_alerts()
+        icons = {'critical': '🔴', 'warning': '🟡', 'info': '🔵'}
+        if active:
+            render_section('active_alerts', 'alert_card', [escape_fields({
+                'icon': icons[alert['severity']],
+                'name': alert['name'] + (f" — {alert['label']}" if alert['label'] else ''),
+                'value': f"{alert['value']:,.1f}".replace(',', ' '),
+                'since': alert['at'].strftime('%H:%M:%S')
+            }) for alert in active], header='<h3 class="section-header">🚨 ALERTES</h3>')
+        with st.expander(f"🚨 Alertes : {len(active)} active(s) — {len(self.alerts.compiled)} règles évaluées"):
+            if not self.alerts.events:
+                st.caption("Aucune transition depuis le démarrage")
+            for event in reversed(self.alerts.events):
+                state = "déclenchée" if event['state'] == 'firing' else "résolue"
+                label = f" ({event['label']})" if event['label'] else ''
+                st.caption(f"{event['at'].strftime('%H:%M:%S')} {icons[event['severity']]} {event['name']}{label} "
+                           f"{state} — {event['value']:,.1f}")
+
+    def exposition_samples(self):
+        """KPI live exposés sur /metrics (lus au moment de la collecte)"""
+        alerts = self.alerts.active_alerts()
+        return [
+            gauge('skyrock_live_listeners', "Auditeurs actuels", [({}, self.live_data['current_listeners'])]),
+            gauge('skyrock_live_peak_listeners', "Pic d'auditeurs du jour", [({}, self.live_data['peak_today'])]),
+            gauge('skyrock_live_device_share_percent', "Répartition des auditeurs par support (%)", [
+                ({'device': device}, self.live_data[f'{device}_listeners']) for device in ('mobile', 'car', 'home')
+            ]),
+            gauge('skyrock_live_engagement_percent', "Engagement de l'émission en cours (%)",
+                  [({'show': self.current_show['name']}, self.current_show['engagement'])]),
+            gauge('skyrock_live_rank', "Classement live parmi les radios suivies", [({}, self.live_data['rank'])]),
+            gauge('skyrock_live_region_listeners', "Auditeurs par région", [
+                ({'region': region}, listeners) for region, listeners in self.geo_data.items()
+            ]),
+            gauge('skyrock_live_state_version', "Version de l'état live", [({}, self.version)]),
+            gauge('skyrock_alerts_active', "Alertes actives par sévérité", [
+                ({'severity': severity}, sum(1 for alert in alerts if alert['severity'] == severity))
+                for severity in SEVERITIES
+            ])
+        ]
 
     def display_live_header(self):
         """Affiche l'en-tête en temps réel"""
         col1, col2, col3 = st.columns([1, 2, 1])
         
         with col1:
-            st.image("https://upload.wikimedia.org/wikipedia/fr/thumb/6/6b/Skyrock_logo.svg/1200px-Skyrock_logo.svg.png", 
-                    width=150)
+            # Logo du bundle local : nom à empreinte, chargé une fois par le navigateur puis servi par son cache
+            st.markdown(get_assets().image('skyrock_logo.svg', 150), unsafe_allow_html=True)
         
         with col2:
             st.markdown('<h1 class="main-header">SKYROCK LIVE</h1>', unsafe_allow_html=True)
@@ -239,9 +524,11 @@ class SkyrockLiveDashboard:
                        unsafe_allow_html=True)
         
         with col3:
-            current_time = datetime.now().strftime('%H:%M:%S')
-            st.markdown(f"**🕐 {current_time}**")
-            st.markdown(f"**📅 {datetime.now().strftime('%d/%m/%Y')}**")
+            now = self.now()
+            st.markdown(f"**🕐 {now.strftime('%H:%M:%S')}**")
+            st.markdown(f"**📅 {now.strftime('%d/%m/%Y')}**")
+            if self.replay_speed is not None:
+                st.caption(f"⏪ Rejeu ×{self.replay_speed:g}")
 
     def display_live_metrics(self):
         """Affiche les métriques en temps réel"""
@@ -279,17 +566,20 @@ class SkyrockLiveDashboard:
             )
         
         with col5:
-            # Estimation du classement en temps réel
-            rank = random.randint(2, 4)  # Skyrock généralement 2ème-4ème
+            # Classement en temps réel parmi les radios suivies
+            rank = self.live_data['rank']
+            rank_change = self.live_data['rank_change']
             st.metric(
                 label="CLASSEMENT LIVE",
-                value=f"{rank}ème",
-                delta=f"{random.randint(-1, 1):+}" if random.random() > 0.7 else None
+                value="1er" if rank == 1 else f"{rank}ème",
+                delta=f"{rank_change:+}" if rank_change else None
             )
 
     def create_live_charts(self):
         """Crée les graphiques en temps réel"""
         tab1, tab2, tab3 = st.tabs(["📈 Évolution Temps Réel", "🗺️ Audience Géographique", "🎵 Programme Actuel"])
+        # Figures des onglets collectées puis construites ensemble (workers), émises dans l'ordre de la page
+        self.plan = RenderPlan('live', get_figure_pool())
         
         with tab1:
             self.create_realtime_chart()
@@ -299,22 +589,30 @@ class SkyrockLiveDashboard:
         
         with tab3:
             self.create_current_show_dashboard()
+        
+        self.plan.render()
 
-    def create_realtime_chart(self):
-        """Graphique d'évolution en temps réel"""
-        # Données des dernières 6 heures
-        six_hours_ago = datetime.now() - timedelta(hours=6)
-        recent_data = self.historical_data[self.historical_data['timestamp'] >= six_hours_ago].copy()
+    def realtime_frame(self):
+        """Points des 6 dernières heures et point actuel"""
+        now = self.now()
+        six_hours_ago = now - timedelta(hours=6)
+        timestamps = self.historical_data['timestamp']
+        recent_data = self.historical_data[(timestamps >= six_hours_ago) & (timestamps <= now)].copy()
         
         # Ajouter le point actuel
         current_point = {
-            'timestamp': datetime.now(),
+            'timestamp': now,
             'listeners': self.live_data['current_listeners'],
-            'hour': datetime.now().hour,
+            'hour': now.hour,
             'mobile_percent': self.live_data['mobile_listeners'],
             'engagement': self.current_show['engagement']
         }
-        recent_data = pd.concat([recent_data, pd.DataFrame([current_point])], ignore_index=True)
+        return pd.concat([recent_data, pd.DataFrame([current_point])], ignore_index=True)
+
+    def build_realtime_figure(self, recent_data):
+        """Figure complète (premier rendu ou reconnexion) ; ensuite le navigateur ne reçoit que les nouveaux points"""
+        # Listes plutôt que tableaux numpy : le navigateur y ajoute les points suivants (extendTraces)
+        x = iso_times(recent_data['timestamp'])
         
         # Créer le graphique
         fig = make_subplots(
@@ -327,8 +625,8 @@ class SkyrockLiveDashboard:
         # Graphique des auditeurs
         fig.add_trace(
             go.Scatter(
-                x=recent_data['timestamp'],
-                y=recent_data['listeners'],
+                x=x,
+                y=recent_data['listeners'].tolist(),
                 mode='lines+markers',
                 name='Auditeurs',
                 line=dict(color='#FF6B00', width=3),
@@ -340,8 +638,8 @@ class SkyrockLiveDashboard:
         # Graphique d'engagement
         fig.add_trace(
             go.Scatter(
-                x=recent_data['timestamp'],
-                y=recent_data['engagement'],
+                x=x,
+                y=recent_data['engagement'].tolist(),
                 mode='lines',
                 name='Engagement',
                 line=dict(color='#00C851', width=2),
@@ -361,7 +659,13 @@ class SkyrockLiveDashboard:
         fig.update_yaxes(title_text="Auditeurs", row=1, col=1)
         fig.update_yaxes(title_text="Engagement (%)", range=[50, 100], row=2, col=1)
         
-        st.plotly_chart(fig, use_container_width=True)
+        return fig
+
+    def create_realtime_chart(self):
+        """Graphique d'évolution en temps réel (figure gardée par le navigateur, nouveaux points seulement)"""
+        now = self.now()
+        stream_chart('realtime_chart', self.realtime_frame(), ['listeners', 'engagement'],
+                     self.build_realtime_figure, (now - timedelta(hours=6), now), height=500)
 
     def create_geographic_chart(self):
         """Carte de l'audience géographique"""
@@ -376,35 +680,22 @@ class SkyrockLiveDashboard:
             }
             
             df_regions = pd.DataFrame(regions_data)
+            self.plan.chart(figures.region_bubbles, df_regions, get_assets().url('regions.geojson'))
+            if 'Outre-Mer' in self.geo_data:
+                st.caption(f"Outre-Mer (hors carte) : {self.geo_data['Outre-Mer']:,} auditeurs")
             
-            # Carte choroplèthe (simplifiée)
-            fig = px.choropleth(
-                df_regions,
-                geojson=None,  # Normalement on utiliserait un GeoJSON de la France
-                locations='Région',
-                color='Auditeurs',
-                hover_name='Région',
-                hover_data={'Auditeurs': True, 'Part (%)': True},
-                color_continuous_scale='Oranges',
-                title="Audience par Région"
-            )
-            
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            st.subheader("👥 Audience Cumulée par Région")
+            self.display_reach_table(list(self.geo_data), 'regions', "Région")
         
         with col2:
             st.subheader("🏆 Top 5 Régions")
             top_regions = sorted(self.geo_data.items(), key=lambda x: x[1], reverse=True)[:5]
+            total = sum(self.geo_data.values())
             
-            for i, (region, count) in enumerate(top_regions, 1):
-                percentage = (count / sum(self.geo_data.values())) * 100
-                st.markdown(f"""
-                <div class="metric-card">
-                    <h4>#{i} {region}</h4>
-                    <h3>{count:,}</h3>
-                    <p>{percentage:.1f}% du total</p>
-                </div>
-                """, unsafe_allow_html=True)
+            render_section('geo_top_regions', 'region_card', [
+                {'rank': i, 'region': region, 'count': f"{count:,}", 'percentage': f"{(count / total) * 100:.1f}"}
+                for i, (region, count) in enumerate(top_regions, 1)
+            ])
             
             # Répartition par type d'écoute
             st.subheader("📱 Support d'Écoute")
@@ -413,14 +704,7 @@ class SkyrockLiveDashboard:
                 'Voiture': self.live_data['car_listeners'],
                 'Domicile': self.live_data['home_listeners']
             }
-            
-            fig_pie = px.pie(
-                values=list(listen_types.values()),
-                names=list(listen_types.keys()),
-                color_discrete_sequence=['#FF6B00', '#FF8C00', '#FFA500']
-            )
-            fig_pie.update_layout(height=250)
-            st.plotly_chart(fig_pie, use_container_width=True)
+            self.plan.chart(figures.device_pie, listen_types)
 
     def create_current_show_dashboard(self):
         """Dashboard de l'émission en cours"""
@@ -436,39 +720,42 @@ class SkyrockLiveDashboard:
             </div>
             """, unsafe_allow_html=True)
             
-            # Graphique d'engagement de l'émission
-            engagement_data = []
-            show_start = datetime.now().replace(hour=int(self.current_show['start_time'].split(':')[0]), 
-                                              minute=0, second=0, microsecond=0)
+            now = self.now()
+            upcoming = self.schedule.upcoming(now)
+            st.caption(f"À suivre : {upcoming['name']} ({upcoming['day']} {upcoming['start']})")
             
-            for i in range(12):  # 12 segments de 15 minutes
-                time_point = show_start + timedelta(minutes=i*15)
-                engagement = random.randint(65, 85)
-                engagement_data.append({'time': time_point, 'engagement': engagement})
+            # Engagement moyen par segment de 15 minutes, toutes diffusions du créneau
+            stats = self.show_stats
+            if stats is None or not stats['segments']:
+                st.info("Pas encore de mesures pour cette émission")
+                return
             
-            df_engagement = pd.DataFrame(engagement_data)
+            show_start = datetime.fromisoformat(stats['airing_start'])
+            df_engagement = pd.DataFrame(stats['segments']).assign(
+                time=lambda df: show_start + pd.to_timedelta(df['minute'], unit='m'),
+                engagement=lambda df: df['avg_engagement']
+            )
             
-            fig = px.area(df_engagement, x='time', y='engagement',
-                         title="Engagement pendant l'émission",
-                         labels={'engagement': 'Taux d\'Engagement (%)', 'time': 'Heure'})
+            comparison = stats['comparison']
+            if comparison and comparison['current'] and comparison['previous']:
+                delta = comparison['current']['avg_listeners'] - comparison['previous']['avg_listeners']
+                st.metric("Moyenne vs diffusion précédente",
+                          f"{comparison['current']['avg_listeners']:,.0f}".replace(',', ' '),
+                          delta=f"{delta:+,.0f}".replace(',', ' '))
             
-            fig.update_traces(fillcolor='rgba(255, 107, 0, 0.3)', line_color='#FF6B00')
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            self.plan.chart(figures.show_engagement, df_engagement)
         
         with col2:
             st.subheader("🎵 TOP 5 EN COURS")
             
+            tracks = []
             for i, track in enumerate(self.top_tracks[:5], 1):
                 trend_icon = "🔺" if track['trend'] == 'up' else "🔻" if track['trend'] == 'down' else "➡️"
-                st.markdown(f"""
-                <div style="background: rgba(255,107,0,0.1); padding: 0.8rem; border-radius: 10px; margin: 0.5rem 0;">
-                    <strong>#{i} {trend_icon}</strong><br>
-                    <strong>{track['artist']}</strong><br>
-                    <small>{track['title']}</small><br>
-                    <small>📻 {track['plays']} diffusions</small>
-                </div>
-                """, unsafe_allow_html=True)
+                tracks.append({
+                    'rank': i, 'trend_icon': trend_icon, 'artist': track['artist'],
+                    'title': track['title'], 'plays': track['plays']
+                })
+            render_section('top_tracks', 'track_card', tracks)
             
             # Statistiques sociales
             st.subheader("📱 ACTIVITÉ SOCIALE")
@@ -481,109 +768,112 @@ class SkyrockLiveDashboard:
             
             for platform, count in social_metrics.items():
                 st.metric(label=platform, value=count)
+        
+        st.subheader("👥 Audience Cumulée par Émission")
+        shows = list(dict.fromkeys(slot['name'] for slot in self.schedule.index.slots))
+        self.display_reach_table(shows, 'shows', "Émission")
+
+    def display_reach_table(self, names, kind, label):
+        """Tableau des auditeurs distincts du jour et des 7 derniers jours (estimation HyperLogLog)"""
+        tracker = get_reach_tracker()
+        table = tracker.reach_table(names, kind, wall_seconds(self.now()))
+        table = table.sort_values('week', ascending=False).rename(
+            columns={'name': label, 'day': "Aujourd'hui", 'week': "7 jours"})
+        st.dataframe(table.round(0).astype({"Aujourd'hui": int, "7 jours": int}), hide_index=True,
+                     use_container_width=True)
+        st.caption(f"Auditeurs distincts estimés (HyperLogLog, erreur type "
+                   f"{tracker.memory_report()['standard_error']:.1%}) sur {tracker.events:,} événements d'écoute")
 
+    @st.fragment
     def create_social_feed(self):
-        """Flux social en temps réel"""
+        """Flux social en temps réel (fragment : un like ne relance que le flux)"""
         st.markdown('<h3 class="section-header">💬 FLUX SOCIAL LIVE</h3>', unsafe_allow_html=True)
         
-        # Messages simulés
-        messages = [
-            {"user": "Sarah_23", "message": "🔥🔥 Gazo qui passe en boucle sur Skyrock ! #MamiWata", "time": "2 min", "likes": 42},
-            {"user": "Mike_THE_GOAT", "message": "Le 6-9 avec Ali c'est le meilleur réveil 🎧", "time": "4 min", "likes": 38},
-            {"user": "LéaFromParis", "message": "Qui écoute Skyrock en cours ? 🙋‍♀️", "time": "7 min", "likes": 29},
-            {"user": "RapAddict", "message": "SDM qui cartonne en ce moment sur Skyrock 💯", "time": "12 min", "likes": 51},
-            {"user": "SkyrockFan93", "message": "Le son de Tiakola passe trop en ce moment !", "time": "15 min", "likes": 33}
-        ]
-        
-        # Ajouter un nouveau message aléatoire
-        if random.random() > 0.7:
-            new_users = ["Mathis_75", "Clara_Love", "RapEnForce", "Skyrock4Ever", "UrbanMusic"]
-            new_messages = [
-                "Skyrock meilleure radio sans discussion 🎯",
-                "Ali trop drôle ce matin 😂",
-                "Qui va au concert de Ninho ?",
-                "Skyrock devrait passer plus de Fresh !",
-                "Le mix de ce matin est incroyable 🎧"
-            ]
-            
-            messages.insert(0, {
-                "user": random.choice(new_users),
-                "message": random.choice(new_messages),
-                "time": "Maintenant",
-                "likes": random.randint(10, 50)
-            })
-        
-        # Afficher le flux
-        for msg in messages[:8]:  # Afficher les 8 premiers messages
-            with st.container():
-                col1, col2 = st.columns([4, 1])
-                
-                with col1:
-                    st.markdown(f"""
-                    **{msg['user']}** · {msg['time']}  
-                    {msg['message']}  
-                    ❤️ {msg['likes']}
-                    """)
-                
-                with col2:
-                    if st.button("❤️", key=msg['user']):
-                        msg['likes'] += 1
-                        st.rerun()
-                
-                st.markdown("---")
+        store, _ = get_social_feed()
+        per_page = 8
+        page = st.number_input("Page", min_value=1, max_value=store.page_count(per_page), value=1,
+                               key='feed_page', label_visibility='collapsed') - 1
+        messages = store.page(page, per_page)
+        
+        # Afficher le flux en un seul bloc (avant : conteneur, 2 colonnes, message, bouton et séparateur par message)
+        render_section('social_feed', 'feed_message', [escape_fields(msg) for msg in messages])
+        
+        # Un seul widget pour les likes, clé sur l'identifiant du message
+        def like_message():
+            message_id = st.session_state.get('feed_like')
+            if message_id is not None:
+                store.like(message_id)
+                st.session_state['feed_like'] = None
+        
+        users = {msg['id']: msg['user'] for msg in messages}
+        st.pills("J'aime", options=list(users), format_func=lambda message_id: f"❤️ {users[message_id]}",
+                 key='feed_like', on_change=like_message, label_visibility='collapsed')
+        st.caption(f"{len(store):,} messages · {store.total_likes:,} likes".replace(',', ' '))
 
     def create_technical_monitoring(self):
         """Monitoring technique en temps réel"""
         st.markdown('<h3 class="section-header">⚙️ MONITORING TECHNIQUE</h3>', unsafe_allow_html=True)
         
+        # Métriques relevées pour l'évaluation des alertes de ce rerun
+        metrics, health = self.technical
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            # Qualité du stream
-            stream_quality = random.randint(95, 100)
+            # Qualité du stream (part des requêtes sans erreur 5xx)
+            stream_quality = metrics['quality']
             st.metric(
                 label="QUALITÉ STREAM",
-                value=f"{stream_quality}%",
+                value=f"{stream_quality:.1f}%",
                 delta=None
             )
-            st.progress(stream_quality / 100)
+            st.progress(min(1.0, stream_quality / 100))
         
         with col2:
-            # Latence
-            latency = random.randint(50, 200)
-            status = "🟢 Bon" if latency < 100 else "🟡 Moyen" if latency < 150 else "🔴 Élevé"
-            st.metric(
-                label="LATENCE MOYENNE",
-                value=f"{latency}ms",
-                delta=status
-            )
+            # Latence (percentiles sur les 5 dernières minutes)
+            latency = metrics['p95_ms']
+            if latency is None:
+                st.metric(label="LATENCE P95", value="—", delta=None)
+            else:
+                # Statut d'après les seuils des règles de latence
+                status = {None: "🟢 Bon", 'info': "🟢 Bon", 'warning': "🟡 Moyen", 'critical': "🔴 Élevé"}[
+                    self.alerts.status('latency_p95_ms', latency)]
+                st.metric(
+                    label="LATENCE P95",
+                    value=f"{latency:.0f}ms",
+                    delta=status
+                )
+                st.caption(f"p50 {metrics['p50_ms']:.0f} ms · p99 {metrics['p99_ms']:.0f} ms")
         
         with col3:
-            # Serveurs
-            servers_online = random.randint(18, 20)
+            # Serveurs (table d'état alimentée par les sondes de santé)
             st.metric(
                 label="SERVEURS ONLINE",
-                value=f"{servers_online}/20",
+                value=f"{health['online']}/{health['total']}",
                 delta=None
             )
+            if health['median_latency_ms'] is not None:
+                st.caption(f"Sonde médiane {health['median_latency_ms']:.0f} ms")
         
         with col4:
             # Bandwidth
-            bandwidth = random.randint(800, 1200)
             st.metric(
                 label="BANDE PASSANTE",
-                value=f"{bandwidth} Mbps",
+                value=f"{metrics['bandwidth_mbps']:.1f} Mbps",
                 delta=None
             )
         
-        # Graphique de charge serveur
-        server_load = [random.randint(40, 90) for _ in range(10)]
+        # Graphique de charge serveur (serveur le plus chargé)
+        loads = [server['load'] for server in metrics['servers'].values() if server['online']]
+        server_load = max(loads, default=0.0)
+        previous_load = st.session_state.get('previous_server_load', server_load)
+        st.session_state.previous_server_load = server_load
         fig = go.Figure(go.Indicator(
             mode = "gauge+number+delta",
-            value = server_load[-1],
+            value = server_load,
             domain = {'x': [0, 1], 'y': [0, 1]},
             title = {'text': "CHARGE SERVEUR"},
-            delta = {'reference': server_load[-2]},
+            delta = {'reference': previous_load},
             gauge = {
                 'axis': {'range': [None, 100]},
                 'bar': {'color': "#FF6B00"},
@@ -595,7 +885,7 @@ class SkyrockLiveDashboard:
                 'threshold': {
                     'line': {'color': "red", 'width': 4},
                     'thickness': 0.75,
-                    'value': 90
+                    'value': self.alerts.threshold('charge_serveur')
                 }
             }
         ))
@@ -604,27 +894,49 @@ class SkyrockLiveDashboard:
 
     def run_dashboard(self):
         """Exécute le dashboard en temps réel"""
-        # Mise à jour des données live
-        self.update_live_data()
+        begin_rerun()
+        # Endpoint /metrics du processus ; KPI relus sur l'état persisté à chaque collecte
+        get_metrics_server()
+        REGISTRY.watch('live', get_live_reader())
+        RERUNS.labels('live').inc()
+        
+        # Lecture de l'état persisté : publié par le worker élu écrivain, ou avancé par le producteur du processus
+        with BUILD_SECONDS.labels('live_update').time():
+            if not load_live_state(self):
+                st.info("État live partagé pas encore publié : nouvel essai dans une seconde")
+                time.sleep(1)
+                st.rerun()
+        get_metrics_api()
+        
+        # Règles d'alerte sur l'état de ce tick
+        with RENDER_SECONDS.labels('live', 'alert_rules').time():
+            self.evaluate_alerts()
         
         # Header
-        self.display_live_header()
+        with RENDER_SECONDS.labels('live', 'header').time():
+            self.display_live_header()
         
         # Métriques principales
-        self.display_live_metrics()
+        with RENDER_SECONDS.labels('live', 'metrics').time():
+            self.display_live_metrics()
+            self.display_alerts()
         
         # Graphiques principaux
-        self.create_live_charts()
+        with RENDER_SECONDS.labels('live', 'charts').time():
+            self.create_live_charts()
         
         # Sections supplémentaires
         col1, col2 = st.columns([2, 1])
         
-        with col1:
+        with col1, RENDER_SECONDS.labels('live', 'social_feed').time():
             self.create_social_feed()
         
-        with col2:
+        with col2, RENDER_SECONDS.labels('live', 'technical').time():
             self.create_technical_monitoring()
         
+        render_stats_panel()
+        render_timings_panel()
+        
         # Auto-refresh
         st.markdown("---")
         refresh_rate = st.slider("Fréquence de rafraîchissement (secondes)", 5, 60, 30)
@@ -632,11 +944,20 @@ class SkyrockLiveDashboard:
         if st.button("🔄 Rafraîchir Maintenant"):
             st.rerun()
         
-        # Simulation de mise à jour automatique
-        time.sleep(refresh_rate)
-        st.rerun()
+        # Simulation de mise à jour automatique, sans bloquer les fragments (likes du flux)
+        st.session_state.setdefault('last_refresh', time.time())
+        
+        @st.fragment(run_every=1)
+        def auto_refresh():
+            if time.time() - st.session_state['last_refresh'] >= refresh_rate:
+                st.session_state['last_refresh'] = time.time()
+                st.rerun()
+        
+        auto_refresh()
 
 # Lancement du dashboard
 if __name__ == "__main__":
-    dashboard = SkyrockLiveDashboard()
+    configure_page()
+    # Un lecteur par rerun ; l'état (et le rejeu éventuel) reste dans le producteur du processus
+    dashboard = SkyrockLiveDashboard(simulate=False)
     dashboard.run_dashboard()
\ No newline at end of file
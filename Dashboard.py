@@ -2,121 +2,108 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
+import os
+import zlib
 import warnings
 warnings.filterwarnings('ignore')
 
-# Configuration de la page
-st.set_page_config(
-    page_title="Dashboard Audience Radio - Skyrock",
-    page_icon="📻",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# CSS personnalisé
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #FF6B00;
-        text-align: center;
-        margin-bottom: 2rem;
-        background: linear-gradient(45deg, #FF6B00, #FF8C00);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-weight: bold;
-    }
-    .metric-card {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 4px solid #FF6B00;
-        margin: 0.5rem 0;
-    }
-    .section-header {
-        color: #FF6B00;
-        border-bottom: 2px solid #FF6B00;
-        padding-bottom: 0.5rem;
-        margin-top: 2rem;
-        font-weight: bold;
-    }
-    .skyrock-color {
-        color: #FF6B00;
-        font-weight: bold;
-    }
-</style>
-""", unsafe_allow_html=True)
+from assets import inject_styles
+from audience_matrix import AudienceMatrix
+from competition import CompetitiveMatrices
+from decomposition import DecompositionPool
+from sessions import DEVICES, get_session_summary
+import figures
+from batch_render import begin_rerun, render_section, render_stats_panel
+from render_planner import RenderPlan, get_figure_pool, render_timings_panel
+from stations import CATEGORIES, RADIOS
+from startup import WARM_DIR, SharedCache, WarmSnapshot, frame_fingerprint, source_fingerprint
+from telemetry import BUILD_SECONDS, RENDER_SECONDS, RERUNS, cache_lookup, get_metrics_server
+from what_if import COVID_SHOCKS, Shock, WhatIfEngine
+
+AGE_GROUPS = ['13-17', '18-24', '25-34', '35-49', '50-64', '65+']
+TIME_SLOTS = ['6h-9h', '9h-12h', '12h-14h', '14h-17h', '17h-20h', '20h-24h', '0h-6h']
+SECTIONS = ["📈 Évolution Temporelle", "🔍 Analyse Comparative", "👥 Analyse Démographique", "💡 Recommandations",
+            "🧪 Simulation What-If"]
+
+
+def warm_fingerprint():
+    """Empreinte du code qui construit le jeu de données (validité de l'instantané de démarrage)"""
+    import stations
+    import what_if
+    return source_fingerprint(__file__, stations.__file__, what_if.__file__)
+
+@st.cache_resource
+def get_decomposition_pool():
+    """Workers de décomposition partagés par les sessions (lancés au premier lot assez grand)"""
+    return DecompositionPool()
+
+@st.cache_resource
+def get_shared_datasets():
+    """Jeux dérivés coûteux partagés par les sessions et les reruns, par empreinte du jeu de données"""
+    return SharedCache()
+
+def configure_page():
+    """Configuration de la page et CSS (uniquement quand le script est lancé par Streamlit)"""
+    # Configuration de la page
+    st.set_page_config(
+        page_title="Dashboard Audience Radio - Skyrock",
+        page_icon="📻",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # CSS personnalisé (assets/audience.css, servi par Streamlit sous app/static/)
+    inject_styles('audience.css')
 
 class RadioAudienceDashboard:
-    def __init__(self):
-        self.df = self.load_data()
-        self.radios = ['Skyrock', 'NRJ', 'Fun Radio', 'RTL', 'Europe 1', 'France Inter', 'RMC', 'Virgin Radio']
+    def __init__(self, warm=True, engine=None):
+        # Instantané construit au déploiement (python startup.py --build), sinon construction complète ;
+        # engine : panel d'un autre ensemble de stations (export, mesures), jamais lu dans l'instantané
+        snapshot = None
+        if warm and engine is None:
+            snapshot = WarmSnapshot.open(os.path.join(WARM_DIR, 'audience'), warm_fingerprint())
+        cache_lookup('warm_snapshot', snapshot is not None)
+        if snapshot is not None:
+            self.df = snapshot.frame('df')
+        else:
+            with BUILD_SECONDS.labels('audience_dataset').time():
+                self.df = self.load_data(engine)
+        self.radios = list(RADIOS) if engine is None else list(engine.stations)
+        # Version du jeu de données : les matrices dérivées sont reconstruites quand elle change
+        self.dataset_version = 0
+        self._matrices_version = None
+        self._aggregates_version = None
+        self._competition_version = None
+        self._decomposition_version = None
+        self._fingerprint_version = None
+        self.extra_age_groups = {}
+        if snapshot is not None:
+            self.aggregates = {name: snapshot.frame(name) for name in self.AGGREGATES}
+            self._aggregates_version = self.dataset_version
+
+    # Agrégats précalculés (et inclus dans l'instantané de démarrage)
+    AGGREGATES = ['monthly_avg', 'yearly_avg', 'market_share_avg', 'correlation_matrix']
         
-    def load_data(self):
+    def load_data(self, engine=None):
         """Charge les données d'audience des radios"""
-        # Génération de données simulées réalistes pour 2015-2024
-        np.random.seed(42)
-        
-        dates = pd.date_range('2015-01-01', '2024-12-31', freq='M')
-        radios = ['Skyrock', 'NRJ', 'Fun Radio', 'RTL', 'Europe 1', 'France Inter', 'RMC', 'Virgin Radio']
-        
-        data = []
-        
-        for date in dates:
-            for radio in radios:
-                # Audience de base différente pour chaque radio
-                base_audience = {
-                    'Skyrock': 3.2, 'NRJ': 4.1, 'Fun Radio': 2.8, 'RTL': 3.9,
-                    'Europe 1': 2.5, 'France Inter': 4.3, 'RMC': 2.9, 'Virgin Radio': 2.7
-                }[radio]
-                
-                # Tendances spécifiques par radio
-                trend = {
-                    'Skyrock': -0.02,  # Légère baisse
-                    'NRJ': 0.01,       # Stabilité
-                    'Fun Radio': -0.01, # Légère baisse
-                    'RTL': 0.005,      # Très légère hausse
-                    'Europe 1': -0.015,# Légère baisse
-                    'France Inter': 0.02, # Hausse
-                    'RMC': 0.01,       # Légère hausse
-                    'Virgin Radio': 0.005 # Stabilité
-                }[radio]
-                
-                # Saisonnalité (variation mensuelle)
-                month_effect = np.sin(2 * np.pi * date.month / 12) * 0.1
-                
-                # Effet COVID (baisse en 2020, reprise progressive)
-                covid_effect = 0
-                if date.year == 2020:
-                    covid_effect = -0.3 + (date.month / 12) * 0.2
-                elif date.year == 2021:
-                    covid_effect = -0.1 + (date.month / 12) * 0.1
-                
-                # Calcul de l'audience
-                years_from_start = (date.year - 2015) + (date.month - 1) / 12
-                audience = base_audience * (1 + trend * years_from_start + month_effect + covid_effect)
-                
-                # Bruit aléatoire
-                audience += np.random.normal(0, 0.05)
-                
-                # Parts de marché (calculées proportionnellement)
-                data.append({
-                    'date': date,
-                    'radio': radio,
-                    'audience_millions': max(audience, 0.1),  # Éviter les valeurs négatives
-                    'annee': date.year,
-                    'mois': date.month,
-                    'trimestre': f"T{((date.month-1)//3)+1}-{date.year}",
-                    'categorie': 'Musique' if radio in ['Skyrock', 'NRJ', 'Fun Radio', 'Virgin Radio'] else 'Généraliste'
-                })
-        
-        df = pd.DataFrame(data)
+        # Génération de données simulées réalistes pour 2015-2024 (paramètres de référence du moteur what-if :
+        # tendance par radio, saisonnalité, effet COVID, bruit)
+        if engine is None:
+            engine = WhatIfEngine.for_dataset(pd.date_range('2015-01-01', '2024-12-31', freq='M'), RADIOS)
+        dates, radios = engine.dates, engine.stations
+        audience = engine.panel()
+        
+        # Une ligne par mois et par radio
+        df = pd.DataFrame({
+            'date': np.repeat(dates, len(radios)),
+            'radio': np.tile(np.array(radios, dtype=object), len(dates)),
+            'audience_millions': audience.T.ravel()
+        })
+        df['annee'] = df['date'].dt.year.astype(np.int64)
+        df['mois'] = df['date'].dt.month.astype(np.int64)
+        df['trimestre'] = 'T' + ((df['mois'] - 1) // 3 + 1).astype(str) + '-' + df['annee'].astype(str)
+        df['categorie'] = df['radio'].map(CATEGORIES)
         
         # Calcul des parts de marché par mois
         monthly_totals = df.groupby('date')['audience_millions'].transform('sum')
@@ -124,71 +111,177 @@ class RadioAudienceDashboard:
         
         return df
     
-    def generate_demographic_data(self):
-        """Génère des données démographiques simulées"""
-        demographics = []
-        age_groups = ['13-17', '18-24', '25-34', '35-49', '50-64', '65+']
-        
-        for radio in self.radios:
-            # Profils d'audience différents selon les radios
-            if radio == 'Skyrock':
-                profile = [0.35, 0.40, 0.15, 0.07, 0.02, 0.01]  # Très jeune
-            elif radio in ['NRJ', 'Fun Radio', 'Virgin Radio']:
-                profile = [0.15, 0.35, 0.25, 0.15, 0.07, 0.03]  # Jeune
-            elif radio == 'France Inter':
-                profile = [0.02, 0.08, 0.15, 0.25, 0.30, 0.20]  # Âgé
-            else:  # Généralistes
-                profile = [0.05, 0.15, 0.20, 0.25, 0.20, 0.15]  # Mixte
-            
-            for age_group, share in zip(age_groups, profile):
-                demographics.append({
-                    'radio': radio,
-                    'tranche_age': age_group,
-                    'part_audience': share * 100,
-                    'audience_absolue': share * np.random.uniform(1, 3)  # en millions
-                })
+    def get_audience_matrices(self):
+        """Matrices démographiques et horaires, construites une fois par jeu de données pour tout le processus
+        (le tableau de bord est recréé à chaque rerun)"""
+        hit = self._matrices_version == self.dataset_version
+        if not hit:
+            def build():
+                with BUILD_SECONDS.labels('audience_matrices').time():
+                    self.demographic_matrix = AudienceMatrix(
+                        'radio', 'tranche_age', AGE_GROUPS + list(self.extra_age_groups),
+                        ['part_audience', 'audience_absolue']
+                    )
+                    self.time_slot_matrix = AudienceMatrix(
+                        'radio', 'creneau_horaire', TIME_SLOTS, ['part_audience', 'audience_relative']
+                    )
+                    for radio in self.radios:
+                        self.add_radio_profile(radio)
+                return self.demographic_matrix, self.time_slot_matrix
+            if self.extra_age_groups:
+                # Tranches ajoutées à cette instance : matrices propres, hors du cache du processus
+                build()
+            else:
+                key = ('audience_matrices', self.dataset_fingerprint(), self.dataset_version)
+                (self.demographic_matrix, self.time_slot_matrix), hit = get_shared_datasets().get(key, build)
+            self._matrices_version = self.dataset_version
+        cache_lookup('audience_matrices', hit)
         
-        return pd.DataFrame(demographics)
+        return self.demographic_matrix, self.time_slot_matrix
+
+    def get_aggregates(self):
+        """Agrégats des graphiques d'évolution et de corrélation, une fois par jeu de données pour tout le processus
+        (lus dans l'instantané de démarrage s'il existe)"""
+        hit = self._aggregates_version == self.dataset_version
+        if not hit:
+            def build():
+                with BUILD_SECONDS.labels('aggregates').time():
+                    pivot_data = self.df.pivot_table(index='date', columns='radio', values='audience_millions')
+                    return {
+                        'monthly_avg': self.df.groupby(['date', 'radio'])['audience_millions'].mean().reset_index(),
+                        'yearly_avg': self.df.groupby(['annee', 'radio'])['audience_millions'].mean().reset_index(),
+                        'market_share_avg': self.df.groupby(['annee', 'radio'])['part_marche_pourcent'].mean().reset_index(),
+                        'correlation_matrix': pivot_data.corr()
+                    }
+            self.aggregates, hit = get_shared_datasets().get(('aggregates', self.dataset_fingerprint()), build)
+            self._aggregates_version = self.dataset_version
+        cache_lookup('aggregates', hit)
+        
+        return self.aggregates
+
+    def get_competition(self):
+        """Matrices de croissance et de rang (radio × mois, radio × année), un passage par jeu de données
+        pour tout le processus (le tableau de bord est recréé à chaque rerun)"""
+        hit = self._competition_version == self.dataset_version
+        if not hit:
+            def build():
+                with BUILD_SECONDS.labels('competition').time():
+                    return CompetitiveMatrices(self.df, self.radios)
+            self.competition, hit = get_shared_datasets().get(('competition', self.dataset_fingerprint()), build)
+            self._competition_version = self.dataset_version
+        cache_lookup('competition', hit)
+        
+        return self.competition
+
+    def dataset_fingerprint(self):
+        """Empreinte du jeu de données (clé des caches du processus), recalculée quand sa version change"""
+        if self._fingerprint_version != self.dataset_version:
+            self._fingerprint = frame_fingerprint(self.df[['date', 'radio', 'audience_millions']], self.radios)
+            self._fingerprint_version = self.dataset_version
+        return self._fingerprint
+
+    def get_decomposition(self):
+        """Tendance, saisonnalité et résidu de l'audience mensuelle de chaque radio, une fois par jeu de données
+        pour tout le processus (le tableau de bord est recréé à chaque rerun)"""
+        hit = self._decomposition_version == self.dataset_version
+        if not hit:
+            def build():
+                with BUILD_SECONDS.labels('decomposition').time():
+                    monthly = self.get_competition().frame('monthly_audience')
+                    return get_decomposition_pool().decompose_frame(monthly, 12, 'multiplicative')
+            self.decomposition, hit = get_shared_datasets().get(('decomposition', self.dataset_fingerprint()), build)
+            self._decomposition_version = self.dataset_version
+        cache_lookup('decomposition', hit)
+        
+        return self.decomposition
+
+    def warm_state(self):
+        """Jeux de données à sérialiser dans l'instantané de démarrage"""
+        return {'df': self.df, **self.get_aggregates()}
+
+    def _radio_rng(self, radio, salt):
+        """Générateur aléatoire stable par radio et par version des données"""
+        return np.random.default_rng([self.dataset_version, zlib.crc32(radio.encode('utf-8')), salt])
+
+    def demographic_profile(self, radio):
+        """Profil d'âge d'une radio"""
+        # Profils d'audience différents selon les radios
+        if radio == 'Skyrock':
+            profile = [0.35, 0.40, 0.15, 0.07, 0.02, 0.01]  # Très jeune
+        elif radio in ['NRJ', 'Fun Radio', 'Virgin Radio']:
+            profile = [0.15, 0.35, 0.25, 0.15, 0.07, 0.03]  # Jeune
+        elif radio == 'France Inter':
+            profile = [0.02, 0.08, 0.15, 0.25, 0.30, 0.20]  # Âgé
+        else:  # Généralistes
+            profile = [0.05, 0.15, 0.20, 0.25, 0.20, 0.15]  # Mixte
+        
+        # Tranches ajoutées après coup
+        return profile + [shares.get(radio, 0.0) for shares in self.extra_age_groups.values()]
+
+    def time_slot_pattern(self, radio):
+        """Répartition horaire d'une radio"""
+        # Patterns différents selon les radios
+        if radio == 'Skyrock':
+            return [0.12, 0.08, 0.10, 0.09, 0.15, 0.35, 0.11]  # Forte audience soir/nuit
+        elif radio in ['NRJ', 'Fun Radio']:
+            return [0.20, 0.15, 0.12, 0.13, 0.18, 0.18, 0.04]  # Audience matin/soir
+        else:
+            return [0.25, 0.18, 0.12, 0.15, 0.20, 0.08, 0.02]  # Audience journée
+
+    def add_radio_profile(self, radio):
+        """Ajoute (ou recalcule) la ligne d'une radio dans les deux matrices"""
+        demographic, time_slots = self.demographic_matrix, self.time_slot_matrix
+        
+        profile = np.array(self.demographic_profile(radio))
+        demographic.set_row(
+            radio,
+            part_audience=profile * 100,
+            audience_absolue=profile * self._radio_rng(radio, 0).uniform(1, 3, len(profile))  # en millions
+        )
+        
+        pattern = np.array(self.time_slot_pattern(radio))
+        time_slots.set_row(
+            radio,
+            part_audience=pattern * 100,
+            audience_relative=pattern * self._radio_rng(radio, 1).uniform(0.8, 1.2, len(pattern))
+        )
+
+    def add_age_group(self, age_group, shares):
+        """Ajoute une tranche d'âge ; shares donne la part (0-1) de chaque radio"""
+        demographic, _ = self.get_audience_matrices()
+        if not self.extra_age_groups:
+            # Matrices partagées par le processus : la colonne est ajoutée à une copie propre à cette instance
+            demographic = self.demographic_matrix = demographic.copy()
+        self.extra_age_groups[age_group] = shares
+        
+        # Même tirage que lors d'une reconstruction complète (dernier élément de la ligne)
+        n_groups = len(demographic.columns) + 1
+        share = np.array([shares.get(radio, 0.0) for radio in demographic.rows])
+        draws = np.array([self._radio_rng(radio, 0).uniform(1, 3, n_groups)[-1] for radio in demographic.rows])
+        demographic.add_column(age_group, part_audience=share * 100, audience_absolue=share * draws)
+
+    def generate_demographic_data(self):
+        """Données démographiques au format long (vue sur la matrice)"""
+        return self.get_audience_matrices()[0].long_frame()
     
     def generate_time_slot_data(self):
-        """Génère des données par créneau horaire"""
-        time_slots = ['6h-9h', '9h-12h', '12h-14h', '14h-17h', '17h-20h', '20h-24h', '0h-6h']
-        data = []
-        
-        for radio in self.radios:
-            # Patterns différents selon les radios
-            if radio == 'Skyrock':
-                pattern = [0.12, 0.08, 0.10, 0.09, 0.15, 0.35, 0.11]  # Forte audience soir/nuit
-            elif radio in ['NRJ', 'Fun Radio']:
-                pattern = [0.20, 0.15, 0.12, 0.13, 0.18, 0.18, 0.04]  # Audience matin/soir
-            else:
-                pattern = [0.25, 0.18, 0.12, 0.15, 0.20, 0.08, 0.02]  # Audience journée
-            
-            for time_slot, share in zip(time_slots, pattern):
-                data.append({
-                    'radio': radio,
-                    'creneau_horaire': time_slot,
-                    'part_audience': share * 100,
-                    'audience_relative': share * np.random.uniform(0.8, 1.2)
-                })
-        
-        return pd.DataFrame(data)
+        """Données par créneau horaire au format long (vue sur la matrice)"""
+        return self.get_audience_matrices()[1].long_frame()
     
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
         st.markdown('<h1 class="main-header">📻 Dashboard Audience Radio - Analyse Skyrock</h1>', 
                    unsafe_allow_html=True)
         
-        # Métriques principales pour Skyrock (année courante)
+        # Métriques principales pour Skyrock (année courante), lues dans les matrices annuelles
         current_year = 2024
-        skyrock_data = self.df[(self.df['radio'] == 'Skyrock') & (self.df['annee'] == current_year)]
-        previous_year_data = self.df[(self.df['radio'] == 'Skyrock') & (self.df['annee'] == current_year-1)]
+        competition = self.get_competition()
         
-        avg_audience = skyrock_data['audience_millions'].mean()
-        avg_market_share = skyrock_data['part_marche_pourcent'].mean()
+        avg_audience = competition.value(competition.yearly_audience, 'Skyrock', current_year)
+        avg_market_share = competition.value(competition.yearly_share, 'Skyrock', current_year)
         
-        prev_avg_audience = previous_year_data['audience_millions'].mean()
-        prev_avg_market_share = previous_year_data['part_marche_pourcent'].mean()
+        prev_avg_audience = competition.value(competition.yearly_audience, 'Skyrock', current_year-1)
+        prev_avg_market_share = competition.value(competition.yearly_share, 'Skyrock', current_year-1)
         
         col1, col2, col3, col4, col5 = st.columns(5)
         
@@ -208,17 +301,17 @@ class RadioAudienceDashboard:
         
         with col3:
             # Position dans le classement
-            current_rank = self.get_radio_ranking(current_year).index('Skyrock') + 1
-            previous_rank = self.get_radio_ranking(current_year-1).index('Skyrock') + 1
+            current_rank = competition.rank('Skyrock', current_year)
+            previous_rank = competition.rank('Skyrock', current_year-1)
             st.metric(
                 label="Classement Skyrock",
-                value=f"{current_rank}ème/8",
+                value=f"{current_rank}ème/{len(self.radios)}",
                 delta=f"{(previous_rank - current_rank):+d}" if previous_rank != current_rank else None
             )
         
         with col4:
             # Audience maximale
-            max_audience = skyrock_data['audience_millions'].max()
+            max_audience = competition.value(competition.yearly_max, 'Skyrock', current_year)
             st.metric(
                 label="Audience Max Skyrock",
                 value=f"{max_audience:.2f}M"
@@ -234,21 +327,21 @@ class RadioAudienceDashboard:
 
     def get_radio_ranking(self, year):
         """Retourne le classement des radios pour une année donnée"""
-        year_data = self.df[self.df['annee'] == year]
-        avg_audience = year_data.groupby('radio')['audience_millions'].mean()
-        return avg_audience.sort_values(ascending=False).index.tolist()
+        return self.get_competition().ranking(year)
 
     def create_evolution_charts(self):
         """Crée les graphiques d'évolution temporelle"""
         st.markdown('<h3 class="section-header">📈 Évolution de l\'Audience</h3>', 
                    unsafe_allow_html=True)
         
-        # Préparation des données agrégées
-        monthly_avg = self.df.groupby(['date', 'radio'])['audience_millions'].mean().reset_index()
-        yearly_avg = self.df.groupby(['annee', 'radio'])['audience_millions'].mean().reset_index()
-        market_share_avg = self.df.groupby(['annee', 'radio'])['part_marche_pourcent'].mean().reset_index()
+        # Données agrégées (précalculées)
+        aggregates = self.get_aggregates()
+        monthly_avg = aggregates['monthly_avg']
+        yearly_avg = aggregates['yearly_avg']
+        market_share_avg = aggregates['market_share_avg']
         
-        tab1, tab2, tab3 = st.tabs(["Évolution Mensuelle", "Évolution Annuelle", "Parts de Marché"])
+        tab1, tab2, tab3, tab4 = st.tabs(["Évolution Mensuelle", "Évolution Annuelle", "Parts de Marché",
+                                          "Tendance & Saisonnalité"])
         
         with tab1:
             col1, col2 = st.columns([3, 1])
@@ -264,13 +357,7 @@ class RadioAudienceDashboard:
                 
                 filtered_data = monthly_avg[monthly_avg['radio'].isin(selected_radios)]
                 
-                fig = px.line(filtered_data, x='date', y='audience_millions', color='radio',
-                             title="Évolution Mensuelle de l'Audience (2015-2024)",
-                             labels={'audience_millions': 'Audience (Millions)', 'date': 'Date'},
-                             color_discrete_map={'Skyrock': '#FF6B00'})
-                
-                fig.update_layout(height=500, showlegend=True)
-                st.plotly_chart(fig, use_container_width=True)
+                self.plan.chart(figures.monthly_evolution, filtered_data)
             
             with col2:
                 st.markdown("### 📊 Points Clés")
@@ -295,13 +382,7 @@ class RadioAudienceDashboard:
             
             with col1:
                 # Graphique d'évolution annuelle
-                fig = px.line(yearly_avg, x='annee', y='audience_millions', color='radio',
-                             title="Évolution Annuelle Moyenne de l'Audience",
-                             labels={'audience_millions': 'Audience Moyenne (Millions)', 'annee': 'Année'},
-                             color_discrete_map={'Skyrock': '#FF6B00'})
-                
-                fig.update_layout(height=500, showlegend=True)
-                st.plotly_chart(fig, use_container_width=True)
+                self.plan.chart(figures.yearly_evolution, yearly_avg)
             
             with col2:
                 st.markdown("### 🏆 Classement 2024")
@@ -316,25 +397,46 @@ class RadioAudienceDashboard:
             
             with col1:
                 # Parts de marché par année
-                fig = px.line(market_share_avg, x='annee', y='part_marche_pourcent', color='radio',
-                             title="Évolution des Parts de Marché (%)",
-                             labels={'part_marche_pourcent': 'Part de Marché (%)', 'annee': 'Année'},
-                             color_discrete_map={'Skyrock': '#FF6B00'})
-                
-                fig.update_layout(height=500)
-                st.plotly_chart(fig, use_container_width=True)
+                self.plan.chart(figures.market_share_evolution, market_share_avg)
             
             with col2:
                 # Parts de marché actuelles (camembert)
                 current_data = market_share_avg[market_share_avg['annee'] == 2024]
+                self.plan.chart(figures.market_share_pie, current_data, 2024)
+        
+        with tab4:
+            # Décomposition classique (multiplicative, période 12 mois) de toutes les radios
+            decomposition = self.get_decomposition()
+            col1, col2 = st.columns([3, 1])
+            
+            with col1:
+                trend_radios = st.multiselect(
+                    "Radios à décomposer",
+                    self.radios,
+                    default=['Skyrock', 'NRJ', 'Fun Radio'],
+                    key="trend_radios"
+                )
+                components = decomposition.long_frame(trend_radios)
                 
-                fig = px.pie(current_data, values='part_marche_pourcent', names='radio',
-                            title="Parts de Marché 2024",
-                            color_discrete_sequence=px.colors.qualitative.Set3)
+                # Tendance (moyenne mobile 2×12) sur la série observée
+                self.plan.chart(figures.trend_lines, components)
                 
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-                fig.update_layout(height=500)
-                st.plotly_chart(fig, use_container_width=True)
+                # Indice saisonnier : effet moyen de chaque mois
+                seasonal = pd.DataFrame({
+                    'mois': np.tile(np.arange(1, 13), len(trend_radios)),
+                    'radio': np.repeat(np.array(trend_radios, dtype=object), 12),
+                    'effet': np.concatenate([(decomposition.seasonal_index(radio) - 1) * 100 for radio in trend_radios])
+                    if trend_radios else np.empty(0)
+                })
+                self.plan.chart(figures.seasonal_effects, seasonal)
+            
+            with col2:
+                st.markdown("### 🧭 Force des Composantes")
+                strength = decomposition.strength()
+                skyrock = strength.loc['Skyrock']
+                st.metric("Saisonnalité Skyrock", f"{skyrock['saisonnalite']:.2f}")
+                st.metric("Tendance Skyrock", f"{skyrock['tendance']:.2f}")
+                st.dataframe(strength.round(2), use_container_width=True)
 
     def create_comparison_analysis(self):
         """Crée l'analyse comparative entre les radios"""
@@ -361,37 +463,12 @@ class RadioAudienceDashboard:
                 performance_data['audience_norm'] = (performance_data['audience_millions'] - performance_data['audience_millions'].min()) / (performance_data['audience_millions'].max() - performance_data['audience_millions'].min()) * 100
                 performance_data['market_share_norm'] = (performance_data['part_marche_pourcent'] - performance_data['part_marche_pourcent'].min()) / (performance_data['part_marche_pourcent'].max() - performance_data['part_marche_pourcent'].min()) * 100
                 
-                fig = go.Figure()
-                
-                for radio in ['Skyrock', 'NRJ', 'Fun Radio']:
-                    radio_data = performance_data[performance_data['radio'] == radio]
-                    fig.add_trace(go.Scatterpolar(
-                        r=[radio_data['audience_norm'].values[0], radio_data['market_share_norm'].values[0], 70, 60, 80],
-                        theta=['Audience', 'Part Marché', 'Jeunesse', 'Innovation', 'Digital'],
-                        fill='toself',
-                        name=radio
-                    ))
-                
-                fig.update_layout(
-                    polar=dict(
-                        radialaxis=dict(visible=True, range=[0, 100])
-                    ),
-                    showlegend=True,
-                    title="Profil de Performance - Radios Jeunes"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                self.plan.chart(figures.performance_radar, performance_data, ['Skyrock', 'NRJ', 'Fun Radio'])
             
             with col2:
                 # Heatmap de corrélation entre radios
-                pivot_data = self.df.pivot_table(index='date', columns='radio', values='audience_millions')
-                correlation_matrix = pivot_data.corr()
-                
-                fig = px.imshow(correlation_matrix,
-                               title="Corrélation des Audiences entre Radios",
-                               color_continuous_scale='RdBu_r',
-                               aspect="auto")
-                
-                st.plotly_chart(fig, use_container_width=True)
+                correlation_matrix = self.get_aggregates()['correlation_matrix']
+                self.plan.chart(figures.correlation_heatmap, correlation_matrix)
                 
                 st.markdown("""
                 **Analyse des corrélations :**
@@ -410,58 +487,38 @@ class RadioAudienceDashboard:
             
             with col1:
                 # Audience comparée
-                fig = px.bar(young_data.groupby('radio')['audience_millions'].mean().reset_index(),
-                            x='radio', y='audience_millions',
-                            title="Audience Moyenne - Radios Jeunes",
-                            color='radio',
-                            color_discrete_map={'Skyrock': '#FF6B00'})
-                
-                st.plotly_chart(fig, use_container_width=True)
+                self.plan.chart(figures.young_audience_bar,
+                                young_data.groupby('radio')['audience_millions'].mean().reset_index())
             
             with col2:
-                # Croissance annuelle
-                growth_data = []
-                for radio in young_radios:
-                    current_avg = current_data[current_data['radio'] == radio]['audience_millions'].mean()
-                    previous_avg = self.df[(self.df['radio'] == radio) & (self.df['annee'] == current_year-1)]['audience_millions'].mean()
-                    growth = ((current_avg - previous_avg) / previous_avg) * 100
-                    growth_data.append({'radio': radio, 'croissance': growth})
-                
-                growth_df = pd.DataFrame(growth_data)
-                
-                fig = px.bar(growth_df, x='radio', y='croissance',
-                            title="Taux de Croissance Annuel (%)",
-                            color='radio',
-                            color_discrete_map={'Skyrock': '#FF6B00'})
-                
-                st.plotly_chart(fig, use_container_width=True)
+                # Croissance annuelle (ligne de l'année courante de la matrice des croissances)
+                growth = self.get_competition().frame('yoy_growth', young_radios).loc[current_year]
+                growth_df = pd.DataFrame({'radio': young_radios, 'croissance': growth.to_numpy()})
+                self.plan.chart(figures.growth_bar, growth_df)
+            
+            # Évolution du classement de toutes les radios (graphique en bosses)
+            competition = self.get_competition()
+            ranks = competition.long_frame('yearly_rank', 'rang')
+            self.plan.chart(figures.rank_bump, ranks, competition.years[0], competition.years[-1])
         
         with tab3:
             st.subheader("Positionnement Stratégique")
             
             # Graphique de positionnement (Audience vs Jeunesse)
-            demographic_data = self.generate_demographic_data()
-            youth_share = demographic_data[demographic_data['tranche_age'].isin(['13-17', '18-24'])].groupby('radio')['part_audience'].sum().reset_index()
+            demographic_matrix, _ = self.get_audience_matrices()
+            youth_share = demographic_matrix.pivot('part_audience')[['13-17', '18-24']].sum(axis=1).rename('part_audience').reset_index()
             
             positioning_data = current_data.groupby('radio')['audience_millions'].mean().reset_index()
             positioning_data = positioning_data.merge(youth_share, on='radio')
             positioning_data['taille'] = positioning_data['audience_millions'] * 10  # Pour la taille des bulles
-            
-            fig = px.scatter(positioning_data, x='audience_millions', y='part_audience',
-                           size='taille', color='radio', hover_name='radio',
-                           title="Positionnement Stratégique des Radios",
-                           labels={'audience_millions': 'Audience (Millions)', 'part_audience': 'Part Jeune Audience (%)'},
-                           color_discrete_map={'Skyrock': '#FF6B00'})
-            
-            st.plotly_chart(fig, use_container_width=True)
+            self.plan.chart(figures.positioning_scatter, positioning_data)
 
     def create_demographic_analysis(self):
         """Analyse démographique de l'audience"""
         st.markdown('<h3 class="section-header">👥 Analyse Démographique</h3>', 
                    unsafe_allow_html=True)
         
-        demographic_data = self.generate_demographic_data()
-        time_slot_data = self.generate_time_slot_data()
+        demographic_matrix, time_slot_matrix = self.get_audience_matrices()
         
         tab1, tab2, tab3 = st.tabs(["Pyramide des Âges", "Comportement d'Écoute", "Profil Typique"])
         
@@ -470,51 +527,27 @@ class RadioAudienceDashboard:
             
             with col1:
                 # Focus Skyrock
-                skyrock_demo = demographic_data[demographic_data['radio'] == 'Skyrock']
-                
-                fig = px.bar(skyrock_demo, x='part_audience', y='tranche_age', orientation='h',
-                            title="Répartition par Âge - Skyrock",
-                            labels={'part_audience': 'Part d\'Audience (%)', 'tranche_age': 'Tranche d\'Âge'})
-                
-                fig.update_layout(showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
+                skyrock_demo = demographic_matrix.select(['Skyrock'])
+                self.plan.chart(figures.age_distribution, skyrock_demo)
             
             with col2:
                 # Comparaison avec autres radios jeunes
                 young_radios = ['Skyrock', 'NRJ', 'Fun Radio']
-                young_demo = demographic_data[demographic_data['radio'].isin(young_radios)]
-                
-                fig = px.bar(young_demo, x='tranche_age', y='part_audience', color='radio',
-                            title="Comparaison Démographique - Radios Jeunes",
-                            labels={'part_audience': 'Part d\'Audience (%)', 'tranche_age': 'Tranche d\'Âge'},
-                            barmode='group',
-                            color_discrete_map={'Skyrock': '#FF6B00'})
-                
-                st.plotly_chart(fig, use_container_width=True)
+                young_demo = demographic_matrix.select(young_radios)
+                self.plan.chart(figures.young_demographics, young_demo)
         
         with tab2:
             col1, col2 = st.columns(2)
             
             with col1:
                 # Audience par créneau horaire - Skyrock
-                skyrock_time = time_slot_data[time_slot_data['radio'] == 'Skyrock']
-                
-                fig = px.bar(skyrock_time, x='creneau_horaire', y='part_audience',
-                            title="Audience par Créneau Horaire - Skyrock",
-                            labels={'part_audience': 'Part d\'Audience (%)', 'creneau_horaire': 'Créneau'})
-                
-                st.plotly_chart(fig, use_container_width=True)
+                skyrock_time = time_slot_matrix.select(['Skyrock'])
+                self.plan.chart(figures.time_slot_bar, skyrock_time)
             
             with col2:
                 # Heatmap des créneaux
-                time_pivot = time_slot_data.pivot_table(index='radio', columns='creneau_horaire', values='part_audience')
-                
-                fig = px.imshow(time_pivot,
-                               title="Audience par Créneau Horaire - Toutes Radios",
-                               color_continuous_scale='Viridis',
-                               aspect="auto")
-                
-                st.plotly_chart(fig, use_container_width=True)
+                time_pivot = time_slot_matrix.pivot('part_audience')
+                self.plan.chart(figures.time_slot_heatmap, time_pivot)
         
         with tab3:
             st.subheader("👤 Profil Type de l'Auditeur Skyrock")
@@ -530,13 +563,19 @@ class RadioAudienceDashboard:
                 - Étudiants : 45%
                 """)
             
+            # Comportement d'écoute mesuré sur les sessions reconstruites (sessions.py)
+            sessions = get_session_summary()
+            indicators = sessions.indicators
+            device_mix = sessions.device_mix()
+            tsl = int(round(indicators['tsl_minutes']))
+            
             with col2:
-                st.markdown("""
+                st.markdown(f"""
                 **📱 Comportement d'Écoute :**
-                - Écoute moyenne : 2h30/jour
-                - Pic d'écoute : 20h-24h
-                - Mobile : 65%
-                - Voiture : 25%
+                - Écoute moyenne : {tsl // 60}h{tsl % 60:02d}/jour
+                - Pic d'écoute : {sessions.peak_slot()}
+                - Mobile : {device_mix['mobile']:.0f}%
+                - Voiture : {device_mix['car']:.0f}%
                 """)
             
             with col3:
@@ -548,18 +587,32 @@ class RadioAudienceDashboard:
                 - Émissions interactives : 75%
                 """)
             
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Supports d'écoute par créneau (part du temps d'écoute)
+                slots = sessions.frames['creneaux'].melt(
+                    id_vars='libelle', value_vars=[f"{device}_pourcent" for device in DEVICES],
+                    var_name='support', value_name='part')
+                slots['support'] = slots['support'].map({'mobile_pourcent': 'Mobile', 'car_pourcent': 'Voiture',
+                                                         'home_pourcent': 'Domicile'})
+                self.plan.chart(figures.device_mix_by_slot, slots, TIME_SLOTS)
+            
+            with col2:
+                # Durée des sessions d'écoute
+                lengths = sessions.frames['durees']
+                lengths = lengths[lengths[DEVICES].sum(axis=1) > 0]
+                minutes = lengths['max_secondes'].clip(upper=86400) / 60
+                counts = {label: lengths[device] for device, label in zip(DEVICES, ['Mobile', 'Voiture', 'Domicile'])}
+                self.plan.chart(figures.session_lengths, minutes, counts, indicators['session_mediane_minutes'])
+            
             # Graphique de profil complet
             profile_metrics = {
                 'Catégorie': ['Fidélité', 'Engagement Digital', 'Activation Sociale', 'Recommandation'],
                 'Score': [78, 65, 72, 68]
             }
             profile_df = pd.DataFrame(profile_metrics)
-            
-            fig = px.bar(profile_df, x='Score', y='Catégorie', orientation='h',
-                        title="Score d'Engagement - Audience Skyrock",
-                        color='Score', color_continuous_scale='Viridis')
-            
-            st.plotly_chart(fig, use_container_width=True)
+            self.plan.chart(figures.engagement_profile, profile_df)
 
     def create_strategic_recommendations(self):
         """Recommandations stratégiques basées sur l'analyse"""
@@ -571,38 +624,28 @@ class RadioAudienceDashboard:
         with col1:
             st.subheader("🎯 Opportunités pour Skyrock")
             
-            st.markdown("""
-            <div class="metric-card">
-            <h4>📱 Renforcement Digital</h4>
-            <ul>
-            <li>Développer l'application mobile avec fonctionnalités sociales</li>
-            <li>Créer du contenu exclusif pour les plateformes numériques</li>
-            <li>Optimiser le streaming pour la mobilité</li>
-            </ul>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="metric-card">
-            <h4>🎵 Contenu Musical</h4>
-            <ul>
-            <li>Diversifier légèrement la programmation musicale</li>
-            <li>Mettre en avant les artistes émergents français</li>
-            <li>Créer des partenariats avec l'industrie musicale</li>
-            </ul>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("""
-            <div class="metric-card">
-            <h4>👥 Engagement Communautaire</h4>
-            <ul>
-            <li>Développer les émissions interactives</li>
-            <li>Créer des événements live avec l'audience</li>
-            <li>Renforcer la présence sur les réseaux sociaux</li>
-            </ul>
-            </div>
-            """, unsafe_allow_html=True)
+            opportunities = [
+                ("📱 Renforcement Digital", [
+                    "Développer l'application mobile avec fonctionnalités sociales",
+                    "Créer du contenu exclusif pour les plateformes numériques",
+                    "Optimiser le streaming pour la mobilité"
+                ]),
+                ("🎵 Contenu Musical", [
+                    "Diversifier légèrement la programmation musicale",
+                    "Mettre en avant les artistes émergents français",
+                    "Créer des partenariats avec l'industrie musicale"
+                ]),
+                ("👥 Engagement Communautaire", [
+                    "Développer les émissions interactives",
+                    "Créer des événements live avec l'audience",
+                    "Renforcer la présence sur les réseaux sociaux"
+                ])
+            ]
+            
+            render_section('opportunities', 'list_card', [
+                {'title': title, 'items': ''.join(f"<li>{item}</li>" for item in items)}
+                for title, items in opportunities
+            ])
         
         with col2:
             st.subheader("📊 Analyse SWOT")
@@ -620,22 +663,11 @@ class RadioAudienceDashboard:
             swot_df = pd.DataFrame(swot_data)
             
             # Affichage stylisé du SWOT
-            for _, row in swot_df.iterrows():
-                if row['Catégorie'] == 'Forces':
-                    color = '#4CAF50'
-                elif row['Catégorie'] == 'Faiblesses':
-                    color = '#F44336'
-                elif row['Catégorie'] == 'Opportunités':
-                    color = '#2196F3'
-                else:
-                    color = '#FF9800'
-                
-                st.markdown(f"""
-                <div style="border-left: 4px solid {color}; padding: 10px; margin: 10px 0; background-color: #f8f9fa;">
-                <h4 style="color: {color}; margin: 0;">{row['Catégorie']}</h4>
-                <p style="margin: 5px 0; white-space: pre-line;">{row['Éléments']}</p>
-                </div>
-                """, unsafe_allow_html=True)
+            swot_colors = {'Forces': '#4CAF50', 'Faiblesses': '#F44336', 'Opportunités': '#2196F3'}
+            render_section('swot', 'swot_entry', [
+                {'color': swot_colors.get(category, '#FF9800'), 'category': category, 'elements': elements}
+                for category, elements in zip(swot_df['Catégorie'], swot_df['Éléments'])
+            ])
             
             # KPI de performance recommandés
             st.subheader("🎯 Objectifs Recommandés")
@@ -649,6 +681,114 @@ class RadioAudienceDashboard:
             kpi_df = pd.DataFrame(kpis)
             st.dataframe(kpi_df, use_container_width=True)
 
+    def get_what_if_engine(self):
+        """Moteur what-if de la session et ses résultats de référence"""
+        if 'what_if_engine' not in st.session_state:
+            engine = WhatIfEngine.for_dataset(pd.DatetimeIndex(self.df['date'].unique()), self.radios)
+            st.session_state.what_if_engine = engine
+            st.session_state.what_if_baseline = [frame.copy() for frame in engine.yearly()]
+        return st.session_state.what_if_engine, st.session_state.what_if_baseline
+
+    def reset_what_if(self):
+        """Paramètres de référence et curseurs remis à zéro"""
+        engine, _ = self.get_what_if_engine()
+        engine.reset()
+        for key in [key for key in st.session_state if str(key).startswith(('what_if_growth_', 'what_if_season_', 'what_if_covid'))]:
+            del st.session_state[key]
+
+    def add_what_if_shock(self, radio):
+        """Ajoute le choc décrit par les contrôles (rappel du bouton, avant le rendu suivant)"""
+        engine, _ = self.get_what_if_engine()
+        start, end = st.session_state.what_if_shock_period
+        impact = st.session_state.what_if_shock_impact
+        n_added = len([shock for shock in engine.shocks if shock not in COVID_SHOCKS])
+        everywhere = st.session_state.what_if_shock_scope == "Toutes les radios"
+        engine.add_shock(Shock(f"Choc {n_added + 1} ({start} → {end}, {impact:+d}%)", start, end, impact / 100,
+                               radios=None if everywhere else [radio]))
+
+    def create_what_if_panel(self):
+        """Simulation what-if : croissance, saisonnalité et chocs par radio (seules les radios modifiées sont recalculées)"""
+        st.markdown('<h3 class="section-header">🧪 Simulation What-If</h3>', 
+                   unsafe_allow_html=True)
+        
+        engine, (baseline_audience, baseline_shares) = self.get_what_if_engine()
+        months = [str(period) for period in engine.dates.to_period('M')]
+        
+        col1, col2 = st.columns([1, 2])
+        
+        with col1:
+            radio = st.selectbox("Radio à ajuster", self.radios, key='what_if_radio')
+            
+            # Curseurs propres à chaque radio (valeur initiale : paramètre courant du moteur)
+            growth = st.slider("Croissance annuelle (%)", -10.0, 10.0, engine.growth(radio) * 100, 0.1,
+                               key=f'what_if_growth_{radio}')
+            amplitude = st.slider("Amplitude de la saisonnalité (%)", 0.0, 30.0, engine.seasonality(radio) * 100, 0.5,
+                                  key=f'what_if_season_{radio}')
+            engine.set_growth(radio, growth / 100)
+            engine.set_seasonality(radio, amplitude / 100)
+            
+            st.markdown("**⚡ Chocs d'audience**")
+            covid = st.checkbox("Effet COVID 2020-2021", value=True, key='what_if_covid')
+            added = [shock for shock in engine.shocks if shock not in COVID_SHOCKS]
+            shocks = (COVID_SHOCKS if covid else []) + added
+            if shocks != engine.shocks:
+                engine.set_shocks(shocks)
+            
+            start, end = st.select_slider("Période du choc", options=months, value=(months[-24], months[-19]),
+                                          key='what_if_shock_period')
+            impact = st.slider("Impact (%)", -50, 50, -10, key='what_if_shock_impact')
+            scope = st.radio("Radios touchées", [f"{radio} uniquement", "Toutes les radios"], horizontal=True,
+                             key='what_if_shock_scope')
+            st.button("➕ Ajouter le choc", on_click=self.add_what_if_shock, args=(radio,))
+            added = [shock for shock in engine.shocks if shock not in COVID_SHOCKS]
+            for shock in added:
+                st.caption(f"{shock.label} — {'toutes les radios' if shock.radios is None else ', '.join(sorted(shock.radios))}")
+            if added:
+                st.button("🗑️ Retirer les chocs ajoutés", on_click=engine.set_shocks, args=(COVID_SHOCKS if covid else [],))
+            
+            st.button("↩️ Réinitialiser le scénario", on_click=self.reset_what_if)
+        
+        with col2:
+            yearly_audience, yearly_shares = engine.yearly()
+            year = int(engine.years[-1])
+            
+            # Indicateurs du scénario pour la dernière année
+            metric1, metric2, metric3 = st.columns(3)
+            with metric1:
+                st.metric(
+                    label=f"Audience {radio} {year}",
+                    value=f"{yearly_audience.loc[year, radio]:.2f}M",
+                    delta=f"{yearly_audience.loc[year, radio] - baseline_audience.loc[year, radio]:+.2f}M"
+                )
+            with metric2:
+                st.metric(
+                    label=f"Part de marché {radio} {year}",
+                    value=f"{yearly_shares.loc[year, radio]:.1f}%",
+                    delta=f"{yearly_shares.loc[year, radio] - baseline_shares.loc[year, radio]:+.1f}%"
+                )
+            with metric3:
+                ranking = yearly_audience.loc[year].sort_values(ascending=False).index.tolist()
+                baseline_ranking = baseline_audience.loc[year].sort_values(ascending=False).index.tolist()
+                rank, baseline_rank = ranking.index('Skyrock') + 1, baseline_ranking.index('Skyrock') + 1
+                st.metric(
+                    label=f"Classement Skyrock {year}",
+                    value=f"{rank}ème/{len(self.radios)}",
+                    delta=f"{(baseline_rank - rank):+d}" if baseline_rank != rank else None
+                )
+            
+            # Audience annuelle : scénario contre référence
+            self.plan.chart(figures.scenario_audience, baseline_audience, yearly_audience, radio)
+            
+            # Parts de marché de la dernière année, toutes radios (dénominateur commun)
+            shares = pd.DataFrame({
+                'radio': self.radios * 2,
+                'part_marche_pourcent': list(baseline_shares.loc[year, self.radios]) + list(yearly_shares.loc[year, self.radios]),
+                'version': ['Référence'] * len(self.radios) + ['Scénario'] * len(self.radios)
+            })
+            self.plan.chart(figures.scenario_shares, shares, year)
+            
+            st.caption(f"{len(engine.last_recomputed)} nœuds recalculés en {engine.last_duration_ms:.1f} ms")
+
     def create_sidebar(self):
         """Crée la sidebar avec les contrôles"""
         st.sidebar.markdown("## 🎛️ Contrôles d'Analyse")
@@ -669,19 +809,18 @@ class RadioAudienceDashboard:
         
         # Métriques rapides Skyrock
         st.sidebar.markdown("### 🎯 Snapshots Skyrock")
-        skyrock_current = self.df[(self.df['radio'] == 'Skyrock') & (self.df['annee'] == selected_year)]
+        competition = self.get_competition()
         
-        if not skyrock_current.empty:
-            avg_audience = skyrock_current['audience_millions'].mean()
-            market_share = skyrock_current['part_marche_pourcent'].mean()
+        if selected_year in competition.years:
+            avg_audience = competition.value(competition.yearly_audience, 'Skyrock', selected_year)
+            market_share = competition.value(competition.yearly_share, 'Skyrock', selected_year)
             
             st.sidebar.metric("Audience moyenne", f"{avg_audience:.2f}M")
             st.sidebar.metric("Part de marché", f"{market_share:.1f}%")
             
             # Classement
-            ranking = self.get_radio_ranking(selected_year)
-            position = ranking.index('Skyrock') + 1
-            st.sidebar.metric("Position", f"{position}ème/8")
+            position = competition.rank('Skyrock', selected_year)
+            st.sidebar.metric("Position", f"{position}ème/{len(self.radios)}")
         
         # Liens rapides
         st.sidebar.markdown("### 🔗 Navigation Rapide")
@@ -693,6 +832,8 @@ class RadioAudienceDashboard:
             st.session_state.active_tab = 2
         if st.sidebar.button("💡 Recommandations"):
             st.session_state.active_tab = 3
+        if st.sidebar.button("🧪 What-If"):
+            st.session_state.active_tab = 4
         
         return {
             'selected_year': selected_year,
@@ -701,35 +842,42 @@ class RadioAudienceDashboard:
 
     def run_dashboard(self):
         """Exécute le dashboard complet"""
+        begin_rerun()
+        # Endpoint /metrics du processus
+        get_metrics_server()
+        RERUNS.labels('audience').inc()
+        
         # Initialisation de l'état de session
         if 'active_tab' not in st.session_state:
             st.session_state.active_tab = 0
         
         # Sidebar
-        controls = self.create_sidebar()
+        with RENDER_SECONDS.labels('audience', 'sidebar').time():
+            controls = self.create_sidebar()
         
         # Header
-        self.display_header()
-        
-        # Navigation par onglets
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "📈 Évolution Temporelle", 
-            "🔍 Analyse Comparative", 
-            "👥 Analyse Démographique", 
-            "💡 Recommandations"
-        ])
-        
-        with tab1:
-            self.create_evolution_charts()
-        
-        with tab2:
-            self.create_comparison_analysis()
-        
-        with tab3:
-            self.create_demographic_analysis()
-        
-        with tab4:
-            self.create_strategic_recommendations()
+        with RENDER_SECONDS.labels('audience', 'header').time():
+            self.display_header()
+        
+        # Navigation : seule la section active est construite (st.tabs calcule les quatre à chaque rendu)
+        active = st.radio("Section", range(len(SECTIONS)), format_func=SECTIONS.__getitem__,
+                          key='active_tab', horizontal=True, label_visibility='collapsed')
+        
+        sections = [
+            self.create_evolution_charts,
+            self.create_comparison_analysis,
+            self.create_demographic_analysis,
+            self.create_strategic_recommendations,
+            self.create_what_if_panel
+        ]
+        # Figures de la section collectées puis construites ensemble (workers), émises dans l'ordre de la page
+        self.plan = RenderPlan('audience', get_figure_pool())
+        with RENDER_SECONDS.labels('audience', sections[active].__name__).time():
+            sections[active]()
+            self.plan.render()
+        
+        render_stats_panel()
+        render_timings_panel()
         
         # Footer
         st.markdown("---")
@@ -742,5 +890,6 @@ class RadioAudienceDashboard:
 
 # Lancement du dashboard
 if __name__ == "__main__":
+    configure_page()
     dashboard = RadioAudienceDashboard()
-    dashboard.run_dashboard()
\ No newline at end of file
+    dashboard.run_dashboard()
@@ -0,0 +1,242 @@
+# alert_rules.py
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from stations import REGION_LISTENERS
+
+SEVERITIES = ['info', 'warning', 'critical']
+# Comparaisons ramenées à « signe × valeur > signe × seuil » (ou >=)
+OPERATORS = {'>': (1.0, True), '>=': (1.0, False), '<': (-1.0, True), '<=': (-1.0, False)}
+
+# Règles par défaut : seuil (valeur du tick), taux (variation en % depuis le tick précédent), maintien sur N ticks ;
+# metric 'region' : une règle par région (toutes, ou la liste 'regions')
+DEFAULT_RULES = [
+    {'id': 'latence_moyenne', 'name': "Latence stream dégradée", 'metric': 'latency_p95_ms', 'op': '>',
+     'threshold': 100, 'severity': 'warning'},
+    {'id': 'latence_elevee', 'name': "Latence stream élevée", 'metric': 'latency_p95_ms', 'op': '>',
+     'threshold': 150, 'severity': 'critical'},
+    {'id': 'charge_serveur', 'name': "Charge serveur critique", 'metric': 'server_load', 'op': '>',
+     'threshold': 90, 'sustain': 3, 'severity': 'critical'},
+    {'id': 'qualite_stream', 'name': "Erreurs 5xx sur le stream", 'metric': 'stream_quality', 'op': '<',
+     'threshold': 99, 'sustain': 3, 'severity': 'warning'},
+    {'id': 'serveurs_hors_ligne', 'name': "Serveur hors ligne", 'metric': 'servers_offline', 'op': '>',
+     'threshold': 0, 'sustain': 2, 'severity': 'critical'},
+    {'id': 'audience_plancher', 'name': "Audience sous le plancher", 'metric': 'listeners', 'op': '<',
+     'threshold': 500000, 'severity': 'critical'},
+    {'id': 'chute_audience', 'name': "Chute d'audience", 'metric': 'listeners', 'type': 'rate', 'op': '<',
+     'threshold': -5, 'severity': 'warning'},
+    {'id': 'engagement_faible', 'name': "Engagement faible", 'metric': 'engagement', 'op': '<',
+     'threshold': 60, 'sustain': 5, 'severity': 'info'},
+    {'id': 'decrochage_regional', 'name': "Décrochage régional", 'metric': 'region', 'type': 'rate', 'op': '<',
+     'threshold': -10, 'sustain': 2, 'severity': 'warning'},
+]
+
+
+def load_alert_rules(path=None):
+    """Charge les règles depuis un fichier JSON (liste de règles), sinon les règles par défaut"""
+    if path is None:
+        return [dict(rule) for rule in DEFAULT_RULES]
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class CompiledRules:
+    """Règles compilées en tableaux : une évaluation vectorisée par tick, quel que soit le nombre de règles"""
+
+    def __init__(self, rules, regions=None):
+        regions = list(REGION_LISTENERS if regions is None else regions)
+        self.rules = []
+        for rule in rules:
+            if rule['metric'] == 'region':
+                # Règle régionale : une règle compilée par région
+                for region in rule.get('regions') or regions:
+                    self.rules.append(dict(rule, metric=f"region:{region}", label=region))
+            else:
+                self.rules.append(dict(rule, label=rule.get('label', '')))
+        for rule in self.rules:
+            if rule['op'] not in OPERATORS or rule.get('severity', 'warning') not in SEVERITIES:
+                raise ValueError(f"règle invalide : {rule}")
+
+        self.metrics = list(dict.fromkeys(rule['metric'] for rule in self.rules))
+        self.metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+        self.ids = [rule['id'] for rule in self.rules]
+        self.metric = np.array([self.metric_index[rule['metric']] for rule in self.rules], dtype=np.intp)
+        self.rate = np.array([rule.get('type', 'threshold') == 'rate' for rule in self.rules], dtype=bool)
+        sign = np.array([OPERATORS[rule['op']][0] for rule in self.rules])
+        self.sign = sign
+        self.strict = np.array([OPERATORS[rule['op']][1] for rule in self.rules], dtype=bool)
+        self.limit = sign * np.array([float(rule['threshold']) for rule in self.rules])
+        self.sustain = np.array([int(rule.get('sustain', 1)) for rule in self.rules], dtype=np.int64)
+        self.severity = np.array([SEVERITIES.index(rule.get('severity', 'warning')) for rule in self.rules], dtype=np.int8)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def vector(self, metrics):
+        """Valeurs des métriques utilisées par les règles (NaN si absente : la règle ne se déclenche pas)"""
+        return np.array([np.nan if metrics.get(name) is None else metrics[name] for name in self.metrics],
+                        dtype=np.float64)
+
+    def conditions(self, values, rates):
+        """Condition de chaque règle sur ce tick (sans le maintien)"""
+        x = np.where(self.rate, rates[self.metric], values[self.metric])
+        scaled = self.sign * x
+        with np.errstate(invalid='ignore'):
+            return np.where(self.strict, scaled > self.limit, scaled >= self.limit)
+
+
+class AlertEngine:
+    """Évalue les règles compilées à chaque tick ; seules les transitions (déclenchée / résolue) produisent un événement"""
+
+    def __init__(self, compiled, history=50):
+        self.compiled = compiled
+        self.previous = None
+        self.streak = np.zeros(len(compiled), dtype=np.int64)
+        self.active = np.zeros(len(compiled), dtype=bool)
+        # Début et valeur de déclenchement des alertes actives
+        self.since = np.empty(len(compiled), dtype=object)
+        self.values = np.full(len(compiled), np.nan)
+        self.events = deque(maxlen=history)
+        self.ticks = 0
+        # Dernier état évalué : plusieurs sessions et reruns présentent le même tick
+        self.last_tick = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_rules(cls, rules=None, regions=None):
+        return cls(CompiledRules(DEFAULT_RULES if rules is None else rules, regions))
+
+    def evaluate(self, metrics, moment=None):
+        """Un tick : metrics (nom → valeur) ou vecteur déjà ordonné ; retourne (déclenchées, résolues)"""
+        values = metrics if isinstance(metrics, np.ndarray) else self.compiled.vector(metrics)
+        if self.previous is None:
+            rates = np.full(values.shape, np.nan)
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                rates = (values - self.previous) / np.abs(self.previous) * 100
+        self.previous = values
+
+        held = self.compiled.conditions(values, rates)
+        self.streak = np.where(held, self.streak + 1, 0)
+        firing = self.streak >= self.compiled.sustain
+        started = np.flatnonzero(firing & ~self.active)
+        resolved = np.flatnonzero(self.active & ~firing)
+        self.active = firing
+        self.ticks += 1
+
+        if len(started) or len(resolved):
+            moment = moment or datetime.now()
+            x = np.where(self.compiled.rate, rates[self.compiled.metric], values[self.compiled.metric])
+            self.since[started] = moment
+            self.values[started] = x[started]
+            self.since[resolved] = None
+            self.values[resolved] = np.nan
+            # Seuls les derniers événements restent dans l'historique : inutile de créer les autres
+            transitions = [(i, 'firing') for i in started] + [(i, 'resolved') for i in resolved]
+            for i, state in transitions[-self.events.maxlen:]:
+                self.events.append(self._event(i, state, moment, x[i]))
+        return started, resolved
+
+    def evaluate_tick(self, tick, metrics, moment=None):
+        """Évalue l'état tick une seule fois (identifiant de l'état live) ; False s'il l'a déjà été"""
+        with self._lock:
+            if tick == self.last_tick:
+                return False
+            self.last_tick = tick
+            self.evaluate(metrics, moment)
+            return True
+
+    def _event(self, i, state, moment, value):
+        rule = self.compiled.rules[i]
+        return {'state': state, 'at': moment, 'id': rule['id'], 'name': rule['name'], 'label': rule['label'],
+                'severity': SEVERITIES[self.compiled.severity[i]], 'value': float(value)}
+
+    def active_alerts(self):
+        """Alertes en cours, de la plus grave à la plus ancienne"""
+        indices = sorted(np.flatnonzero(self.active), key=lambda i: (-self.compiled.severity[i], self.since[i]))
+        return [self._event(i, 'firing', self.since[i], self.values[i]) for i in indices]
+
+    def threshold(self, rule_id):
+        """Seuil d'une règle (affichages qui le reprennent : jauge, statut)"""
+        rule = self.compiled.rules[self.compiled.ids.index(rule_id)]
+        return rule['threshold']
+
+    def status(self, metric, value):
+        """Sévérité la plus haute des règles de seuil sur cette métrique qui se déclenchent pour value, ou None"""
+        compiled = self.compiled
+        if metric not in compiled.metric_index or value is None:
+            return None
+        rules = (compiled.metric == compiled.metric_index[metric]) & ~compiled.rate
+        held = rules & np.where(compiled.strict, compiled.sign * value > compiled.limit,
+                                compiled.sign * value >= compiled.limit)
+        return SEVERITIES[compiled.severity[held].max()] if held.any() else None
+
+
+def _synthetic_rules(n_rules, n_metrics, seed=0):
+    """Jeu de règles aléatoires (seuils, taux, maintiens, opérateurs) sur n_metrics métriques"""
+    rng = np.random.default_rng(seed)
+    ops = list(OPERATORS)
+    return [{
+        'id': f"regle_{i}", 'name': f"Règle {i}", 'metric': f"metrique_{rng.integers(n_metrics)}",
+        'type': 'rate' if rng.random() < 0.3 else 'threshold', 'op': ops[rng.integers(len(ops))],
+        'threshold': float(rng.normal(0, 1)), 'sustain': int(rng.integers(1, 6)),
+        'severity': SEVERITIES[rng.integers(len(SEVERITIES))]
+    } for i in range(n_rules)]
+
+
+def benchmark(n_rules=10_000, n_metrics=500, ticks=1000):
+    """Temps d'évaluation par tick de n_rules règles compilées contre une boucle de conditions Python"""
+    rng = np.random.default_rng(1)
+    rules = _synthetic_rules(n_rules, n_metrics)
+    t = time.perf_counter()
+    engine = AlertEngine.from_rules(rules)
+    compile_time = time.perf_counter() - t
+    series = rng.normal(0, 1, (ticks, n_metrics))
+    snapshots = [dict(zip([f"metrique_{j}" for j in range(n_metrics)], row)) for row in series[:50]]
+
+    timings, transitions = [], 0
+    for tick in range(ticks):
+        t = time.perf_counter()
+        started, resolved = engine.evaluate(snapshots[tick % len(snapshots)])
+        timings.append(time.perf_counter() - t)
+        transitions += len(started) + len(resolved)
+    timings.sort()
+    print(f"{n_rules:,} règles sur {len(engine.compiled.metrics)} métriques : compilées en {compile_time * 1000:.0f} ms")
+    print(f"  évaluation (snapshot dict → vecteur) p50 {timings[len(timings) // 2] * 1000:.2f} ms, "
+          f"p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms — {transitions / ticks:.0f} transitions/tick, "
+          f"{int(engine.active.sum())} alertes actives")
+
+    # Référence : conditions évaluées règle par règle
+    previous, streak, active = {}, [0] * n_rules, [False] * n_rules
+    t = time.perf_counter()
+    for tick in range(50):
+        snapshot = snapshots[tick]
+        for i, rule in enumerate(rules):
+            value = snapshot[rule['metric']]
+            if rule['type'] == 'rate':
+                before = previous.get(rule['metric'])
+                value = None if before is None else (value - before) / abs(before) * 100
+            held = value is not None and {'>': value > rule['threshold'], '>=': value >= rule['threshold'],
+                                          '<': value < rule['threshold'], '<=': value <= rule['threshold']}[rule['op']]
+            streak[i] = streak[i] + 1 if held else 0
+            active[i] = streak[i] >= rule['sustain']
+        previous = snapshot
+    print(f"  boucle Python règle par règle : {(time.perf_counter() - t) / 50 * 1000:.1f} ms/tick")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Règles d'alerte compilées")
+    parser.add_argument('--rules', type=int, default=10_000)
+    parser.add_argument('--check', help="fichier JSON de règles à valider")
+    args = parser.parse_args()
+    if args.check:
+        compiled = CompiledRules(load_alert_rules(args.check))
+        print(f"{len(compiled)} règles compilées sur {len(compiled.metrics)} métriques")
+    else:
+        benchmark(args.rules)
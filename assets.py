@@ -0,0 +1,301 @@
+# assets.py
+import argparse
+import base64
+import hashlib
+import http.client
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Sources (versionnées) et fichiers publiés sous leur nom à empreinte
+SOURCE_DIR = os.path.join(ROOT, 'assets')
+BUILD_DIR = os.environ.get('SKYROCK_ASSET_DIR', os.path.join(ROOT, '.assets'))
+ASSET_PORT = int(os.environ.get('SKYROCK_ASSET_PORT', 8504))
+# server.enableStaticServing : Streamlit sert static/ (à côté des scripts) sous app/static/, sur sa propre origine
+STATIC_DIR = os.path.join(ROOT, 'static')
+STATIC_URL = 'app/static'
+
+# Le nom change avec le contenu : le navigateur peut garder le fichier un an sans revalider
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+CONTENT_TYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.svg': 'image/svg+xml',
+    '.png': 'image/png',
+    '.geojson': 'application/geo+json',
+    '.json': 'application/json',
+}
+
+
+def vendor_sources():
+    """Fichiers publiés avec le bundle sans être versionnés ici (plotly.js du paquet plotly, pour le graphique live)"""
+    spec = importlib.util.find_spec('plotly')
+    path = os.path.join(os.path.dirname(spec.origin), 'package_data', 'plotly.min.js') if spec else None
+    return {'plotly.min.js': path} if path and os.path.exists(path) else {}
+
+
+class AssetBundle:
+    """Logo, CSS et géométrie servis localement sous un nom contenant l'empreinte du contenu"""
+
+    def __init__(self, manifest, directory, base_url='', inline=False):
+        self.manifest = manifest
+        self.directory = directory
+        self.base_url = base_url
+        # Aucune origine servant le bundle : contenus embarqués dans la page (renvoyés à chaque rerun)
+        self.inline = inline
+        self._files = {entry['file']: entry for entry in manifest.values()}
+        self._bodies = {}
+
+    @classmethod
+    def build(cls, source_dir=SOURCE_DIR, build_dir=BUILD_DIR, inline=False):
+        """Copie chaque source en nom.<empreinte>.ext et écrit le manifeste (idempotent)"""
+        os.makedirs(build_dir, exist_ok=True)
+        manifest = {}
+        sources = {name: os.path.join(source_dir, name) for name in os.listdir(source_dir)}
+        sources.update(vendor_sources())
+        for name, path in sorted(sources.items()):
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            stem, ext = os.path.splitext(name)
+            hashed = f"{stem}.{digest}{ext}"
+            target = os.path.join(build_dir, hashed)
+            if not os.path.exists(target):
+                with open(target + '.tmp', 'wb') as f:
+                    f.write(data)
+                os.replace(target + '.tmp', target)
+            manifest[name] = {'file': hashed, 'size': len(data), 'etag': f'"{digest}"',
+                              'type': CONTENT_TYPES.get(ext, 'application/octet-stream')}
+        with open(os.path.join(build_dir, 'manifest.json.tmp'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(os.path.join(build_dir, 'manifest.json.tmp'), os.path.join(build_dir, 'manifest.json'))
+        return cls(manifest, build_dir, inline=inline)
+
+    def url(self, name):
+        if self.inline:
+            entry = self.manifest[name]
+            body, _ = self.lookup(entry['file'])
+            return f"data:{entry['type'].split(';')[0]};base64,{base64.b64encode(body).decode('ascii')}"
+        return f"{self.base_url}/{self.manifest[name]['file']}"
+
+    def stylesheet(self, *names):
+        """Bloc <style> réduit à des @import (quelques dizaines d'octets au lieu de la feuille entière)"""
+        if self.inline:
+            return "<style>" + ''.join(self.lookup(self.manifest[name]['file'])[0].decode('utf-8')
+                                       for name in names) + "</style>"
+        imports = ''.join(f'@import url("{self.url(name)}");' for name in names)
+        return f"<style>{imports}</style>"
+
+    def image(self, name, width):
+        return f'<img src="{self.url(name)}" width="{width}">'
+
+    def lookup(self, hashed):
+        """(corps, entrée du manifeste) d'un fichier publié, ou None"""
+        entry = self._files.get(hashed)
+        if entry is None:
+            return None
+        if hashed not in self._bodies:
+            with open(os.path.join(self.directory, hashed), 'rb') as f:
+                self._bodies[hashed] = f.read()
+        return self._bodies[hashed], entry
+
+
+class AssetRequestHandler(BaseHTTPRequestHandler):
+    """Sert les fichiers à empreinte avec un cache permanent (ETag pour les revalidations forcées)"""
+    protocol_version = 'HTTP/1.1'
+    # En-têtes et corps écrits séparément : sans TCP_NODELAY, le corps attend l'ACK retardé (~40 ms)
+    disable_nagle_algorithm = True
+    bundle = None
+    responses_sent = {200: 0, 304: 0, 404: 0}
+
+    def do_GET(self):
+        found = self.bundle.lookup(self.path.split('?', 1)[0].lstrip('/'))
+        if found is None:
+            self._respond(404, b'', None)
+            return
+        body, entry = found
+        if entry['etag'] in self.headers.get('If-None-Match', ''):
+            self._respond(304, b'', entry)
+        else:
+            self._respond(200, body, entry)
+
+    def _respond(self, status, body, entry):
+        self.send_response(status)
+        if entry is not None:
+            self.send_header('ETag', entry['etag'])
+            self.send_header('Cache-Control', CACHE_CONTROL)
+            # Le GeoJSON est chargé par plotly.js (fetch) depuis l'origine du tableau de bord
+            self.send_header('Access-Control-Allow-Origin', '*')
+            if status != 304:
+                self.send_header('Content-Type', entry['type'])
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        self.responses_sent[status] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(bundle, host='127.0.0.1', port=ASSET_PORT):
+    """Démarre le serveur d'assets dans un thread (port libre si le port demandé est pris)"""
+    handler = type('Handler', (AssetRequestHandler,), {
+        'bundle': bundle,
+        'responses_sent': {200: 0, 304: 0, 404: 0}
+    })
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError:
+        # Deuxième tableau de bord sur la même machine
+        server = ThreadingHTTPServer((host, 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@st.cache_resource
+def get_assets():
+    """Bundle construit au démarrage, servi par SKYROCK_ASSET_URL (CDN / proxy), par Streamlit (app/static/),
+    ou par le serveur d'assets sous SKYROCK_ASSET_HOST ; à défaut, embarqué dans la page"""
+    if os.environ.get('SKYROCK_ASSET_URL'):
+        bundle = AssetBundle.build()
+        bundle.base_url = os.environ['SKYROCK_ASSET_URL'].rstrip('/')
+        return bundle
+    if st.get_option('server.enableStaticServing'):
+        # URL relative : même origine (et même préfixe server.baseUrlPath) que la page
+        bundle = AssetBundle.build(build_dir=STATIC_DIR)
+        bundle.base_url = STATIC_URL
+        return bundle
+    # SKYROCK_ASSET_HOST : nom sous lequel les navigateurs joignent ce serveur
+    public_host = os.environ.get('SKYROCK_ASSET_HOST')
+    if not public_host:
+        # Lancé hors du dépôt par exemple (.streamlit/config.toml non lu) : l'option ne peut plus être activée,
+        # Streamlit monte ses routes statiques au démarrage du serveur
+        print("Assets embarqués dans la page (pas de cache navigateur) : activer server.enableStaticServing "
+              "ou définir SKYROCK_ASSET_URL ou SKYROCK_ASSET_HOST", file=sys.stderr)
+        return AssetBundle.build(inline=True)
+    bundle = AssetBundle.build()
+    server = serve(bundle, host='0.0.0.0')
+    bundle.base_url = f"http://{public_host}:{server.server_port}"
+    return bundle
+
+
+def inject_styles(*names):
+    """Feuilles de style du bundle : le navigateur les télécharge une fois, le rerun n'envoie que les @import"""
+    st.markdown(get_assets().stylesheet(*names), unsafe_allow_html=True)
+
+
+def _markdown_bytes(body):
+    """Taille du delta Streamlit d'un st.markdown(body, unsafe_allow_html=True)"""
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = body
+    msg.delta.new_element.markdown.allow_html = True
+    return msg.ByteSize()
+
+
+def _fetch(host, port, paths, headers=None):
+    """Temps de chargement des chemins sur une connexion neuve : (secondes, statuts, octets reçus)"""
+    start = time.perf_counter()
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    statuses, received = [], 0
+    for path in paths:
+        connection.request('GET', path, headers=headers(path) if headers else {})
+        response = connection.getresponse()
+        received += len(response.read())
+        statuses.append(response.status)
+    connection.close()
+    return time.perf_counter() - start, statuses, received
+
+
+def benchmark(reruns=100, rounds=50, remote_logo=True):
+    """Octets envoyés par rerun (CSS en ligne contre @import) et latence de chargement des assets"""
+    import plotly.express as px
+    import pandas as pd
+
+    from stations import REGION_LISTENERS
+
+    bundle = AssetBundle.build()
+    server = serve(bundle, port=0)
+    bundle.base_url = f"http://127.0.0.1:{server.server_port}"
+
+    # 1. Octets par rerun : ce que chaque rerun renvoyait contre ce qu'il envoie maintenant
+    print(f"Octets par rerun (delta Streamlit), sur {reruns} reruns :")
+    with open(os.path.join(SOURCE_DIR, 'regions.geojson'), encoding='utf-8') as f:
+        geojson = json.load(f)
+    df = pd.DataFrame({'Région': list(REGION_LISTENERS), 'Auditeurs': list(REGION_LISTENERS.values())})
+    cases = []
+    for name in ('live.css', 'audience.css'):
+        with open(os.path.join(SOURCE_DIR, name), encoding='utf-8') as f:
+            inline = f"<style>{f.read()}</style>"
+        cases.append((f"CSS {name}", _markdown_bytes(inline), _markdown_bytes(bundle.stylesheet(name)),
+                      bundle.manifest[name]['size']))
+    # Carte : géométrie embarquée dans la figure contre URL chargée par plotly.js
+    figures = [px.scatter_geo(df, geojson=source, locations='Région', featureidkey='properties.nom', size='Auditeurs')
+               for source in (geojson, bundle.url('regions.geojson'))]
+    cases.append(("Carte : géométrie", len(figures[0].to_json()), len(figures[1].to_json()),
+                  bundle.manifest['regions.geojson']['size']))
+    total_before = total_after = total_once = 0
+    for label, before, after, once in cases:
+        total_before, total_after, total_once = total_before + before, total_after + after, total_once + once
+        print(f"  {label:<22} {before:6,} → {after:5,} octets/rerun (asset téléchargé une fois : {once:,} octets)")
+    session_before = total_before * reruns
+    session_after = total_after * reruns + total_once
+    print(f"  Total : {total_before - total_after:,} octets économisés par rerun ; session de {reruns} reruns "
+          f"{session_before:,} → {session_after:,} octets ({1 - session_after / session_before:.0%} de moins)")
+
+    # 2. Premier affichage : chargement à froid, revalidation forcée, cache immuable
+    paths = [f"/{bundle.manifest[name]['file']}" for name in ('live.css', 'skyrock_logo.svg', 'regions.geojson')]
+    cold = sorted(_fetch('127.0.0.1', server.server_port, paths)[0] for _ in range(rounds))
+    etags = {f"/{entry['file']}": entry['etag'] for entry in bundle.manifest.values()}
+    revalidate = sorted(_fetch('127.0.0.1', server.server_port, paths, lambda path: {'If-None-Match': etags[path]})[0]
+                        for _ in range(rounds))
+    _, statuses, received = _fetch('127.0.0.1', server.server_port, paths, lambda path: {'If-None-Match': etags[path]})
+    print(f"Chargement des assets du premier affichage ({len(paths)} fichiers) :")
+    print(f"  à froid (200)           p50 {cold[len(cold) // 2] * 1000:6.2f} ms, max {cold[-1] * 1000:6.2f} ms")
+    print(f"  revalidation ({statuses[0]})     p50 {revalidate[len(revalidate) // 2] * 1000:6.2f} ms ({received} octets reçus)")
+    print(f"  sessions suivantes      0 requête ({CACHE_CONTROL})")
+
+    if remote_logo:
+        # Ancien logo : image distante chargée par le navigateur à chaque affichage de l'en-tête
+        host = 'upload.wikimedia.org'
+        path = '/wikipedia/fr/thumb/6/6b/Skyrock_logo.svg/1200px-Skyrock_logo.svg.png'
+        start = time.perf_counter()
+        try:
+            connection = http.client.HTTPSConnection(host, timeout=5)
+            connection.request('GET', path)
+            response = connection.getresponse()
+            outcome = f"{response.status}, {len(response.read()):,} octets"
+        except OSError as e:
+            outcome = f"échec ({e.__class__.__name__})"
+        print(f"  ancien logo distant     {(time.perf_counter() - start) * 1000:6.0f} ms — {outcome}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assets statiques à empreinte")
+    parser.add_argument('--build', action='store_true', help="construit le bundle (déploiement)")
+    parser.add_argument('--serve', action='store_true', help="sert le bundle (derrière un CDN / proxy)")
+    parser.add_argument('--port', type=int, default=ASSET_PORT)
+    parser.add_argument('--offline', action='store_true', help="sans mesure du logo distant")
+    args = parser.parse_args()
+
+    if args.build or args.serve:
+        bundle = AssetBundle.build()
+        print(json.dumps({name: entry['file'] for name, entry in bundle.manifest.items()}, indent=1))
+        if args.serve:
+            server = serve(bundle, host='0.0.0.0', port=args.port)
+            print(f"Assets servis sur le port {server.server_port}")
+            threading.Event().wait()
+    else:
+        benchmark(remote_logo=not args.offline)
@@ -0,0 +1,110 @@
+# audience_matrix.py
+import numpy as np
+import pandas as pd
+
+
+class AudienceMatrix:
+    """Matrice dense (radio × catégorie) avec vues pandas sans copie"""
+
+    def __init__(self, row_label, col_label, columns, value_names, capacity=16):
+        self.row_label = row_label
+        self.col_label = col_label
+        self.columns = list(columns)
+        self.value_names = list(value_names)
+        self.rows = []
+        self.version = 0
+
+        # Un tableau par mesure : lignes pré-allouées, colonnes exactes pour
+        # que les lignes actives restent contiguës (ravel sans copie)
+        self._values = {
+            name: np.zeros((capacity, len(self.columns)), dtype=np.float64)
+            for name in self.value_names
+        }
+        self._row_index = {}
+        self._views = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _grow_rows(self):
+        """Double la capacité en lignes"""
+        for name, values in self._values.items():
+            grown = np.zeros((values.shape[0] * 2, values.shape[1]), dtype=values.dtype)
+            grown[:len(self.rows)] = values[:len(self.rows)]
+            self._values[name] = grown
+
+    def _touch(self):
+        self.version += 1
+        self._views.clear()
+
+    def set_row(self, row, **values):
+        """Ajoute ou remplace une ligne (une radio) sans toucher aux autres"""
+        if row not in self._row_index:
+            if len(self.rows) == next(iter(self._values.values())).shape[0]:
+                self._grow_rows()
+            self._row_index[row] = len(self.rows)
+            self.rows.append(row)
+
+        i = self._row_index[row]
+        for name in self.value_names:
+            self._values[name][i] = values[name]
+        self._touch()
+
+    def add_column(self, column, **values):
+        """Ajoute une catégorie : seule la nouvelle colonne est calculée"""
+        self.columns.append(column)
+        for name, current in self._values.items():
+            extended = np.zeros((current.shape[0], current.shape[1] + 1), dtype=current.dtype)
+            extended[:, :-1] = current
+            extended[:len(self.rows), -1] = values[name]
+            self._values[name] = extended
+        self._touch()
+
+    def values(self, name):
+        """Vue sur les lignes actives d'une mesure"""
+        return self._values[name][:len(self.rows)]
+
+    def row(self, row, name):
+        """Vue sur une ligne d'une mesure"""
+        return self._values[name][self._row_index[row]]
+
+    def pivot(self, name):
+        """Tableau croisé (radio × catégorie) partageant la mémoire de la matrice"""
+        key = ('pivot', name)
+        if key not in self._views:
+            self._views[key] = pd.DataFrame(
+                self.values(name),
+                index=pd.Index(self.rows, name=self.row_label),
+                columns=pd.Index(self.columns, name=self.col_label),
+                copy=False
+            )
+        return self._views[key]
+
+    def long_frame(self):
+        """Format long (une ligne par couple radio/catégorie) pour Plotly Express"""
+        key = ('long',)
+        if key not in self._views:
+            n_rows, n_cols = len(self.rows), len(self.columns)
+            data = {
+                self.row_label: np.repeat(np.array(self.rows, dtype=object), n_cols),
+                self.col_label: np.tile(np.array(self.columns, dtype=object), n_rows)
+            }
+            for name in self.value_names:
+                # reshape d'un bloc contigu : vue, pas de copie
+                data[name] = self.values(name).reshape(-1)
+            self._views[key] = pd.DataFrame(data, copy=False)
+        return self._views[key]
+
+    def copy(self):
+        """Copie indépendante des tableaux (les vues sont reconstruites à la demande)"""
+        other = AudienceMatrix(self.row_label, self.col_label, self.columns, self.value_names)
+        other.rows = list(self.rows)
+        other.version = self.version
+        other._values = {name: values.copy() for name, values in self._values.items()}
+        other._row_index = dict(self._row_index)
+        return other
+
+    def select(self, rows):
+        """Sous-ensemble du format long pour quelques radios"""
+        df = self.long_frame()
+        return df[df[self.row_label].isin(rows)]
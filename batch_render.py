@@ -0,0 +1,226 @@
+# batch_render.py
+import argparse
+import hashlib
+import html
+import time
+from string import Template
+
+import streamlit as st
+
+from telemetry import cache_lookup
+
+# Gabarits précompilés (un par type de carte)
+TEMPLATES = {
+    'region_card': Template("""
+<div class="metric-card">
+    <h4>#$rank $region</h4>
+    <h3>$count</h3>
+    <p>$percentage% du total</p>
+</div>"""),
+    'track_card': Template("""
+<div style="background: rgba(255,107,0,0.1); padding: 0.8rem; border-radius: 10px; margin: 0.5rem 0;">
+    <strong>#$rank $trend_icon</strong><br>
+    <strong>$artist</strong><br>
+    <small>$title</small><br>
+    <small>📻 $plays diffusions</small>
+</div>"""),
+    'feed_message': Template("""
+<div style="padding: 0.4rem 0; border-bottom: 1px solid rgba(128,128,128,0.3);">
+    <strong>$user</strong> · $time<br>
+    $message<br>
+    ❤️ $likes
+</div>"""),
+    'list_card': Template("""
+<div class="metric-card">
+<h4>$title</h4>
+<ul>$items</ul>
+</div>"""),
+    'alert_card': Template("""
+<div style="border-left: 4px solid #FF4444; padding: 0.4rem 0.8rem; margin: 0.3rem 0; background: rgba(255,68,68,0.08);">
+    $icon <strong>$name</strong> · $value · depuis $since
+</div>"""),
+    'swot_entry': Template("""
+<div style="border-left: 4px solid $color; padding: 10px; margin: 10px 0; background-color: #f8f9fa;">
+<h4 style="color: $color; margin: 0;">$category</h4>
+<p style="margin: 5px 0; white-space: pre-line;">$elements</p>
+</div>"""),
+}
+
+STATS_KEY = '_render_stats'
+CACHE_KEY = '_render_sections'
+
+
+def escape_fields(item):
+    """Échappe les champs texte d'une carte (contenu utilisateur)"""
+    return {key: html.escape(value) if isinstance(value, str) else value for key, value in item.items()}
+
+
+def element_bytes(body):
+    """Taille du delta Streamlit d'un st.markdown (HTML autorisé) de ce contenu"""
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = body
+    msg.delta.new_element.markdown.allow_html = True
+    return msg.ByteSize()
+
+
+def begin_rerun():
+    """Remet à zéro les compteurs du rerun (le rerun précédent reste affiché par le panneau)"""
+    previous = st.session_state.get(STATS_KEY)
+    if previous:
+        previous = {key: value for key, value in previous.items() if key != 'previous'}
+    stats = {
+        'rerun': previous['rerun'] + 1 if previous else 1,
+        'sections': 0,
+        'skipped': 0,
+        'cards': 0,
+        'elements': 0,
+        'bytes': 0,
+        'previous': previous
+    }
+    st.session_state[STATS_KEY] = stats
+    return stats
+
+
+def render_section(key, template, items, header='', footer=''):
+    """Compose une liste de cartes en un seul bloc HTML et l'émet en un seul élément
+
+    Une section inchangée depuis le rerun précédent n'est pas recomposée, mais elle est émise à nouveau :
+    un rerun complet retire de la page tout élément qu'il n'émet pas.
+    """
+    cache = st.session_state.setdefault(CACHE_KEY, {})
+    digest = hashlib.blake2b(repr((template, header, footer, items)).encode('utf-8'), digest_size=16).hexdigest()
+
+    stats = st.session_state.get(STATS_KEY)
+    cached = cache.get(key)
+    cache_lookup('render_section', cached is not None and cached[0] == digest)
+    if cached is not None and cached[0] == digest:
+        # Section inchangée depuis le rerun précédent : pas de recomposition
+        block, size = cached[1], cached[2]
+        if stats is not None:
+            stats['skipped'] += 1
+    else:
+        compiled = TEMPLATES[template]
+        block = header + ''.join(compiled.substitute(item) for item in items) + footer
+        size = element_bytes(block)
+        cache[key] = (digest, block, size)
+
+    if stats is not None:
+        stats['sections'] += 1
+        stats['cards'] += len(items)
+        stats['elements'] += 1
+        stats['bytes'] += size
+
+    st.markdown(block, unsafe_allow_html=True)
+
+
+def render_stats_panel():
+    """Affiche l'instrumentation du rerun précédent (le rerun courant n'est pas terminé)"""
+    stats = st.session_state.get(STATS_KEY)
+    if not stats or not stats['previous']:
+        return
+    previous = stats['previous']
+
+    with st.sidebar.expander("📦 Rendu (rerun précédent)"):
+        st.caption(f"Rerun #{previous['rerun']}")
+        st.metric("Éléments des sections groupées", previous['elements'])
+        st.metric("Octets des sections groupées", f"{previous['bytes']:,}".replace(',', ' '))
+        st.caption(
+            f"{previous['cards']} cartes en {previous['sections']} sections "
+            f"(dont {previous['skipped']} reprises sans recomposition, renvoyées quand même). "
+            f"Rendu carte par carte : python batch_render.py"
+        )
+
+
+def _legacy_page(sections):
+    """Rendu d'avant : un st.markdown par carte ; le flux : conteneur, 2 colonnes, message, bouton, séparateur"""
+    import streamlit as st
+    from batch_render import TEMPLATES
+
+    for template, items in sections:
+        for i, item in enumerate(items):
+            if template == 'feed_message':
+                with st.container():
+                    col1, col2 = st.columns([4, 1])
+                    with col1:
+                        st.markdown(f"""
+                    **{item['user']}** · {item['time']}  
+                    {item['message']}  
+                    ❤️ {item['likes']}
+                    """)
+                    with col2:
+                        st.button("❤️", key=f"like_{i}")
+                    st.markdown("---")
+            else:
+                st.markdown(TEMPLATES[template].substitute(item), unsafe_allow_html=True)
+
+
+def _batched_page(sections):
+    """Rendu groupé : une section = un élément"""
+    from batch_render import begin_rerun, render_section
+
+    begin_rerun()
+    for i, (template, items) in enumerate(sections):
+        render_section(f"section_{i}", template, items)
+
+
+def _measure(page, sections, reruns):
+    """(éléments, octets) émis par page, mesurés sur l'arbre d'éléments produit par Streamlit, et durée par rerun"""
+    from streamlit.proto.Block_pb2 import Block
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.testing.v1 import AppTest
+
+    def walk(node):
+        elements, size = 0, 0
+        for child in node.children.values():
+            msg = ForwardMsg()
+            if hasattr(child, 'children'):
+                if isinstance(child.proto, Block):
+                    msg.delta.add_block.CopyFrom(child.proto)
+                else:
+                    getattr(msg.delta.add_block, child.type).CopyFrom(child.proto)
+                inner = walk(child)
+                elements, size = elements + inner[0], size + inner[1]
+            else:
+                getattr(msg.delta.new_element, child.type).CopyFrom(child.proto)
+            elements, size = elements + 1, size + msg.ByteSize()
+        return elements, size
+
+    app = AppTest.from_function(page, args=(sections,), default_timeout=30)
+    app.run()
+    t = time.perf_counter()
+    for _ in range(reruns):
+        app.run()
+    elapsed = (time.perf_counter() - t) / reruns
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return walk(app.main) + (elapsed,)
+
+
+def benchmark(reruns=20):
+    """Éléments et octets par rerun des listes de cartes du tableau de bord live : carte par carte contre groupé"""
+    sections = [
+        ('region_card', [{'rank': i, 'region': f"Région {i}", 'count': f"{900000 - i * 70000:,}",
+                          'percentage': f"{30 - i * 3:.1f}"} for i in range(1, 6)]),
+        ('track_card', [{'rank': i, 'trend_icon': "🔺", 'artist': f"Artiste {i}", 'title': f"Titre {i}",
+                         'plays': 40 - i} for i in range(1, 6)]),
+        ('feed_message', [escape_fields({'user': f"@auditeur{i}", 'time': f"12:0{i}",
+                                         'message': "Trop bien ce son 🔥 #Skyrock", 'likes': 10 + i})
+                          for i in range(8)]),
+    ]
+    before = _measure(_legacy_page, sections, reruns)
+    after = _measure(_batched_page, sections, reruns)
+    cards = sum(len(items) for _, items in sections)
+    print(f"{cards} cartes en {len(sections)} sections (régions, titres, flux social), moyenne sur {reruns} reruns :")
+    for label, (elements, size, elapsed) in (("carte par carte", before), ("groupé", after)):
+        print(f"  {label:<16} {elements:4d} éléments, {size:7,} octets par rerun, {elapsed * 1000:6.2f} ms de script")
+    print("Octets mesurés sur les protos des éléments produits par Streamlit (deltas sans l'en-tête de chemin) ; "
+          "les sections inchangées sont renvoyées à chaque rerun dans les deux cas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rendu groupé des listes de cartes")
+    parser.add_argument('--reruns', type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.reruns)
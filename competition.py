@@ -0,0 +1,153 @@
+# competition.py
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _ranks(values):
+    """Rang de chaque radio (1 = plus forte audience) dans chaque colonne ; NaN pour les périodes sans donnée"""
+    order = np.argsort(-values, axis=0, kind='stable')
+    ranks = np.empty(values.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, np.arange(1, values.shape[0] + 1, dtype=np.float64)[:, None], axis=0)
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+
+def _growth(values):
+    """Croissance (%) d'une colonne à la suivante ; première colonne NaN"""
+    growth = np.full(values.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth[:, 1:] = (values[:, 1:] - values[:, :-1]) / values[:, :-1] * 100
+    return growth
+
+
+class CompetitiveMatrices:
+    """Matrices (radio × mois) et (radio × année) d'audience, de part de marché, de croissance et de rang"""
+
+    def __init__(self, df, radios=None):
+        # Codes des radios et des périodes : un seul passage sur le jeu de données
+        # (ordre d'affichage imposé par radios, puis radios supplémentaires du jeu de données)
+        names = list(radios or [])
+        known = set(names)
+        names += [name for name in pd.unique(df['radio']) if name not in known]
+        radio_codes = pd.Index(names).get_indexer(df['radio'])
+        month_codes, months = pd.factorize(df['date'], sort=True)
+        year_codes, years = pd.factorize(df['annee'], sort=True)
+        self.radios = names
+        self.index = {radio: i for i, radio in enumerate(self.radios)}
+        self.months = pd.DatetimeIndex(months)
+        self.years = [int(year) for year in years]
+        n_radios = len(self.radios)
+
+        audience = df['audience_millions'].to_numpy(dtype=np.float64)
+        share = df['part_marche_pourcent'].to_numpy(dtype=np.float64)
+        self.monthly_audience = self._mean(radio_codes * len(months) + month_codes, audience, (n_radios, len(months)))
+        self.monthly_share = self._mean(radio_codes * len(months) + month_codes, share, (n_radios, len(months)))
+        self.yearly_audience = self._mean(radio_codes * len(years) + year_codes, audience, (n_radios, len(years)))
+        self.yearly_share = self._mean(radio_codes * len(years) + year_codes, share, (n_radios, len(years)))
+        self.yearly_max = np.full((n_radios, len(years)), np.nan)
+        np.fmax.at(self.yearly_max.reshape(-1), radio_codes * len(years) + year_codes, audience)
+
+        self.mom_growth = _growth(self.monthly_audience)
+        self.yoy_growth = _growth(self.yearly_audience)
+        self.monthly_rank = _ranks(self.monthly_audience)
+        self.yearly_rank = _ranks(self.yearly_audience)
+
+    @staticmethod
+    def _mean(cells, values, shape):
+        """Moyenne par cellule (radio, période) par bincount ; NaN pour les cellules vides"""
+        size = shape[0] * shape[1]
+        sums = np.bincount(cells, weights=values, minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        with np.errstate(invalid='ignore'):
+            return (sums / counts).reshape(shape)
+
+    def _year(self, year):
+        return self.years.index(year)
+
+    def value(self, matrix, radio, year):
+        """Cellule d'une matrice annuelle (yearly_audience, yearly_share, yoy_growth, yearly_rank...)"""
+        return float(matrix[self.index[radio], self._year(year)])
+
+    def ranking(self, year):
+        """Radios de la plus écoutée à la moins écoutée sur l'année"""
+        column = self.yearly_rank[:, self._year(year)]
+        order = np.argsort(column, kind='stable')
+        return [self.radios[i] for i in order[~np.isnan(column[order])]]
+
+    def rank(self, radio, year):
+        return int(self.yearly_rank[self.index[radio], self._year(year)])
+
+    def frame(self, name, radios=None):
+        """Matrice en DataFrame (période × radio), éventuellement limitée à quelques radios"""
+        matrix = getattr(self, name)
+        periods = self.months if name.startswith(('monthly', 'mom')) else pd.Index(self.years, name='annee')
+        df = pd.DataFrame(matrix.T, index=periods, columns=pd.Index(self.radios, name='radio'))
+        return df if radios is None else df[list(radios)]
+
+    def long_frame(self, name, value_name, radios=None):
+        """Format long (période, radio, valeur) pour Plotly Express"""
+        df = self.frame(name, radios)
+        return pd.DataFrame({
+            df.index.name or 'date': np.tile(df.index.to_numpy(), df.shape[1]),
+            'radio': np.repeat(np.array(df.columns, dtype=object), len(df)),
+            value_name: df.to_numpy().T.ravel()
+        })
+
+
+def _panel(n_radios, years, seed=0):
+    """Jeu de données au format du tableau de bord : n_radios × years × 12 mois"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2005-01-01', periods=years * 12, freq='ME')
+    radios = [f"Radio {i + 1}" for i in range(n_radios)]
+    audience = rng.lognormal(0, 0.5, (len(dates), n_radios))
+    df = pd.DataFrame({
+        'date': np.repeat(dates, n_radios),
+        'radio': np.tile(np.array(radios, dtype=object), len(dates)),
+        'audience_millions': audience.ravel(),
+    })
+    df['annee'] = df['date'].dt.year
+    df['part_marche_pourcent'] = (audience / audience.sum(axis=1, keepdims=True) * 100).ravel()
+    return df, radios
+
+
+def benchmark(n_radios=500, years=20):
+    """Construction des matrices en un passage contre les filtres par radio (ancienne méthode)"""
+    df, radios = _panel(n_radios, years)
+    t = time.perf_counter()
+    matrices = CompetitiveMatrices(df, radios)
+    build = time.perf_counter() - t
+    print(f"{n_radios} radios × {years} ans ({len(df):,} lignes) : matrices construites en {build * 1000:.0f} ms")
+
+    # Ancienne méthode : deux masques par radio pour une croissance, un regroupement par classement
+    last = matrices.years[-1]
+    sample = radios[:50]
+    t = time.perf_counter()
+    for radio in sample:
+        current = df[(df['radio'] == radio) & (df['annee'] == last)]['audience_millions'].mean()
+        previous = df[(df['radio'] == radio) & (df['annee'] == last - 1)]['audience_millions'].mean()
+        (current - previous) / previous * 100
+    per_radio = (time.perf_counter() - t) / len(sample)
+    t = time.perf_counter()
+    for year in matrices.years:
+        df[df['annee'] == year].groupby('radio')['audience_millions'].mean().sort_values(ascending=False)
+    per_year = (time.perf_counter() - t) / len(matrices.years)
+    print(f"Ancienne méthode : {per_radio * 1000:.1f} ms par croissance de radio, {per_year * 1000:.1f} ms par classement "
+          f"annuel — toutes les radios et années : {(per_radio * n_radios + per_year * years):.1f} s")
+
+    t = time.perf_counter()
+    for year in matrices.years:
+        matrices.ranking(year)
+    growth = matrices.frame('yoy_growth')
+    bump = matrices.long_frame('yearly_rank', 'rang')
+    print(f"Lectures (tous les classements, croissances et rangs pour le graphique) : "
+          f"{(time.perf_counter() - t) * 1000:.1f} ms — {growth.size:,} croissances, {len(bump):,} points de rang")
+    # Contrôle : mêmes valeurs que les filtres
+    radio = radios[7]
+    expected = df[(df['radio'] == radio) & (df['annee'] == last)]['audience_millions'].mean()
+    assert np.isclose(matrices.value(matrices.yearly_audience, radio, last), expected)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,214 @@
+# decomposition.py
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+
+# En dessous de ce nombre de valeurs, la décomposition reste dans le processus (lancement des workers plus coûteux)
+MIN_PARALLEL_VALUES = 2_000_000
+COMPONENTS = ('trend', 'seasonal', 'resid')
+
+
+def _moving_average(values, period):
+    """Moyenne mobile centrée sur une période (2×période pour une période paire), par sommes cumulées"""
+    rows, n = values.shape
+    cumsum = np.zeros((rows, n + 1))
+    np.cumsum(values, axis=1, out=cumsum[:, 1:])
+    window = (cumsum[:, period:] - cumsum[:, :-period]) / period
+    trend = np.full(values.shape, np.nan)
+    if period % 2:
+        trend[:, period // 2:n - period // 2] = window
+    else:
+        # Deux moyennes décalées d'un pas : poids 1/2 aux extrémités
+        trend[:, period // 2:n - period // 2] = (window[:, :-1] + window[:, 1:]) / 2
+    return trend
+
+
+def classical_decompose(values, period, model='additive'):
+    """Décomposition classique (tendance, saisonnalité, résidu) de chaque ligne d'un tableau (séries × temps)"""
+    values = np.asarray(values, dtype=np.float64)
+    rows, n = values.shape
+    if n < 2 * period:
+        raise ValueError(f"au moins deux périodes complètes requises ({n} < {2 * period})")
+    multiplicative = model == 'multiplicative'
+
+    trend = _moving_average(values, period)
+    detrended = values / trend if multiplicative else values - trend
+    # Indice saisonnier : moyenne de chaque phase sur les cycles, centré (moyenne 0 ou 1)
+    cycles = -(-n // period)
+    padded = np.full((rows, cycles * period), np.nan)
+    padded[:, :n] = detrended
+    index = np.nanmean(padded.reshape(rows, cycles, period), axis=1)
+    if multiplicative:
+        index /= index.mean(axis=1, keepdims=True)
+    else:
+        index -= index.mean(axis=1, keepdims=True)
+    seasonal = np.tile(index, cycles)[:, :n]
+    resid = values / (trend * seasonal) if multiplicative else values - trend - seasonal
+    return trend, seasonal, resid
+
+
+def _decompose_block(task):
+    """Worker : décompose les lignes [start, stop[ du segment partagé et écrit les composantes dans le segment de sortie"""
+    source_name, output_name, shape, start, stop, period, model = task
+    source = shared_memory.SharedMemory(name=source_name)
+    output = shared_memory.SharedMemory(name=output_name)
+    try:
+        values = np.ndarray(shape, dtype=np.float64, buffer=source.buf)
+        components = np.ndarray((len(COMPONENTS),) + shape, dtype=np.float64, buffer=output.buf)
+        for i, component in enumerate(classical_decompose(values[start:stop], period, model)):
+            components[i, start:stop] = component
+        del values, components
+    finally:
+        source.close()
+        output.close()
+    return stop - start
+
+
+class Decomposition:
+    """Composantes de plusieurs séries : tableaux (séries × temps) et vues pandas"""
+
+    def __init__(self, names, index, observed, trend, seasonal, resid, period, model):
+        self.names = list(names)
+        self.index = index
+        self.observed = observed
+        self.trend = trend
+        self.seasonal = seasonal
+        self.resid = resid
+        self.period = period
+        self.model = model
+        self._rows = {name: i for i, name in enumerate(self.names)}
+
+    def seasonal_index(self, name):
+        """Un cycle de l'indice saisonnier (premier cycle de la série)"""
+        return self.seasonal[self._rows[name], :self.period]
+
+    def strength(self):
+        """Force de la saisonnalité et de la tendance (0 à 1) de chaque série, d'après la variance du résidu"""
+        resid = np.log(self.resid) if self.model == 'multiplicative' else self.resid
+        seasonal = np.log(self.seasonal) if self.model == 'multiplicative' else self.seasonal
+        trend = np.log(self.trend) if self.model == 'multiplicative' else self.trend
+        with np.errstate(invalid='ignore', divide='ignore'):
+            season = 1 - np.nanvar(resid, axis=1) / np.nanvar(seasonal + resid, axis=1)
+            tendency = 1 - np.nanvar(resid, axis=1) / np.nanvar(trend + resid, axis=1)
+        return pd.DataFrame({'saisonnalite': np.clip(season, 0, 1), 'tendance': np.clip(tendency, 0, 1)},
+                            index=pd.Index(self.names, name='serie'))
+
+    def long_frame(self, names=None, index_name='date'):
+        """Format long (période, série, observé, tendance, saisonnalité, résidu) pour Plotly Express"""
+        rows = [self._rows[name] for name in (self.names if names is None else names)]
+        return pd.DataFrame({
+            index_name: np.tile(np.asarray(self.index), len(rows)),
+            'serie': np.repeat(np.array([self.names[i] for i in rows], dtype=object), len(self.index)),
+            'observe': self.observed[rows].ravel(),
+            'tendance': self.trend[rows].ravel(),
+            'saisonnalite': self.seasonal[rows].ravel(),
+            'residu': self.resid[rows].ravel()
+        })
+
+
+class DecompositionPool:
+    """Décompose des lots de séries sur des processus workers (données échangées par mémoire partagée)"""
+
+    def __init__(self, workers=None, min_parallel_values=None):
+        self.workers = workers or os.cpu_count() or 1
+        # Par défaut, un seul worker ne passe jamais par le pool (aucun gain, seulement les échanges)
+        if min_parallel_values is None:
+            min_parallel_values = MIN_PARALLEL_VALUES if self.workers > 1 else float('inf')
+        self.min_parallel_values = min_parallel_values
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn : pas de fork d'un serveur Streamlit multi-thread
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=get_context('spawn'))
+        return self._executor
+
+    def start(self):
+        """Lance les workers à l'avance (le premier lot ne paie pas leur démarrage)"""
+        list(self._pool().map(int, range(self.workers)))
+        return self
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def decompose_array(self, values, period, model='additive'):
+        """(tendance, saisonnalité, résidu) des lignes de values, en blocs de lignes répartis sur les workers"""
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        if values.size < self.min_parallel_values:
+            return classical_decompose(values, period, model)
+
+        source = shared_memory.SharedMemory(create=True, size=values.nbytes)
+        output = shared_memory.SharedMemory(create=True, size=values.nbytes * len(COMPONENTS))
+        try:
+            np.ndarray(values.shape, dtype=np.float64, buffer=source.buf)[:] = values
+            # Quelques blocs par worker : les workers finissent ensemble malgré des vitesses inégales
+            bounds = np.linspace(0, len(values), min(len(values), self.workers * 4) + 1).astype(int)
+            tasks = [(source.name, output.name, values.shape, start, stop, period, model)
+                     for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+            list(self._pool().map(_decompose_block, tasks))
+            components = np.ndarray((len(COMPONENTS),) + values.shape, dtype=np.float64, buffer=output.buf).copy()
+        finally:
+            source.close()
+            source.unlink()
+            output.close()
+            output.unlink()
+        return tuple(components)
+
+    def decompose_frame(self, df, period, model='additive'):
+        """Décomposition de chaque colonne d'un tableau large (période × série : radios, régions...)"""
+        observed = df.to_numpy(dtype=np.float64).T
+        trend, seasonal, resid = self.decompose_array(observed, period, model)
+        return Decomposition(df.columns, df.index, observed, trend, seasonal, resid, period, model)
+
+
+def _regional_series(n_series, days, step_minutes=5, seed=0):
+    """Séries d'auditeurs régionaux synthétiques : cycle journalier, tendance lente, bruit"""
+    rng = np.random.default_rng(seed)
+    period = 24 * 60 // step_minutes
+    t = np.arange(days * period)
+    base = rng.uniform(4e4, 9e5, (n_series, 1))
+    daily = 1 + 0.35 * np.sin(2 * np.pi * (t / period - 0.3)) * rng.uniform(0.6, 1.2, (n_series, 1))
+    drift = 1 + rng.normal(0, 0.02, (n_series, 1)) * t / period
+    return base * daily * drift * rng.lognormal(0, 0.05, (n_series, len(t))), period
+
+
+def benchmark(n_series=1000, days=14, repeats=3):
+    """Accélération de la décomposition de n_series séries avec 1 à os.cpu_count() workers"""
+    values, period = _regional_series(n_series, days)
+    print(f"{n_series} séries × {values.shape[1]:,} points (période {period}), {values.nbytes / 1e6:.0f} Mo ; "
+          f"{os.cpu_count()} cœur(s)")
+
+    def best(run):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+
+    serial, reference = best(lambda: classical_decompose(values, period, 'multiplicative'))
+    print(f"  en processus      {serial * 1000:7.0f} ms")
+    counts = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    for workers in [count for count in counts if count <= (os.cpu_count() or 1)]:
+        # min_parallel_values=0 : toujours par le pool, même avec un worker (coût des échanges compris)
+        pool = DecompositionPool(workers, min_parallel_values=0).start()
+        elapsed, result = best(lambda: pool.decompose_array(values, period, 'multiplicative'))
+        pool.close()
+        assert all(np.allclose(a, b, equal_nan=True) for a, b in zip(result, reference))
+        print(f"  {workers:2d} worker(s)      {elapsed * 1000:7.0f} ms — accélération ×{serial / elapsed:.2f} "
+              f"(efficacité {serial / elapsed / workers:.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Décomposition saisonnière des séries en parallèle")
+    parser.add_argument('--series', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=14)
+    args = parser.parse_args()
+    benchmark(args.series, args.days)
@@ -0,0 +1,407 @@
+# event_generator.py
+import argparse
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from sessions import CONNECT, DEVICES, DISCONNECT, ColumnWriter, SessionSummary
+from stations import REGION_LISTENERS, live_base_listeners
+from top_tracks import CATALOG
+
+PLAY = 2
+EVENTS = ['disconnect', 'connect', 'play']
+# Un événement : 16 octets (horodatage ns, auditeur, type, région, support, titre ou -1)
+EVENT_DTYPE = np.dtype([('timestamp', '<i8'), ('listener', '<u4'), ('event', 'u1'), ('region', 'u1'),
+                        ('device', 'u1'), ('track', 'i1')])
+
+# Répartition des supports du tableau de bord live (%)
+DEFAULT_DEVICE_MIX = {'mobile': 65, 'car': 22, 'home': 13}
+# Part de la population connectée au pic de la série live ; rappel vers la cible horaire à chaque lot
+PEAK_CONNECTED = 0.8
+REVERSION = 0.1
+
+
+class EventGenerator:
+    """Population d'auditeurs (connecté ou non, région, support) qui produit des lots d'événements vectorisés"""
+
+    def __init__(self, listeners=3_750_000, regions=None, device_mix=None, play_share=0.6, seed=None):
+        self.rng = np.random.default_rng(seed)
+        regions = dict(REGION_LISTENERS if regions is None else regions)
+        self.regions = list(regions)
+        weights = np.array(list(regions.values()), dtype=np.float64)
+        self.size = listeners
+        self.region = self.rng.choice(len(weights), listeners, p=weights / weights.sum()).astype(np.uint8)
+        self.device = np.zeros(listeners, dtype=np.uint8)
+        self.connected = np.zeros(listeners, dtype=bool)
+        self.online = 0
+        # Dédoublonnage des candidats d'un lot : position de la dernière occurrence de chaque auditeur
+        self._mark = np.zeros(listeners, dtype=np.int64)
+        # device_mix : {support: %} ou fonction heure → {support: %}
+        self.device_mix = device_mix or DEFAULT_DEVICE_MIX
+        base = live_base_listeners()
+        self.target = base / base.max() * PEAK_CONNECTED
+        self.play_share = play_share
+        tracks = np.array([weight for _, _, weight in CATALOG], dtype=np.float64)
+        self.track_cumulative = np.cumsum(tracks / tracks.sum())
+        self.counts = np.zeros(len(EVENTS), dtype=np.int64)
+
+    @classmethod
+    def from_dashboard(cls, dashboard, seed=None):
+        """Générateur calé sur l'état du tableau de bord live : régions, supports, pic du jour"""
+        live = dashboard.live_data
+        mix = {device: live[f'{device}_listeners'] for device in DEVICES}
+        return cls(int(live['peak_today'] / PEAK_CONNECTED), dashboard.geo_data, mix, seed=seed)
+
+    def _device_probabilities(self, hour):
+        mix = self.device_mix(hour) if callable(self.device_mix) else self.device_mix
+        weights = np.array([mix[device] for device in DEVICES], dtype=np.float64)
+        return np.cumsum(weights / weights.sum())
+
+    def start(self, hour):
+        """Population connectée à la cible de l'heure de départ"""
+        self.connected = self.rng.random(self.size) < self.target[hour]
+        self.online = int(self.connected.sum())
+        self.device = np.searchsorted(self._device_probabilities(hour), self.rng.random(self.size)).astype(np.uint8)
+
+    def batch(self, start_ns, span_ns, n):
+        """n événements horodatés dans [start_ns, start_ns + span_ns), triés par instant"""
+        hour = start_ns // 3_600_000_000_000 % 24
+        moves = int(round(n * (1 - self.play_share)))
+        # Connexions et déconnexions : solde qui ramène la population connectée vers la cible horaire
+        delta = np.clip((self.target[hour] * self.size - self.online) * REVERSION, -moves, moves)
+        n_connect = int((moves + delta) / 2)
+        n_disconnect = moves - n_connect
+        n_play = n - moves
+
+        # Candidats tirés au hasard, dédoublonnés (un événement par auditeur et par lot), puis triés selon l'état
+        share = self.online / self.size
+        k = int(max(n_connect / max(1 - share, 0.05), (n_disconnect + n_play) / max(share, 0.05)) * 1.1) + 16
+        candidates = self.rng.integers(0, self.size, k)
+        order = np.arange(k)
+        self._mark[candidates] = order
+        candidates = candidates[self._mark[candidates] == order]
+        state = self.connected[candidates]
+        connect = candidates[~state][:n_connect]
+        on = candidates[state]
+        disconnect = on[:n_disconnect]
+        play = on[n_disconnect:n_disconnect + n_play]
+
+        self.device[connect] = np.searchsorted(self._device_probabilities(hour), self.rng.random(len(connect)))
+        self.connected[connect] = True
+        self.connected[disconnect] = False
+        self.online += len(connect) - len(disconnect)
+
+        listeners = np.concatenate([connect, disconnect, play])
+        kinds = np.repeat(np.array([CONNECT, DISCONNECT, PLAY], dtype=np.uint8),
+                          [len(connect), len(disconnect), len(play)])
+        shuffle = self.rng.permutation(len(listeners))
+        listeners, kinds = listeners[shuffle], kinds[shuffle]
+        events = np.empty(len(listeners), dtype=EVENT_DTYPE)
+        events['timestamp'] = start_ns + np.sort(self.rng.integers(0, span_ns, len(events)))
+        events['listener'] = listeners
+        events['event'] = kinds
+        events['region'] = self.region[listeners]
+        events['device'] = self.device[listeners]
+        events['track'] = -1
+        plays = kinds == PLAY
+        events['track'][plays] = np.searchsorted(self.track_cumulative, self.rng.random(int(plays.sum())))
+        self.counts += np.bincount(kinds, minlength=len(EVENTS))
+        return events
+
+    def run(self, sink, rate, seconds=None, batch_seconds=0.05, start=None, paced=True, report=None):
+        """Émet rate événements/s vers sink (seconds=None : sans fin) ; paced=False : aussi vite que possible"""
+        start = start or datetime.now()
+        clock_ns = int(pd.Timestamp(start).value)
+        span_ns = int(batch_seconds * 1e9)
+        self.start(start.hour)
+        stats = GeneratorStats(rate)
+        carry = 0.0
+        while seconds is None or stats.simulated < seconds:
+            carry += rate * batch_seconds
+            n = int(carry)
+            carry -= n
+            events = self.batch(clock_ns, span_ns, n)
+            t = time.perf_counter()
+            sink.write(events)
+            stats.sink_time += time.perf_counter() - t
+            clock_ns += span_ns
+            stats.add(len(events), batch_seconds)
+            if paced:
+                # Retard sur l'horloge murale (lots trop lents ou sink bloquant) ; sinon attente du lot suivant
+                ahead = stats.simulated - stats.elapsed()
+                stats.lag = max(stats.lag, -ahead)
+                if ahead > 0:
+                    time.sleep(ahead)
+            if report is not None:
+                report(stats)
+        sink.close()
+        stats.counts = dict(zip(EVENTS, self.counts.tolist()))
+        return stats
+
+
+class GeneratorStats:
+    """Débit atteint : événements émis, temps écoulé, retard maximal sur l'horloge murale"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.started = time.perf_counter()
+        self.events = 0
+        self.batches = 0
+        self.simulated = 0.0
+        self.sink_time = 0.0
+        self.lag = 0.0
+        self.counts = {}
+        self._reported = self.started
+        self._reported_events = 0
+
+    def add(self, events, seconds):
+        self.events += events
+        self.batches += 1
+        self.simulated += seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def achieved(self):
+        return self.events / max(self.elapsed(), 1e-9)
+
+    def interval(self, every=1.0):
+        """Débit depuis le dernier appel, au plus une fois par every secondes (None sinon)"""
+        now = time.perf_counter()
+        if now - self._reported < every:
+            return None
+        rate = (self.events - self._reported_events) / (now - self._reported)
+        self._reported, self._reported_events = now, self.events
+        return rate
+
+    def summary(self):
+        elapsed = self.elapsed()
+        return (f"{self.events:,} événements en {elapsed:.1f} s : {self.achieved():,.0f} évts/s "
+                f"(cible {self.rate:,.0f}) ; sink {self.sink_time / elapsed:.0%} du temps, retard max {self.lag:.2f} s")
+
+
+class NullSink:
+    """Lots ignorés (débit maximal du générateur)"""
+
+    def write(self, events):
+        pass
+
+    def close(self):
+        pass
+
+
+class QueueSink:
+    """File en mémoire pour un consommateur du même processus ; file pleine : le générateur attend (contre-pression)"""
+
+    def __init__(self, events_queue=None, maxsize=64):
+        self.queue = events_queue or queue.Queue(maxsize)
+
+    def write(self, events):
+        self.queue.put(events)
+
+    def close(self):
+        self.queue.put(None)
+
+    def __iter__(self):
+        """Lots de la file jusqu'à la fermeture"""
+        while True:
+            events = self.queue.get()
+            if events is None:
+                return
+            yield events
+
+
+class FileSink:
+    """Fichiers events.N.npy (tableaux EVENT_DTYPE) ou events.N.csv (format lu par sessions.py), par rotation"""
+
+    def __init__(self, directory, format='npy', rotate_events=50_000_000):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = format
+        self.rotate_events = rotate_events
+        self.files = []
+        self._writer = None
+        self._rows = 0
+
+    def _open(self):
+        path = os.path.join(self.directory, f"events.{len(self.files)}.{self.format}")
+        self.files.append(path)
+        self._rows = 0
+        if self.format == 'npy':
+            self._writer = ColumnWriter(path, EVENT_DTYPE)
+        else:
+            self._writer = open(path, 'w', encoding='utf-8')
+            self._writer.write('timestamp,listener,event,device,region,track\n')
+
+    def write(self, events):
+        if self._writer is None or self._rows >= self.rotate_events:
+            self.close()
+            self._open()
+        self._rows += len(events)
+        if self.format == 'npy':
+            self._writer.append(events)
+        else:
+            frame = pd.DataFrame({
+                'timestamp': pd.to_datetime(events['timestamp']).strftime('%Y-%m-%d %H:%M:%S.%f'),
+                'listener': events['listener'],
+                'event': np.array(EVENTS)[events['event']],
+                'device': np.array(DEVICES)[events['device']],
+                'region': events['region'],
+                'track': events['track']
+            })
+            frame.to_csv(self._writer, header=False, index=False)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class SocketSink:
+    """Lots envoyés sur une connexion TCP : longueur (4 octets) puis les événements bruts (EVENT_DTYPE)"""
+
+    def __init__(self, host, port):
+        self.socket = socket.create_connection((host, port))
+
+    def write(self, events):
+        payload = events.tobytes()
+        self.socket.sendall(struct.pack('<I', len(payload)) + payload)
+
+    def close(self):
+        self.socket.close()
+
+
+def read_batches(connection):
+    """Lots reçus d'un SocketSink, jusqu'à la fermeture de la connexion"""
+    stream = connection.makefile('rb')
+    while True:
+        header = stream.read(4)
+        if len(header) < 4:
+            return
+        payload = stream.read(struct.unpack('<I', header)[0])
+        yield np.frombuffer(payload, dtype=EVENT_DTYPE)
+
+
+def read_event_files(directory):
+    """Lots écrits par FileSink au format npy (mémoire projetée)"""
+    paths = sorted((path for path in os.listdir(directory) if path.startswith('events.') and path.endswith('.npy')),
+                   key=lambda path: int(path.split('.')[1]))
+    for path in paths:
+        yield np.load(os.path.join(directory, path), mmap_mode='r')
+
+
+def _python_events(generator, n, start_ns, span_ns):
+    """Référence : même tirage, un événement à la fois"""
+    rng, events = generator.rng, []
+    for _ in range(n):
+        listener = int(rng.integers(generator.size))
+        kind = PLAY if generator.connected[listener] and rng.random() < generator.play_share else \
+            DISCONNECT if generator.connected[listener] else CONNECT
+        generator.connected[listener] = kind != DISCONNECT
+        events.append((start_ns + int(rng.integers(span_ns)), listener, kind, generator.region[listener],
+                       generator.device[listener], -1))
+    events.sort()
+    return events
+
+
+def _receiver(server, counter):
+    connection, _ = server.accept()
+    for events in read_batches(connection):
+        counter[0] += len(events)
+    connection.close()
+
+
+def benchmark(seconds=5.0, rate=1_000_000, directory=None):
+    """Débit maximal par sortie (lots non cadencés), puis cadencé à rate événements/s
+    (répertoire temporaire supprimé à la fin si directory n'est pas donné)"""
+    import shutil
+    import tempfile
+
+    owned = directory is None
+    directory = directory or tempfile.mkdtemp(prefix='skyrock_events_')
+    try:
+        _benchmark(seconds, rate, directory)
+    finally:
+        if owned:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _benchmark(seconds, rate, directory):
+    reference = EventGenerator(seed=0)
+    reference.start(20)
+    t = time.perf_counter()
+    _python_events(reference, 100_000, 0, 10 ** 9)
+    print(f"Référence événement par événement : {100_000 / (time.perf_counter() - t):,.0f} évts/s")
+
+    def sinks():
+        yield 'aucune', NullSink(), None
+        events_queue = QueueSink()
+        consumer = threading.Thread(target=lambda: sum(len(events) for events in events_queue), daemon=True)
+        consumer.start()
+        yield 'file en mémoire', events_queue, consumer
+        yield 'fichiers npy', FileSink(os.path.join(directory, 'npy')), None
+        server = socket.create_server(('127.0.0.1', 0))
+        counter = [0]
+        receiver = threading.Thread(target=_receiver, args=(server, counter), daemon=True)
+        receiver.start()
+        yield 'socket TCP', SocketSink(*server.getsockname()), receiver
+
+    print(f"Débit maximal (lots de 50 ms simulés, {seconds:g} s simulées à {rate:,} évts/s) :")
+    for label, sink, consumer in sinks():
+        stats = EventGenerator(seed=1).run(sink, rate, seconds, paced=False)
+        if consumer is not None:
+            consumer.join()
+        print(f"  {label:<16} {stats.achieved():>12,.0f} évts/s, sink {stats.sink_time / stats.elapsed():.0%}")
+    csv = EventGenerator(seed=1).run(FileSink(os.path.join(directory, 'csv'), 'csv'), rate, 1.0, paced=False)
+    print(f"  {'fichiers csv':<16} {csv.achieved():>12,.0f} évts/s, sink {csv.sink_time / csv.elapsed():.0%}")
+
+    stats = EventGenerator(seed=2).run(NullSink(), rate, seconds)
+    print(f"Cadencé : {stats.summary()}")
+    print(f"  types : {stats.counts}")
+
+
+def _report(stats):
+    rate = stats.interval()
+    if rate is not None:
+        print(f"  {stats.simulated:6.1f} s : {rate:,.0f} évts/s (cible {stats.rate:,.0f}), retard max {stats.lag:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Générateur d'événements d'écoute (connexion, déconnexion, lecture)")
+    parser.add_argument('--rate', type=float, default=100_000, help="événements par seconde")
+    parser.add_argument('--seconds', type=float, default=None, help="durée (sans fin par défaut)")
+    parser.add_argument('--listeners', type=int, default=3_750_000, help="population d'auditeurs")
+    parser.add_argument('--sink', choices=['null', 'file', 'socket'], default='null')
+    parser.add_argument('--out', default='events', help="répertoire de sortie (--sink file)")
+    parser.add_argument('--format', choices=['npy', 'csv'], default='npy')
+    parser.add_argument('--connect', default='127.0.0.1:9500', help="hôte:port (--sink socket)")
+    parser.add_argument('--sessions', action='store_true', help="supports par créneau d'après la journée sessionisée")
+    parser.add_argument('--max', action='store_true', help="sans cadence : débit maximal")
+    parser.add_argument('--benchmark', action='store_true')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        summary = SessionSummary.open() if args.sessions else None
+        generator = EventGenerator(args.listeners, device_mix=summary.device_mix if summary else None)
+        if args.sink == 'file':
+            sink = FileSink(args.out, args.format)
+        elif args.sink == 'socket':
+            host, port = args.connect.rsplit(':', 1)
+            sink = SocketSink(host, int(port))
+        else:
+            sink = NullSink()
+        try:
+            stats = generator.run(sink, args.rate, args.seconds, paced=not args.max, report=_report)
+        except KeyboardInterrupt:
+            sink.close()
+        else:
+            print(stats.summary())
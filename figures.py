@@ -0,0 +1,252 @@
+# figures.py
+# Construction des figures des deux tableaux de bord : fonctions de module (appelables dans un worker),
+# données en arguments, figure Plotly en retour
+from startup import lazy_callable, lazy_import
+
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+make_subplots = lazy_callable('plotly.subplots', 'make_subplots')
+
+SKYROCK_COLORS = {'Skyrock': '#FF6B00'}
+
+
+# Évolution temporelle
+
+def monthly_evolution(filtered_data):
+    fig = px.line(filtered_data, x='date', y='audience_millions', color='radio',
+                  title="Évolution Mensuelle de l'Audience (2015-2024)",
+                  labels={'audience_millions': 'Audience (Millions)', 'date': 'Date'},
+                  color_discrete_map=SKYROCK_COLORS)
+    fig.update_layout(height=500, showlegend=True)
+    return fig
+
+
+def yearly_evolution(yearly_avg):
+    fig = px.line(yearly_avg, x='annee', y='audience_millions', color='radio',
+                  title="Évolution Annuelle Moyenne de l'Audience",
+                  labels={'audience_millions': 'Audience Moyenne (Millions)', 'annee': 'Année'},
+                  color_discrete_map=SKYROCK_COLORS)
+    fig.update_layout(height=500, showlegend=True)
+    return fig
+
+
+def market_share_evolution(market_share_avg):
+    fig = px.line(market_share_avg, x='annee', y='part_marche_pourcent', color='radio',
+                  title="Évolution des Parts de Marché (%)",
+                  labels={'part_marche_pourcent': 'Part de Marché (%)', 'annee': 'Année'},
+                  color_discrete_map=SKYROCK_COLORS)
+    fig.update_layout(height=500)
+    return fig
+
+
+def market_share_pie(current_data, year):
+    fig = px.pie(current_data, values='part_marche_pourcent', names='radio',
+                 title=f"Parts de Marché {year}",
+                 color_discrete_sequence=px.colors.qualitative.Set3)
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(height=500)
+    return fig
+
+
+def trend_lines(components):
+    # Tendance (moyenne mobile 2×12) sur la série observée
+    fig = px.line(components, x='date', y='tendance', color='serie',
+                  title="Tendance de l'Audience (hors saisonnalité)",
+                  labels={'tendance': 'Tendance (Millions)', 'date': 'Date', 'serie': 'Radio'},
+                  color_discrete_map=SKYROCK_COLORS)
+    fig.update_layout(height=400)
+    return fig
+
+
+def seasonal_effects(seasonal):
+    fig = px.bar(seasonal, x='mois', y='effet', color='radio', barmode='group',
+                 title="Saisonnalité Mensuelle (écart à la tendance, %)",
+                 labels={'effet': 'Effet saisonnier (%)', 'mois': 'Mois'},
+                 color_discrete_map=SKYROCK_COLORS)
+    fig.update_layout(height=350)
+    return fig
+
+
+# Analyse comparative
+
+def performance_radar(performance_data, radios):
+    fig = go.Figure()
+    for radio in radios:
+        radio_data = performance_data[performance_data['radio'] == radio]
+        fig.add_trace(go.Scatterpolar(
+            r=[radio_data['audience_norm'].values[0], radio_data['market_share_norm'].values[0], 70, 60, 80],
+            theta=['Audience', 'Part Marché', 'Jeunesse', 'Innovation', 'Digital'],
+            fill='toself',
+            name=radio
+        ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100])
+        ),
+        showlegend=True,
+        title="Profil de Performance - Radios Jeunes"
+    )
+    return fig
+
+
+def correlation_heatmap(correlation_matrix):
+    return px.imshow(correlation_matrix,
+                     title="Corrélation des Audiences entre Radios",
+                     color_continuous_scale='RdBu_r',
+                     aspect="auto")
+
+
+def young_audience_bar(young_audience):
+    return px.bar(young_audience, x='radio', y='audience_millions',
+                  title="Audience Moyenne - Radios Jeunes",
+                  color='radio',
+                  color_discrete_map=SKYROCK_COLORS)
+
+
+def growth_bar(growth_df):
+    return px.bar(growth_df, x='radio', y='croissance',
+                  title="Taux de Croissance Annuel (%)",
+                  color='radio',
+                  color_discrete_map=SKYROCK_COLORS)
+
+
+def rank_bump(ranks, first_year, last_year):
+    # Graphique en bosses : Skyrock en trait épais, rang 1 en haut
+    fig = px.line(ranks, x='annee', y='rang', color='radio', markers=True,
+                  title=f"Évolution du Classement ({first_year}-{last_year})",
+                  labels={'rang': 'Rang', 'annee': 'Année'},
+                  color_discrete_map=SKYROCK_COLORS)
+    fig.update_traces(line=dict(width=2))
+    fig.for_each_trace(lambda trace: trace.update(line=dict(width=5)) if trace.name == 'Skyrock' else None)
+    fig.update_yaxes(autorange='reversed', dtick=1)
+    fig.update_layout(height=450)
+    return fig
+
+
+def positioning_scatter(positioning_data):
+    return px.scatter(positioning_data, x='audience_millions', y='part_audience',
+                      size='taille', color='radio', hover_name='radio',
+                      title="Positionnement Stratégique des Radios",
+                      labels={'audience_millions': 'Audience (Millions)', 'part_audience': 'Part Jeune Audience (%)'},
+                      color_discrete_map=SKYROCK_COLORS)
+
+
+# Analyse démographique
+
+def age_distribution(skyrock_demo):
+    fig = px.bar(skyrock_demo, x='part_audience', y='tranche_age', orientation='h',
+                 title="Répartition par Âge - Skyrock",
+                 labels={'part_audience': 'Part d\'Audience (%)', 'tranche_age': 'Tranche d\'Âge'})
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def young_demographics(young_demo):
+    return px.bar(young_demo, x='tranche_age', y='part_audience', color='radio',
+                  title="Comparaison Démographique - Radios Jeunes",
+                  labels={'part_audience': 'Part d\'Audience (%)', 'tranche_age': 'Tranche d\'Âge'},
+                  barmode='group',
+                  color_discrete_map=SKYROCK_COLORS)
+
+
+def time_slot_bar(skyrock_time):
+    return px.bar(skyrock_time, x='creneau_horaire', y='part_audience',
+                  title="Audience par Créneau Horaire - Skyrock",
+                  labels={'part_audience': 'Part d\'Audience (%)', 'creneau_horaire': 'Créneau'})
+
+
+def time_slot_heatmap(time_pivot):
+    return px.imshow(time_pivot,
+                     title="Audience par Créneau Horaire - Toutes Radios",
+                     color_continuous_scale='Viridis',
+                     aspect="auto")
+
+
+def device_mix_by_slot(slots, time_slots):
+    # Supports d'écoute par créneau (part du temps d'écoute)
+    return px.bar(slots, x='libelle', y='part', color='support',
+                  title="Supports d'Écoute par Créneau",
+                  labels={'part': "Part du Temps d'Écoute (%)", 'libelle': 'Créneau', 'support': 'Support'},
+                  category_orders={'libelle': time_slots})
+
+
+def session_lengths(minutes, counts, median_minutes):
+    # Durée des sessions d'écoute, empilée par support
+    fig = go.Figure()
+    for label, values in counts.items():
+        fig.add_trace(go.Bar(x=minutes, y=values, name=label))
+    fig.update_layout(title=f"Durée des Sessions (médiane {median_minutes:.0f} min)",
+                      barmode='stack', xaxis_type='log',
+                      xaxis_title='Durée (minutes, borne haute)', yaxis_title='Sessions')
+    return fig
+
+
+def engagement_profile(profile_df):
+    return px.bar(profile_df, x='Score', y='Catégorie', orientation='h',
+                  title="Score d'Engagement - Audience Skyrock",
+                  color='Score', color_continuous_scale='Viridis')
+
+
+# Simulation what-if
+
+def scenario_audience(baseline_audience, yearly_audience, radio):
+    # Audience annuelle : scénario contre référence
+    fig = go.Figure()
+    for name in dict.fromkeys([radio, 'Skyrock']):
+        color = '#FF6B00' if name == 'Skyrock' else '#1f77b4'
+        fig.add_trace(go.Scatter(x=baseline_audience.index, y=baseline_audience[name], name=f"{name} (référence)",
+                                 line=dict(color=color, dash='dot')))
+        fig.add_trace(go.Scatter(x=yearly_audience.index, y=yearly_audience[name], name=f"{name} (scénario)",
+                                 line=dict(color=color, width=3)))
+    fig.update_layout(title="Audience Annuelle Moyenne : Scénario vs Référence", height=400,
+                      xaxis_title="Année", yaxis_title="Audience (Millions)")
+    return fig
+
+
+def scenario_shares(shares, year):
+    fig = px.bar(shares, x='radio', y='part_marche_pourcent', color='version', barmode='group',
+                 title=f"Parts de Marché {year} (%)",
+                 labels={'part_marche_pourcent': 'Part de Marché (%)', 'radio': 'Radio'},
+                 color_discrete_map={'Référence': '#BBBBBB', 'Scénario': '#FF6B00'})
+    fig.update_layout(height=350)
+    return fig
+
+
+# Tableau de bord live
+
+def region_bubbles(df_regions, geojson_url):
+    # Carte à bulles : géométrie des régions chargée par plotly.js depuis le bundle (pas dans la figure)
+    fig = px.scatter_geo(
+        df_regions,
+        geojson=geojson_url,
+        locations='Région',
+        featureidkey='properties.nom',
+        size='Auditeurs',
+        color='Auditeurs',
+        hover_name='Région',
+        hover_data={'Auditeurs': True, 'Part (%)': True},
+        color_continuous_scale='Oranges',
+        title="Audience par Région"
+    )
+    fig.update_geos(fitbounds='locations', showcountries=True, showland=True, landcolor='#f8f9fa')
+    fig.update_layout(height=500)
+    return fig
+
+
+def device_pie(listen_types):
+    fig = px.pie(
+        values=list(listen_types.values()),
+        names=list(listen_types.keys()),
+        color_discrete_sequence=['#FF6B00', '#FF8C00', '#FFA500']
+    )
+    fig.update_layout(height=250)
+    return fig
+
+
+def show_engagement(df_engagement):
+    fig = px.area(df_engagement, x='time', y='engagement',
+                  title="Engagement moyen pendant l'émission (par 15 min)",
+                  labels={'engagement': 'Taux d\'Engagement (%)', 'time': 'Heure'})
+    fig.update_traces(fillcolor='rgba(255, 107, 0, 0.3)', line_color='#FF6B00')
+    fig.update_layout(height=300)
+    return fig
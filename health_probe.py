@@ -0,0 +1,356 @@
+# health_probe.py
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+
+import numpy as np
+
+# Intervalle nominal entre deux sondes d'un même serveur (secondes)
+PROBE_INTERVAL = 5.0
+PROBE_TIMEOUT = 1.0
+# Dispersion aléatoire des intervalles (évite que toutes les sondes partent ensemble)
+PROBE_JITTER = 0.2
+# Intervalle maximal pour un serveur qui ne répond plus
+MAX_BACKOFF = 60.0
+
+
+def parse_targets(value):
+    """SKYROCK_HEALTH_TARGETS="edge-01=10.0.0.1:8080,edge-02=..." -> {serveur: (hôte, port)}"""
+    targets = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, address = item.partition('=')
+        host, _, port = address.rpartition(':')
+        targets[name] = (host, int(port))
+    return targets
+
+
+class HealthTable:
+    """Table d'état partagée : dernière sonde de chaque serveur, lue par le panneau"""
+
+    def __init__(self, targets):
+        self._lock = threading.Lock()
+        self._rows = {
+            name: {'online': False, 'latency_ms': None, 'status': None, 'error': 'jamais sondé',
+                   'failures': 0, 'last_check': None, 'next_check': None, 'probes': 0}
+            for name in targets
+        }
+
+    def record(self, name, ok, latency, status=None, error=None):
+        with self._lock:
+            row = self._rows[name]
+            row['online'] = ok
+            row['latency_ms'] = None if latency is None else latency * 1000
+            row['status'] = status
+            row['error'] = error
+            row['failures'] = 0 if ok else row['failures'] + 1
+            row['last_check'] = time.time()
+            row['probes'] += 1
+
+    def schedule(self, name, next_check):
+        with self._lock:
+            self._rows[name]['next_check'] = next_check
+
+    def failures(self, name):
+        with self._lock:
+            return self._rows[name]['failures']
+
+    def rows(self):
+        with self._lock:
+            return {name: dict(row) for name, row in self._rows.items()}
+
+    def summary(self):
+        """Serveurs en ligne et latence médiane des sondes réussies"""
+        rows = self.rows()
+        latencies = [row['latency_ms'] for row in rows.values() if row['online']]
+        return {
+            'online': sum(1 for row in rows.values() if row['online']),
+            'total': len(rows),
+            'median_latency_ms': float(np.median(latencies)) if latencies else None,
+            'servers': rows
+        }
+
+
+class ConnectionPool:
+    """Connexions HTTP/1.1 keep-alive réutilisées d'une sonde à l'autre"""
+
+    def __init__(self, max_idle_per_host=2):
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}  # (hôte, port) -> [(reader, writer)]
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self, address):
+        """(reader, writer, réutilisée)"""
+        idle = self._idle.get(address)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.reused += 1
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.open_connection(*address)
+        self.opened += 1
+        return reader, writer, False
+
+    def release(self, address, reader, writer):
+        idle = self._idle.setdefault(address, [])
+        if len(idle) < self.max_idle_per_host and not writer.is_closing():
+            idle.append((reader, writer))
+        else:
+            writer.close()
+
+    def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+async def _request(reader, writer, host, path):
+    """Une requête GET ; retourne (statut, garder la connexion)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode('ascii'))
+    await writer.drain()
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError("connexion fermée par le serveur")
+    status = int(line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+class HealthProber:
+    """Sondes HTTP asynchrones de la flotte : une boucle par serveur, intervalles dispersés, repli exponentiel"""
+
+    def __init__(self, targets, interval=PROBE_INTERVAL, timeout=PROBE_TIMEOUT, jitter=PROBE_JITTER,
+                 max_backoff=MAX_BACKOFF, path='/health', seed=None):
+        self.targets = dict(targets)
+        self.interval = interval
+        self.timeout = timeout
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.path = path
+        self.table = HealthTable(self.targets)
+        self.pool = ConnectionPool()
+        self.rng = random.Random(seed)
+        self._loop = None
+        self._tasks = []
+
+    async def _probe_once(self, address):
+        while True:
+            reader, writer, reused = await self.pool.acquire(address)
+            try:
+                status, keep_alive = await _request(reader, writer, address[0], self.path)
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused:
+                    raise
+                # Connexion inactive fermée côté serveur entre deux sondes : nouvel essai
+            except BaseException:
+                writer.close()
+                raise
+        if keep_alive:
+            self.pool.release(address, reader, writer)
+        else:
+            writer.close()
+        return status
+
+    async def probe(self, name):
+        """Sonde un serveur (délai maximal self.timeout) et enregistre le résultat"""
+        start = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(self._probe_once(self.targets[name]), self.timeout)
+        except asyncio.TimeoutError:
+            self.table.record(name, False, None, error='délai dépassé')
+            return False
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            self.table.record(name, False, None, error=type(e).__name__)
+            return False
+        ok = 200 <= status < 300
+        self.table.record(name, ok, time.perf_counter() - start, status=status,
+                          error=None if ok else f"HTTP {status}")
+        return ok
+
+    async def probe_round(self):
+        """Sonde toute la flotte en parallèle ; durée ≈ un aller-retour, pas n"""
+        start = time.perf_counter()
+        await asyncio.gather(*(self.probe(name) for name in self.targets))
+        return time.perf_counter() - start
+
+    def next_delay(self, name):
+        """Intervalle avant la prochaine sonde : repli exponentiel après échecs, puis dispersion"""
+        failures = self.table.failures(name)
+        delay = self.interval if failures == 0 else min(self.max_backoff, self.interval * 2 ** failures)
+        return delay * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _target_loop(self, name):
+        # Premier passage étalé sur un intervalle
+        await asyncio.sleep(self.rng.uniform(0, self.interval))
+        while True:
+            await self.probe(name)
+            delay = self.next_delay(name)
+            self.table.schedule(name, time.time() + delay)
+            await asyncio.sleep(delay)
+
+    async def run(self, ready=None):
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [asyncio.create_task(self._target_loop(name)) for name in self.targets]
+        if ready is not None:
+            ready.set()
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.pool.close()
+
+    def start_in_thread(self):
+        """Lance les sondes dans un thread (à côté de Streamlit)"""
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.run(ready))
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            for task in self._tasks:
+                self._loop.call_soon_threadsafe(task.cancel)
+
+
+class StandInFleet:
+    """Serveurs HTTP locaux qui simulent la flotte (délai de réponse = aller-retour simulé)"""
+
+    def __init__(self, n_servers=20, delay=0.02, refused=0, hanging=0, host='127.0.0.1'):
+        self.n_servers = n_servers
+        self.delay = delay
+        self.refused = refused
+        self.hanging = hanging
+        self.host = host
+        self.targets = {}
+        self.requests = 0
+        self._servers = []
+
+    async def _handle(self, reader, writer, hang):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                while (await reader.readline()) not in (b'\r\n', b''):
+                    pass
+                if hang:
+                    await asyncio.sleep(3600)
+                await asyncio.sleep(self.delay)
+                self.requests += 1
+                body = b'{"status": "ok"}'
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        for i in range(self.n_servers):
+            name = f"edge-{i + 1:02d}"
+            if i < self.refused:
+                # Port libre sans serveur : connexion refusée
+                with socket.socket() as s:
+                    s.bind((self.host, 0))
+                    port = s.getsockname()[1]
+            else:
+                hang = i < self.refused + self.hanging
+                server = await asyncio.start_server(
+                    lambda r, w, hang=hang: self._handle(r, w, hang), self.host, 0)
+                self._servers.append(server)
+                port = server.sockets[0].getsockname()[1]
+            self.targets[name] = (self.host, port)
+        return self
+
+    def start_in_thread(self):
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        async def main():
+            await self.start()
+            ready.set()
+            await asyncio.Event().wait()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(main())
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        return self
+
+    def close(self):
+        for server in self._servers:
+            server.close()
+
+
+async def _benchmark(fleet_sizes, rtt, rounds):
+    print(f"Aller-retour simulé : {rtt * 1000:.0f} ms")
+    for n in fleet_sizes:
+        fleet = await StandInFleet(n, delay=rtt).start()
+        prober = HealthProber(fleet.targets, timeout=max(1.0, rtt * 10))
+        first = await prober.probe_round()
+        durations = [await prober.probe_round() for _ in range(rounds)]
+        summary = prober.table.summary()
+        print(f"{n:>4} serveurs : 1er tour {first * 1000:6.1f} ms, tours suivants {np.mean(durations) * 1000:6.1f} ms "
+              f"(max {max(durations) * 1000:.1f}) — {summary['online']}/{summary['total']} en ligne, "
+              f"connexions ouvertes {prober.pool.opened}, réutilisées {prober.pool.reused}")
+        prober.pool.close()
+        fleet.close()
+
+    # Serveurs morts : le tour est borné par le délai, les sondes s'espacent
+    fleet = await StandInFleet(20, delay=rtt, refused=1, hanging=1).start()
+    prober = HealthProber(fleet.targets, interval=0.2, timeout=0.3, max_backoff=2.0, seed=1)
+    print(f"Tour avec 2 serveurs morts (délai 300 ms) : {await prober.probe_round() * 1000:.1f} ms")
+    task = asyncio.create_task(prober.run())
+    await asyncio.sleep(5)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    rows = prober.table.rows()
+    alive = [row['probes'] for row in rows.values() if row['online']]
+    dead = {name: (row['probes'], row['error']) for name, row in rows.items() if not row['online']}
+    print(f"Sondes en 5 s (intervalle 200 ms) : {np.mean(alive):.1f} par serveur vivant, morts {dead}")
+    fleet.close()
+
+
+def benchmark(fleet_sizes=(20, 100, 500), rtt=0.05, rounds=5):
+    """Durée d'un tour de sondes selon la taille de la flotte, contre des serveurs locaux"""
+    asyncio.run(_benchmark(fleet_sizes, rtt, rounds))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sondes de santé de la flotte de streaming")
+    parser.add_argument('targets', nargs='?', help='edge-01=hôte:port,edge-02=...')
+    parser.add_argument('--interval', type=float, default=PROBE_INTERVAL)
+    args = parser.parse_args()
+
+    if args.targets:
+        prober = HealthProber(parse_targets(args.targets), interval=args.interval).start_in_thread()
+        while True:
+            time.sleep(args.interval)
+            summary = prober.table.summary()
+            print(f"{summary['online']}/{summary['total']} en ligne, latence médiane {summary['median_latency_ms']}")
+    else:
+        benchmark()
@@ -0,0 +1,167 @@
+# live_chart.py
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import timedelta
+
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+from assets import BUILD_DIR, ROOT, vendor_sources
+
+# Page du composant (versionnée) et répertoire servi par Streamlit : page et plotly.js côte à côte
+SOURCE_DIR = os.path.join(ROOT, 'components', 'live_chart')
+COMPONENT_DIR = os.path.join(BUILD_DIR, 'live_chart')
+
+
+def iso_times(timestamps):
+    """Horodatages au format des figures Plotly (ISO, millisecondes)"""
+    return [value[:23] for value in pd.DatetimeIndex(timestamps).strftime('%Y-%m-%dT%H:%M:%S.%f')]
+
+
+def build_component(source_dir=SOURCE_DIR, directory=COMPONENT_DIR):
+    """Copie la page et plotly.js dans le répertoire du composant ; chemin relatif de plotly.js (à empreinte)"""
+    os.makedirs(directory, exist_ok=True)
+    files = {name: os.path.join(source_dir, name) for name in os.listdir(source_dir)}
+    files.update(vendor_sources())
+    for name, path in files.items():
+        # Remplacement atomique : un autre processus peut servir le fichier pendant la copie
+        target = os.path.join(directory, name)
+        shutil.copyfile(path, target + '.tmp')
+        os.replace(target + '.tmp', target)
+    with open(os.path.join(directory, 'plotly.min.js'), 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    # Streamlit sert les scripts des composants en « Cache-Control: public » : la version change l'URL
+    return f"plotly.min.js?v={digest}"
+
+
+@st.cache_resource
+def _component():
+    """Composant servi par Streamlit depuis son répertoire (même origine que le tableau de bord)"""
+    plotly = build_component()
+    return components.declare_component('live_chart', path=COMPONENT_DIR), plotly
+
+
+class LiveChartStream:
+    """Points déjà affichés par le navigateur : figure complète une fois, puis lots de nouveaux points"""
+
+    def __init__(self, columns):
+        # Une trace par colonne, dans l'ordre de la figure
+        self.columns = list(columns)
+        self.epoch = 0
+        self.seq = 0
+        self.last_x = None
+        self.resync = None
+        self.points = None
+        self.args = None
+        self.sent = {'full': 0, 'delta': 0}
+
+    def update(self, frame, window_start, window_end, build_figure, resync=None):
+        """Arguments du composant pour ce rendu (inchangés s'il n'y a aucun nouveau point)"""
+        frame = frame.sort_values('timestamp')
+        newest = frame['timestamp'].iloc[-1] if len(frame) else None
+        if self.last_x is None or (newest is not None and newest < self.last_x):
+            # Premier rendu, ou retour en arrière (nouvelle boucle du rejeu, autre écrivain)
+            self.points = frame
+        elif resync is not None and resync != self.resync:
+            # Le navigateur a perdu la figure (iframe remontée, lot manqué)
+            self.points = pd.concat([self.points, frame[frame['timestamp'] > self.last_x]], ignore_index=True)
+        else:
+            fresh = frame[frame['timestamp'] > self.last_x]
+            if fresh.empty:
+                return self.args
+            self.points = pd.concat([self.points, fresh], ignore_index=True)
+            self.points = self.points[self.points['timestamp'] >= window_start]
+            self.last_x = fresh['timestamp'].iloc[-1]
+            self.seq += 1
+            self.sent['delta'] += 1
+            self.args = {
+                'epoch': self.epoch, 'seq': self.seq, 'base': self.seq - 1,
+                'x': iso_times(fresh['timestamp']),
+                'y': [fresh[column].tolist() for column in self.columns],
+                'window': iso_times([window_start, window_end])
+            }
+            return self.args
+
+        self.resync = resync
+        self.points = self.points[self.points['timestamp'] >= window_start].reset_index(drop=True)
+        self.last_x = self.points['timestamp'].iloc[-1]
+        self.epoch += 1
+        self.seq = 0
+        self.sent['full'] += 1
+        self.args = {
+            'epoch': self.epoch, 'seq': 0,
+            'figure': build_figure(self.points).to_json(),
+            'window': iso_times([window_start, window_end])
+        }
+        return self.args
+
+
+def stream_chart(key, frame, columns, build_figure, window, height=500):
+    """Graphique résident dans le navigateur ; frame : points de la fenêtre (timestamp + une colonne par trace)"""
+    stream = st.session_state.get(f'{key}_stream')
+    if stream is None:
+        stream = st.session_state[f'{key}_stream'] = LiveChartStream(columns)
+    request = st.session_state.get(key)
+    args = stream.update(frame, window[0], window[1], build_figure, request and request.get('resync'))
+    component, plotly = _component()
+    component(key=key, default=None, plotly=plotly, height=height, **args)
+
+
+def _element_bytes(kind, **fields):
+    """Taille du delta Streamlit d'un élément (plotly_chart ou component_instance)"""
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    msg = ForwardMsg()
+    element = getattr(msg.delta.new_element, kind)
+    for name, value in fields.items():
+        setattr(element, name, value)
+    return msg.ByteSize()
+
+
+def benchmark(ticks=300, interval=1.0):
+    """Octets par rafraîchissement et coût serveur : figure entière à chaque rerun contre lots de points"""
+    from DLive import SkyrockLiveDashboard
+
+    dashboard = SkyrockLiveDashboard()
+    stream = LiveChartStream(['listeners', 'engagement'])
+    start = dashboard.now()
+    full_bytes, stream_bytes, full_time, stream_time = [], [], 0.0, 0.0
+    for tick in range(ticks):
+        dashboard.virtual_now = start + timedelta(seconds=tick * interval)
+        dashboard.update_live_data()
+        now = dashboard.now()
+        recent = dashboard.realtime_frame()
+
+        # Avant : figure reconstruite et sérialisée à chaque rerun
+        t = time.perf_counter()
+        spec = dashboard.build_realtime_figure(recent).to_json()
+        full_time += time.perf_counter() - t
+        full_bytes.append(_element_bytes('plotly_chart', spec=spec))
+
+        # Après : arguments du composant (figure complète au premier rendu seulement)
+        t = time.perf_counter()
+        args = stream.update(recent, now - timedelta(hours=6), now, dashboard.build_realtime_figure)
+        payload = json.dumps({'plotly': 'plotly.min.js?v=0123456789ab', 'height': 500, **args})
+        stream_time += time.perf_counter() - t
+        stream_bytes.append(_element_bytes('component_instance', json_args=payload, component_name='live_chart.live_chart'))
+
+    steady = sorted(stream_bytes[1:])
+    print(f"{ticks} rafraîchissements à {interval:g} s ({len(recent)} points affichés en fin de série) :")
+    print(f"  figure entière   {sum(full_bytes) / ticks:9,.0f} octets/tick, {full_time / ticks * 1000:6.2f} ms serveur/tick")
+    print(f"  lots de points   {steady[len(steady) // 2]:9,.0f} octets/tick (p50), premier rendu {stream_bytes[0]:,} octets, "
+          f"{stream_time / ticks * 1000:6.2f} ms serveur/tick")
+    print(f"  session : {sum(full_bytes):,} → {sum(stream_bytes):,} octets "
+          f"({1 - sum(stream_bytes) / sum(full_bytes):.1%} de moins) ; figures complètes envoyées : {stream.sent['full']}")
+    print("  Temps de trame côté navigateur : affiché sous le graphique (p50/p95 des lots, window.liveChartFrames)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Graphique live : octets par rafraîchissement")
+    parser.add_argument('--ticks', type=int, default=300)
+    args = parser.parse_args()
+    benchmark(args.ticks)
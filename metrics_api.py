@@ -0,0 +1,381 @@
+# metrics_api.py
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+# Au-delà de ce nombre de points, la série est envoyée en flux (chunked)
+STREAM_THRESHOLD = 288  # un jour à 5 minutes
+STREAM_CHUNK_POINTS = 96
+# Compression seulement si le corps dépasse cette taille
+GZIP_MIN_BYTES = 1024
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ResponseCache:
+    """Cache LRU des corps de réponse, clé incluant la version de l'état live"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body):
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class MetricsAPI:
+    """API JSON locale (asyncio) sur l'état live persisté : producteur du processus (source)
+    ou état partagé entre workers (shared, SharedLiveState)"""
+
+    def __init__(self, source=None, shared=None):
+        from DLive import LiveStateReader
+
+        # Lecteur propre à l'API, rechargé sur la boucle d'événements ; l'état avance ailleurs
+        self.reader = LiveStateReader(source, shared)
+        self.dashboard = self.reader.dashboard
+        self.cache = ResponseCache()
+        self.requests = 0
+        self._series_source = None
+        self._server = None
+
+    # --- Données -------------------------------------------------------
+
+    def refresh(self):
+        """Recharge l'état live s'il a avancé depuis la requête précédente"""
+        if not self.reader.refresh():
+            raise ApiError(503, "état live pas encore publié")
+
+    def _series(self):
+        """Colonnes numpy de la série d'auditeurs (reconstruites si le DataFrame change)"""
+        df = self.dashboard.historical_data
+        if self._series_source is not df:
+            self._series_source = df
+            timestamps = pd.to_datetime(df['timestamp']).to_numpy(dtype='datetime64[s]')
+            self._series_cols = (
+                timestamps,
+                np.datetime_as_string(timestamps).tolist(),
+                df['listeners'].to_numpy(),
+                df['engagement'].to_numpy(),
+                df['mobile_percent'].to_numpy()
+            )
+        return self._series_cols
+
+    def _range(self, query):
+        timestamps = self._series()[0]
+        try:
+            start = np.datetime64(query['from'][0], 's') if 'from' in query else timestamps[0]
+            end = np.datetime64(query['to'][0], 's') if 'to' in query else timestamps[-1]
+        except ValueError:
+            raise ApiError(400, "paramètres from/to invalides (ISO 8601 attendu)")
+        # Recherche dichotomique sur la série triée
+        return int(np.searchsorted(timestamps, start, 'left')), int(np.searchsorted(timestamps, end, 'right'))
+
+    def _series_rows(self, lo, hi):
+        _, labels, listeners, engagement, mobile = self._series()
+        return [
+            [labels[i], int(listeners[i]), int(engagement[i]), int(mobile[i])]
+            for i in range(lo, hi)
+        ]
+
+    def snapshot(self, query):
+        return self.dashboard.snapshot()
+
+    def regions(self, query):
+        geo = self.dashboard.geo_data
+        total = sum(geo.values())
+        return {
+            'version': self.dashboard.version,
+            'total': total,
+            'regions': [
+                {'region': region, 'listeners': count, 'share': round(count / total * 100, 2)}
+                for region, count in sorted(geo.items(), key=lambda x: x[1], reverse=True)
+            ]
+        }
+
+    def listeners(self, query, lo, hi):
+        return {
+            'version': self.dashboard.version,
+            'columns': ['timestamp', 'listeners', 'engagement', 'mobile_percent'],
+            'points': self._series_rows(lo, hi)
+        }
+
+    # --- HTTP ----------------------------------------------------------
+
+    def _body(self, route, query):
+        if route == '/api/snapshot':
+            return self.snapshot(query)
+        if route == '/api/regions':
+            return self.regions(query)
+        raise ApiError(404, "route inconnue")
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                self.requests += 1
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                gzip_ok = 'gzip' in headers.get('accept-encoding', '')
+                try:
+                    if method != 'GET':
+                        raise ApiError(405, "GET uniquement")
+                    await self._dispatch(writer, target, gzip_ok)
+                except ApiError as error:
+                    body = json.dumps({'error': str(error)}, ensure_ascii=False).encode('utf-8')
+                    self._write_head(writer, error.status, len(body), False)
+                    writer.write(body)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer, target, gzip_ok):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        self.refresh()
+
+        if url.path == '/api/listeners':
+            lo, hi = self._range(query)
+            key = (url.path, lo, hi, self.dashboard.version, gzip_ok)
+            body = self.cache.get(key)
+            if hi - lo > STREAM_THRESHOLD:
+                if body is None:
+                    body = await self._stream_listeners(writer, lo, hi, gzip_ok)
+                    self.cache.put(key, body)
+                else:
+                    # Morceaux déjà encodés pour cette version : simple réémission
+                    self._write_head(writer, 200, None, gzip_ok, chunked=True)
+                    writer.writelines(body)
+                return
+            if body is None:
+                body = self._encode(self.listeners(query, lo, hi), gzip_ok)
+                self.cache.put(key, body)
+        else:
+            key = (url.path, url.query, self.dashboard.version, gzip_ok)
+            body = self.cache.get(key)
+            if body is None:
+                body = self._encode(self._body(url.path, query), gzip_ok)
+                self.cache.put(key, body)
+
+        data, compressed = body
+        self._write_head(writer, 200, len(data), compressed)
+        writer.write(data)
+
+    def _encode(self, payload, gzip_ok):
+        data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if gzip_ok and len(data) >= GZIP_MIN_BYTES:
+            return gzip.compress(data, compresslevel=5), True
+        return data, False
+
+    def _write_head(self, writer, status, length, compressed, chunked=False):
+        head = [
+            f"HTTP/1.1 {status} {REASONS[status]}",
+            "Content-Type: application/json; charset=utf-8",
+            "Cache-Control: no-cache"
+        ]
+        if compressed:
+            head.append("Content-Encoding: gzip")
+        head.append("Transfer-Encoding: chunked" if chunked else f"Content-Length: {length}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+
+    async def _stream_listeners(self, writer, lo, hi, gzip_ok):
+        """Grandes plages : JSON produit et compressé par morceaux, envoyés au fil de l'eau"""
+        compressor = zlib.compressobj(5, zlib.DEFLATED, 31) if gzip_ok else None
+        chunks = []
+
+        def send(data, final=False):
+            if compressor is not None:
+                data = compressor.compress(data) + (compressor.flush() if final else b'')
+            if data:
+                chunks.append(b"%x\r\n%s\r\n" % (len(data), data))
+                writer.write(chunks[-1])
+
+        self._write_head(writer, 200, None, gzip_ok, chunked=True)
+        send(('{"version":%d,"columns":["timestamp","listeners","engagement","mobile_percent"],"points":['
+              % self.dashboard.version).encode('utf-8'))
+        for start in range(lo, hi, STREAM_CHUNK_POINTS):
+            rows = self._series_rows(start, min(start + STREAM_CHUNK_POINTS, hi))
+            chunk = json.dumps(rows, separators=(',', ':'))[1:-1]
+            send(((',' if start > lo else '') + chunk).encode('utf-8'))
+            await writer.drain()
+        send(b']}', final=True)
+        chunks.append(b"0\r\n\r\n")
+        writer.write(chunks[-1])
+        return chunks
+
+    # --- Cycle de vie ----------------------------------------------------
+
+    async def serve(self, host='127.0.0.1', port=8503, ready=None, reuse_port=False):
+        """Sert l'API jusqu'à annulation ; reuse_port : port partagé par les workers (état partagé)"""
+        self._server = await asyncio.start_server(self._handle, host, port, reuse_port=reuse_port)
+        if ready is not None:
+            ready.set()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self, host='127.0.0.1', port=8503, reuse_port=False):
+        """Lance l'API dans un thread (à côté de Streamlit ou d'un autre processus)"""
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.serve(host, port, ready, reuse_port))
+            except OSError as error:
+                # Port occupé : remonté à l'appelant plutôt qu'un thread qui meurt en silence
+                errors.append(error)
+                ready.set()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return loop
+
+
+def standalone_api(interval):
+    """API hors Streamlit : lit l'état partagé (SKYROCK_SHARED_STATE) s'il est configuré,
+    sinon un producteur local avancé toutes les interval secondes dans un thread"""
+    if os.environ.get('SKYROCK_SHARED_STATE'):
+        from shared_state import SharedLiveState
+        return MetricsAPI(shared=SharedLiveState(os.environ['SKYROCK_SHARED_STATE']))
+    from DLive import SkyrockLiveDashboard
+    return MetricsAPI(SkyrockLiveDashboard().start(interval))
+
+
+async def _client(host, port, paths, rate, duration, connections):
+    """Client en boucle ouverte : rate requêtes/s réparties sur des connexions persistantes"""
+    queue = asyncio.Queue()
+    latencies = []
+    errors = 0
+    body_bytes = 0
+
+    async def worker():
+        nonlocal errors, body_bytes
+        reader, writer = await asyncio.open_connection(host, port)
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            scheduled, path = item
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n\r\n".encode('ascii'))
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line == b'\r\n':
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if 'content-length' in headers:
+                body_bytes += len(await reader.readexactly(int(headers['content-length'])))
+            else:
+                while True:
+                    size = int((await reader.readline()).strip(), 16)
+                    body_bytes += len(await reader.readexactly(size + 2)) - 2
+                    if size == 0:
+                        break
+            if status != 200:
+                errors += 1
+            # Latence mesurée depuis l'instant prévu (pas de biais de coordination)
+            latencies.append(time.perf_counter() - scheduled)
+        writer.close()
+
+    workers = [asyncio.create_task(worker()) for _ in range(connections)]
+    start = time.perf_counter()
+    total = int(rate * duration)
+    for i in range(total):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        queue.put_nowait((scheduled, paths[i % len(paths)]))
+    for _ in workers:
+        queue.put_nowait(None)
+    await asyncio.gather(*workers)
+    return latencies, errors, body_bytes, time.perf_counter() - start
+
+
+def benchmark(rate=1000, duration=10.0, connections=32, port=8598):
+    """Latence et débit à rate requêtes/s avec un client local"""
+    api = standalone_api(1.0)
+    api.refresh()
+    api.start_in_thread(port=port)
+    series = api.dashboard.historical_data['timestamp']
+    mid = series.iloc[len(series) // 2].strftime('%Y-%m-%dT%H:%M:%S')
+    end = series.iloc[-1].strftime('%Y-%m-%dT%H:%M:%S')
+    paths = [
+        '/api/snapshot',
+        '/api/regions',
+        f'/api/listeners?from={mid}&to={end}',
+        '/api/snapshot',
+        '/api/listeners',
+    ]
+
+    latencies, errors, body_bytes, elapsed = asyncio.run(_client('127.0.0.1', port, paths, rate, duration, connections))
+    latencies = np.array(latencies) * 1000
+    print(f"Requêtes : {len(latencies)} en {elapsed:.1f}s ({len(latencies) / elapsed:,.0f}/s, cible {rate}/s), erreurs : {errors}")
+    print("Latence (ms) : p50 {:.2f}, p95 {:.2f}, p99 {:.2f}, max {:.2f}".format(
+        *np.percentile(latencies, [50, 95, 99]), latencies.max()))
+    print(f"Octets reçus : {body_bytes:,} — cache : {api.cache.hits} succès, {api.cache.misses} échecs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API JSON locale des métriques live")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8503)
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help="mise à jour de l'état live du producteur local (secondes, sans SKYROCK_SHARED_STATE)")
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--rate', type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(rate=args.rate)
+    else:
+        print(f"API sur http://{args.host}:{args.port}/api/snapshot")
+        asyncio.run(standalone_api(args.interval).serve(args.host, args.port))
@@ -0,0 +1,314 @@
+# reach.py
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from event_generator import EventGenerator
+from schedule import MINUTES_PER_WEEK
+from sessions import DISCONNECT
+
+BUCKET_SECONDS = 300  # seaux de 5 minutes
+DAY_SECONDS = 86400
+# Le 1er janvier 1970 était un jeudi : décalage des minutes epoch vers les minutes de la semaine (lundi 0h)
+EPOCH_WEEK_MINUTES = 3 * 1440
+# Flux d'événements du tableau de bord live (événements/s) et rattrapage des jours passés au démarrage
+LIVE_EVENT_RATE = 1000
+BACKFILL_EVENT_RATE = 2
+
+
+def wall_seconds(moment):
+    """Heure murale en secondes, dans la convention des horodatages du générateur (jours de l'heure locale)"""
+    return pd.Timestamp(moment).value / 1e9
+
+
+def hash_ids(ids):
+    """Empreintes 64 bits des identifiants d'auditeurs (entiers : splitmix64, sinon hash pandas)"""
+    ids = np.asarray(ids)
+    if ids.dtype.kind in 'iu':
+        x = ids.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+    return pd.util.hash_array(ids.astype(object))
+
+
+class HyperLogLog:
+    """Sketch HyperLogLog (registres uint8), fusionnable par maximum registre à registre"""
+
+    def __init__(self, precision=12, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision doit être entre 4 et 16")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8) if registers is None else registers
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes
+
+    @property
+    def standard_error(self):
+        return 1.04 / np.sqrt(self.m)
+
+    def add_hashes(self, hashes):
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        # Les 64-p bits restants tiennent dans un float64 : frexp donne leur longueur exacte
+        remainder = (hashes & np.uint64((1 << (64 - p)) - 1)).astype(np.float64)
+        rank = (64 - p + 1 - np.frexp(remainder)[1]).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def add(self, ids):
+        self.add_hashes(hash_ids(ids))
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("fusion de sketches de précisions différentes")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self):
+        return HyperLogLog(self.precision, self.registers.copy())
+
+    @classmethod
+    def union(cls, sketches, precision=12):
+        """Fusion d'une liste de sketches (réduction vectorisée)"""
+        sketches = list(sketches)
+        if not sketches:
+            return cls(precision)
+        return cls(sketches[0].precision, np.maximum.reduce([sketch.registers for sketch in sketches]))
+
+    def estimate(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Petites cardinalités : comptage linéaire
+            return m * np.log(m / zeros)
+        return float(raw)
+
+
+class ReachTracker:
+    """Audience cumulée (auditeurs distincts) par seau de 5 min, par région et par émission"""
+
+    def __init__(self, precision=12, retention_days=7):
+        self.precision = precision
+        self.retention_days = retention_days
+        self.buckets = {}  # seau de 5 min -> sketch
+        self.regions = {}  # (région, jour) -> sketch
+        self.shows = {}  # (émission, jour) -> sketch
+        self.events = 0
+        # Ingestion par le thread du flux, lectures par les reruns
+        self._lock = threading.Lock()
+
+    def _sketch(self, table, key):
+        sketch = table.get(key)
+        if sketch is None:
+            sketch = table[key] = HyperLogLog(self.precision)
+        return sketch
+
+    def _add_grouped(self, table, keys, hashes, key_fn):
+        """Ajoute les empreintes groupées par clé (un appel vectorisé par groupe)"""
+        codes, uniques = pd.factorize(keys)
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        for group in np.split(order, boundaries):
+            if len(group):
+                self._sketch(table, key_fn(uniques[codes[group[0]]])).add_hashes(hashes[group])
+
+    def ingest(self, listener_ids, timestamps, regions=None, shows=None):
+        """Intègre un lot d'événements d'écoute (tableaux parallèles, timestamps en secondes epoch)"""
+        hashes = hash_ids(listener_ids)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        bucket_ids = (timestamps // BUCKET_SECONDS).astype(np.int64)
+        days = (timestamps // DAY_SECONDS).astype(np.int64)
+
+        with self._lock:
+            self._add_grouped(self.buckets, bucket_ids, hashes, int)
+            if regions is not None:
+                keys = pd.Series(np.asarray(regions, dtype=object)) + '|' + pd.Series(days).astype(str)
+                self._add_grouped(self.regions, keys.to_numpy(), hashes, self._split_key)
+            if shows is not None:
+                keys = pd.Series(np.asarray(shows, dtype=object)) + '|' + pd.Series(days).astype(str)
+                self._add_grouped(self.shows, keys.to_numpy(), hashes, self._split_key)
+            self.events += len(hashes)
+            self.expire(timestamps.max())
+
+    @staticmethod
+    def _split_key(key):
+        name, day = key.rsplit('|', 1)
+        return name, int(day)
+
+    def expire(self, now=None):
+        """Supprime les sketches hors rétention"""
+        now = wall_seconds(datetime.now()) if now is None else now
+        oldest_day = int(now // DAY_SECONDS) - self.retention_days + 1
+        oldest_bucket = oldest_day * DAY_SECONDS // BUCKET_SECONDS
+        for bucket_id in [b for b in self.buckets if b < oldest_bucket]:
+            del self.buckets[bucket_id]
+        for table in (self.regions, self.shows):
+            for key in [key for key in table if key[1] < oldest_day]:
+                del table[key]
+
+    def reach(self, start, end):
+        """Auditeurs distincts entre start et end (secondes epoch) : fusion des seaux"""
+        first, last = int(start // BUCKET_SECONDS), int(end // BUCKET_SECONDS)
+        with self._lock:
+            merged = HyperLogLog.union([sketch for bucket_id, sketch in self.buckets.items()
+                                        if first <= bucket_id <= last], self.precision)
+        return merged.estimate()
+
+    def daily_reach(self, day=None):
+        day = datetime.now() if day is None else day
+        start = wall_seconds(datetime(day.year, day.month, day.day))
+        return self.reach(start, start + DAY_SECONDS - 1)
+
+    def _entity_reach(self, table, name, days, now):
+        today = int((wall_seconds(datetime.now()) if now is None else now) // DAY_SECONDS)
+        with self._lock:
+            merged = HyperLogLog.union([table[(name, d)] for d in range(today - days + 1, today + 1)
+                                        if (name, d) in table], self.precision)
+        return merged.estimate()
+
+    def region_reach(self, region, days=1, now=None):
+        return self._entity_reach(self.regions, region, days, now)
+
+    def show_reach(self, show, days=7, now=None):
+        return self._entity_reach(self.shows, show, days, now)
+
+    def reach_table(self, names, kind='regions', now=None):
+        """Auditeurs distincts du jour et des 7 derniers jours par région ou par émission"""
+        entity = self.region_reach if kind == 'regions' else self.show_reach
+        return pd.DataFrame([{'name': name, 'day': entity(name, 1, now), 'week': entity(name, 7, now)}
+                             for name in names])
+
+    def memory_report(self):
+        """Mémoire occupée par les sketches"""
+        per_sketch = HyperLogLog(self.precision).nbytes
+        counts = {'buckets': len(self.buckets), 'regions': len(self.regions), 'shows': len(self.shows)}
+        total = sum(counts.values())
+        return {
+            'precision': self.precision,
+            'bytes_per_sketch': per_sketch,
+            'standard_error': HyperLogLog(self.precision).standard_error,
+            'sketches': counts,
+            'total_bytes': total * per_sketch
+        }
+
+
+class ReachSink:
+    """Sink du générateur d'événements : connexions et écoutes comptées par région et par émission diffusée"""
+
+    def __init__(self, tracker, regions, schedule):
+        self.tracker = tracker
+        self.regions = np.array(regions, dtype=object)
+        index = schedule.index
+        # Émission de chaque créneau, puis libellé des trous de la grille (indice -1)
+        self.shows = np.array([slot['name'] for slot in index.slots] + ['Hors grille'], dtype=object)
+        self.index = index
+
+    def write(self, events):
+        events = events[events['event'] != DISCONNECT]
+        if not len(events):
+            return
+        # Horodatages du générateur : heure murale en ns, donc jours et minutes de la semaine de l'heure locale
+        minutes = (events['timestamp'] // 60_000_000_000 + EPOCH_WEEK_MINUTES) % MINUTES_PER_WEEK
+        self.tracker.ingest(events['listener'], events['timestamp'] / 1e9, self.regions[events['region']],
+                            self.shows[self.index.locate_minutes(minutes)])
+
+    def close(self):
+        pass
+
+
+class ReachFeed:
+    """Générateur d'événements d'écoute branché sur un tracker : rattrapage des jours passés, puis flux live"""
+
+    def __init__(self, tracker, schedule, regions=None, rate=LIVE_EVENT_RATE, seed=None):
+        self.generator = EventGenerator(regions=regions, seed=seed)
+        self.sink = ReachSink(tracker, self.generator.regions, schedule)
+        self.rate = rate
+
+    def backfill(self, days=7, rate=BACKFILL_EVENT_RATE):
+        """Jours passés rejoués sans attente, par lots d'une heure"""
+        start = datetime.now() - timedelta(days=days)
+        return self.generator.run(self.sink, rate, seconds=days * DAY_SECONDS, batch_seconds=3600,
+                                  start=start, paced=False)
+
+    def start(self, backfill_days=7):
+        """Rattrapage puis flux au rythme de l'horloge, dans un thread"""
+        def run():
+            if backfill_days:
+                self.backfill(backfill_days)
+            self.generator.run(self.sink, self.rate)
+
+        threading.Thread(target=run, daemon=True).start()
+        return self
+
+
+def verify_accuracy(precisions=(10, 12, 14), cardinalities=(100, 1000, 10_000, 100_000, 1_000_000), seed=3):
+    """Compare les estimations aux comptes exacts (identifiants entiers et chaînes, avec doublons)"""
+    rng = np.random.default_rng(seed)
+    worst = {}
+    print(f"{'p':>3} {'exact':>10} {'estimé':>12} {'erreur':>8} {'tolérance':>10}")
+    for precision in precisions:
+        for n in cardinalities:
+            ids = rng.integers(0, 2 ** 62, n)
+            # Chaque auditeur apparaît plusieurs fois (reconnexions)
+            events = np.concatenate([ids, rng.choice(ids, n * 2)])
+            exact = len(np.unique(events))
+            estimate = HyperLogLog(precision).add(events).estimate()
+            error = abs(estimate - exact) / exact
+            tolerance = 4 * 1.04 / np.sqrt(1 << precision)
+            worst[precision] = max(worst.get(precision, 0), error)
+            print(f"{precision:>3} {exact:>10,} {estimate:>12,.0f} {error:>8.2%} {tolerance:>10.2%}"
+                  + ("" if error <= tolerance else "  ÉCHEC"))
+
+    # Fusion = union exacte des ensembles
+    a, b = rng.integers(0, 10 ** 6, 200_000), rng.integers(5 * 10 ** 5, 2 * 10 ** 6, 200_000)
+    merged = HyperLogLog(14).add(a).merge(HyperLogLog(14).add(b))
+    assert np.array_equal(merged.registers, HyperLogLog(14).add(np.concatenate([a, b])).registers)
+    strings = np.array([f"auditeur-{i}" for i in range(50_000)], dtype=object)
+    string_error = abs(HyperLogLog(14).add(strings).estimate() - 50_000) / 50_000
+    print(f"Fusion identique à l'ajout direct ; identifiants chaînes : erreur {string_error:.2%}")
+    return worst
+
+
+def benchmark(n_events=5_000_000, n_listeners=2_000_000):
+    """Débit d'ingestion et rapport mémoire sur une journée simulée"""
+    rng = np.random.default_rng(11)
+    regions = np.array(['Île-de-France', 'Auvergne-Rhône-Alpes', 'Occitanie', 'Bretagne', 'Corse'], dtype=object)
+    shows = np.array(['Le 6-9 avec Ali', 'Skyrock Non Stop', 'Planète Rap', 'Radio Libre'], dtype=object)
+    day_start = (wall_seconds(datetime.now()) // DAY_SECONDS) * DAY_SECONDS
+    listeners = rng.integers(0, n_listeners, n_events)
+    timestamps = day_start + rng.uniform(0, DAY_SECONDS - 1, n_events)
+
+    tracker = ReachTracker()
+    t = time.perf_counter()
+    for i in range(0, n_events, 1_000_000):
+        part = slice(i, i + 1_000_000)
+        tracker.ingest(listeners[part], timestamps[part],
+                       regions[listeners[part] % len(regions)], shows[rng.integers(0, len(shows), len(listeners[part]))])
+    elapsed = time.perf_counter() - t
+    print(f"Ingestion : {n_events:,} événements en {elapsed:.2f}s ({n_events / elapsed:,.0f}/s)")
+
+    t = time.perf_counter()
+    estimate = tracker.reach(day_start, day_start + DAY_SECONDS - 1)
+    merge_ms = (time.perf_counter() - t) * 1000
+    exact = len(np.unique(listeners))
+    print(f"Audience cumulée du jour : {estimate:,.0f} estimés / {exact:,} exacts "
+          f"({abs(estimate - exact) / exact:.2%}), fusion de {len(tracker.buckets)} seaux en {merge_ms:.1f} ms")
+    idf = tracker.region_reach('Île-de-France', now=day_start)
+    print(f"Île-de-France : {idf:,.0f} estimés / {len(np.unique(listeners[listeners % len(regions) == 0])):,} exacts")
+    report = tracker.memory_report()
+    print(f"Mémoire : {report['bytes_per_sketch']:,} octets par sketch (p={report['precision']}, "
+          f"erreur type {report['standard_error']:.2%}), {report['sketches']}, total {report['total_bytes'] / 1e6:.1f} Mo")
+
+
+if __name__ == "__main__":
+    verify_accuracy()
+    benchmark()
@@ -0,0 +1,222 @@
+# render_planner.py
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import streamlit as st
+
+from startup import lazy_import
+from telemetry import FIGURE_SECONDS
+
+go = lazy_import('plotly.graph_objects')
+
+FIGURE_WORKERS = int(os.environ.get('SKYROCK_FIGURE_WORKERS', 0)) or None
+TIMINGS_KEY = '_figure_timings'
+
+
+def _warm_worker():
+    """Import de plotly et des constructeurs dans le worker (la première page ne paie pas ce coût)"""
+    import plotly.express
+    import figures
+    return os.getpid()
+
+
+def build_figure(builder, args, kwargs):
+    """Construit et valide une figure : dictionnaire prêt à sérialiser, durée de construction"""
+    start = time.perf_counter()
+    figure = builder(*args, **kwargs).to_dict()
+    return figure, time.perf_counter() - start
+
+
+_built_figure_class = None
+
+
+def built_figure(figure):
+    """Figure Plotly dont to_dict() rend le dictionnaire construit par un worker (ni reconstruite ni revalidée)"""
+    global _built_figure_class
+    if _built_figure_class is None:
+        class BuiltFigure(go.Figure):
+            def to_dict(self):
+                return self._built
+
+        _built_figure_class = BuiltFigure
+    result = _built_figure_class()
+    result._built = figure
+    return result
+
+
+class FigurePool:
+    """Construit les figures d'une page sur des processus workers"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        self._warm = []
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn : pas de fork d'un serveur Streamlit multi-thread
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=get_context('spawn'))
+        return self._executor
+
+    def start(self):
+        """Lance les workers sans attendre : les pages sont construites en processus tant qu'ils chargent plotly"""
+        if self.workers > 1:
+            self._warm = [self._pool().submit(_warm_worker) for _ in range(self.workers)]
+        return self
+
+    @property
+    def ready(self):
+        return self.workers > 1 and all(future.done() and future.exception() is None for future in self._warm)
+
+    def submit(self, builder, args, kwargs):
+        return self._pool().submit(build_figure, builder, args, kwargs)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        self._warm = []
+
+
+@st.cache_resource
+def get_figure_pool():
+    """Workers de construction des figures partagés par les sessions (SKYROCK_FIGURE_WORKERS, cœurs sinon)"""
+    return FigurePool(FIGURE_WORKERS).start()
+
+
+class RenderPlan:
+    """Collecte les figures d'une section, les construit ensemble puis les émet dans l'ordre de la mise en page"""
+
+    def __init__(self, dashboard, pool=None):
+        self.dashboard = dashboard
+        self.pool = pool
+        self.specs = []
+        self.timings = []
+
+    def chart(self, builder, *args, **kwargs):
+        """Réserve l'emplacement du graphique dans le conteneur courant ; la figure est construite au rendu"""
+        self.specs.append((st.empty(), builder, args, kwargs))
+
+    def _emit(self, slot, builder, figure, build_seconds, wait_seconds, where):
+        start = time.perf_counter()
+        slot.plotly_chart(figure, use_container_width=True)
+        emit_seconds = time.perf_counter() - start
+        name = builder.__name__
+        FIGURE_SECONDS.labels(self.dashboard, name, 'build').observe(build_seconds)
+        FIGURE_SECONDS.labels(self.dashboard, name, 'emit').observe(emit_seconds)
+        self.timings.append({'figure': name, 'where': where, 'build_ms': build_seconds * 1000,
+                             'wait_ms': wait_seconds * 1000, 'emit_ms': emit_seconds * 1000})
+
+    def _render_local(self, specs):
+        for slot, builder, args, kwargs in specs:
+            start = time.perf_counter()
+            figure = builder(*args, **kwargs)
+            build_seconds = time.perf_counter() - start
+            # Validation et conversion en dictionnaire comptées dans l'émission (faites par plotly_chart)
+            self._emit(slot, builder, figure, build_seconds, build_seconds, 'processus')
+
+    def render(self):
+        """Construit les figures collectées (workers si au moins deux et pool prêt) et remplit les emplacements"""
+        specs, self.specs = self.specs, []
+        start = time.perf_counter()
+        if len(specs) < 2 or self.pool is None or not self.pool.ready:
+            self._render_local(specs)
+        else:
+            futures = [self.pool.submit(builder, args, kwargs) for _, builder, args, kwargs in specs]
+            for index, ((slot, builder, _, _), future) in enumerate(zip(specs, futures)):
+                # Émission dans l'ordre : la figure i part pendant que les suivantes sont construites
+                waited = time.perf_counter()
+                try:
+                    figure, build_seconds = future.result()
+                except BrokenProcessPool:
+                    # Worker perdu : le pool est relancé au prochain rendu, la fin de page est construite ici
+                    self.pool.close()
+                    self.pool.start()
+                    self._render_local(specs[index:])
+                    break
+                self._emit(slot, builder, built_figure(figure), build_seconds, time.perf_counter() - waited,
+                           'worker')
+        FIGURE_SECONDS.labels(self.dashboard, 'page', 'total').observe(time.perf_counter() - start)
+        st.session_state[TIMINGS_KEY] = self.timings
+        return self.timings
+
+
+def render_timings_panel():
+    """Durées par figure du dernier rendu planifié"""
+    timings = st.session_state.get(TIMINGS_KEY)
+    if not timings:
+        return
+    with st.sidebar.expander("🧩 Figures (dernier rendu)"):
+        st.caption(f"{len(timings)} figures — construction {sum(row['build_ms'] for row in timings):.0f} ms, "
+                   f"attente {sum(row['wait_ms'] for row in timings):.0f} ms, "
+                   f"émission {sum(row['emit_ms'] for row in timings):.0f} ms")
+        st.dataframe([{key: round(value, 1) if isinstance(value, float) else value for key, value in row.items()}
+                      for row in timings], hide_index=True, use_container_width=True)
+
+
+def collect_specs(dashboard, sections):
+    """Figures des sections du tableau de bord d'audience, sans rendu (Streamlit en mode nu)"""
+    specs = []
+    for section in sections:
+        dashboard.plan = RenderPlan('audience')
+        getattr(dashboard, section)()
+        specs.extend((builder, args, kwargs) for _, builder, args, kwargs in dashboard.plan.specs)
+    return specs
+
+
+def benchmark(station_counts=(8, 200), repeats=3):
+    """Temps passé par le thread de rendu pour les figures des sections 1 à 3 : en processus contre workers"""
+    import plotly.io as pio
+    from streamlit.logger import set_log_level
+    from report_export import build_dashboard
+
+    cpus = os.cpu_count() or 1
+    sections = ['create_evolution_charts', 'create_comparison_analysis', 'create_demographic_analysis']
+    print(f"{cpus} cœur(s) disponibles")
+    for n_stations in station_counts:
+        dashboard = build_dashboard(None if n_stations == 8 else n_stations)
+        # Sections exécutées hors serveur : avertissements du mode nu masqués
+        set_log_level('error')
+        specs = collect_specs(dashboard, sections)
+
+        def local():
+            return [pio.to_json(builder(*args, **kwargs), validate=False) for builder, args, kwargs in specs]
+
+        def pooled(pool):
+            futures = [pool.submit(builder, args, kwargs) for builder, args, kwargs in specs]
+            return [pio.to_json(built_figure(future.result()[0]), validate=False) for future in futures]
+
+        def best(run):
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result = run()
+                timings.append(time.perf_counter() - start)
+            return min(timings), result
+
+        serial, reference = best(local)
+        per_figure = sorted(((build_figure(builder, args, kwargs)[1], builder.__name__)
+                             for builder, args, kwargs in specs), reverse=True)
+        print(f"{n_stations} stations : {len(specs)} figures, {sum(map(len, reference)) / 1e6:.1f} Mo de JSON ; "
+              f"plus lentes : " + ', '.join(f"{name} {seconds * 1000:.0f} ms" for seconds, name in per_figure[:3]))
+        print(f"  en processus      {serial * 1000:7.0f} ms")
+        for workers in sorted({2, min(4, cpus), cpus} - {1}):
+            pool = FigurePool(workers).start()
+            for future in pool._warm:
+                future.result()
+            elapsed, result = best(lambda: pooled(pool))
+            pool.close()
+            assert result == reference
+            print(f"  {workers:2d} workers        {elapsed * 1000:7.0f} ms (×{serial / elapsed:.2f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construction concurrente des figures d'une page")
+    parser.add_argument('--stations', type=int, nargs='+', default=[8, 200])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    benchmark(args.stations, args.repeats)
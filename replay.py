@@ -0,0 +1,278 @@
+# replay.py
+import argparse
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from schedule import ProgramSchedule, load_weekly_grid
+from stations import REGION_LISTENERS, StationEngine, hour_volatility
+from top_tracks import CATALOG, PlayoutSimulator, TopTracksEngine
+
+# Pas d'enregistrement d'une journée (secondes)
+RECORD_STEP = 10
+# En dessous de ce délai, l'attente se termine en boucle active (précision du cadencement)
+SPIN_SECONDS = 0.002
+
+
+class ReplayDay:
+    """Journée enregistrée : auditeurs, régions, radios concurrentes et diffusions, en tableaux"""
+
+    def __init__(self, timestamps, listeners, engagement, regions, region_listeners,
+                 stations, station_listeners, play_times, play_tracks, artists, titles):
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.listeners = np.asarray(listeners, dtype=np.int64)
+        self.engagement = np.asarray(engagement, dtype=np.int64)
+        self.regions = [str(region) for region in regions]
+        self.region_listeners = np.asarray(region_listeners, dtype=np.int64)
+        self.stations = [str(station) for station in stations]
+        self.station_listeners = np.asarray(station_listeners, dtype=np.int64)
+        self.play_times = np.asarray(play_times, dtype=np.float64)
+        self.play_tracks = np.asarray(play_tracks, dtype=np.int64)
+        self.labels = {i: (str(artist), str(title)) for i, (artist, title) in enumerate(zip(artists, titles))}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    def save(self, path):
+        """Enregistre la journée (npz compressé, sans pickle)"""
+        artists = [self.labels[i][0] for i in range(len(self.labels))]
+        titles = [self.labels[i][1] for i in range(len(self.labels))]
+        np.savez_compressed(
+            path, timestamps=self.timestamps, listeners=self.listeners, engagement=self.engagement,
+            regions=np.array(self.regions), region_listeners=self.region_listeners,
+            stations=np.array(self.stations), station_listeners=self.station_listeners,
+            play_times=self.play_times, play_tracks=self.play_tracks,
+            artists=np.array(artists), titles=np.array(titles)
+        )
+
+    def plays_between(self, start, end):
+        """Diffusions dans ]start, end] : (titres, timestamps)"""
+        lo, hi = np.searchsorted(self.play_times, [start, end], side='right')
+        return self.play_tracks[lo:hi], self.play_times[lo:hi]
+
+    def series(self, freq='5min'):
+        """Série agrégée (format de SkyrockLiveDashboard.historical_data)"""
+        df = pd.DataFrame({
+            # Heure locale, comme les horodatages du tableau de bord live
+            'timestamp': [datetime.fromtimestamp(t) for t in self.timestamps],
+            'listeners': self.listeners,
+            'engagement': self.engagement
+        })
+        df = df.set_index('timestamp').resample(freq).mean().dropna().reset_index()
+        df['listeners'] = df['listeners'].astype(int)
+        df['engagement'] = df['engagement'].round().astype(int)
+        df['hour'] = df['timestamp'].dt.hour
+        df['mobile_percent'] = 65
+        return df
+
+
+def record_day(day=None, step=RECORD_STEP, seed=0):
+    """Journée synthétique reproductible (mêmes moteurs que le mode live), à défaut de données réelles"""
+    day = day or date.today() - timedelta(days=1)
+    start = datetime(day.year, day.month, day.day).timestamp()
+    timestamps = start + np.arange(0, 86400, step, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    engine = StationEngine.for_radios(REGION_LISTENERS, 2850000, seed=seed, hour=0)
+    skyrock = engine.index['Skyrock']
+    region_listeners = np.empty((len(timestamps), len(engine.regions)), dtype=np.int64)
+    station_listeners = np.empty((len(timestamps), len(engine.stations)), dtype=np.int64)
+    for i, t in enumerate(timestamps):
+        hour = datetime.fromtimestamp(t).hour
+        engine.step(hour, hour_volatility(hour))
+        region_listeners[i] = engine.listeners[skyrock]
+        station_listeners[i] = engine.totals
+    # Engagement : marche aléatoire lente bornée
+    engagement = np.clip(72 + np.cumsum(rng.normal(0, 0.3, len(timestamps))), 55, 90).round()
+
+    playout = PlayoutSimulator(TopTracksEngine(), seed=seed)
+    play_tracks, play_times = playout.draw(start - 7 * 86400, start + 86400)
+    return ReplayDay(
+        timestamps, region_listeners.sum(axis=1), engagement, engine.regions, region_listeners,
+        engine.stations, station_listeners, play_times, play_tracks,
+        [artist for artist, _, _ in CATALOG], [title for _, title, _ in CATALOG]
+    )
+
+
+class ReplayEngine:
+    """Rejoue une journée dans le pipeline live, à vitesse ×1 à ×1000 ou au maximum"""
+
+    def __init__(self, day, dashboard, speed=1.0, consumers=(), loop=True):
+        self.day = day
+        self.dashboard = dashboard
+        self.speed = speed
+        # Appelés après chaque point rejoué (rendu, détection, agrégation...)
+        self.consumers = list(consumers)
+        self.loop = loop
+        self._lock = threading.Lock()
+        dashboard.replay = self
+        self.reset()
+
+    def reset(self):
+        """Repart du début de la journée avec un état live vierge"""
+        day, dashboard = self.day, self.dashboard
+        self.position = 0
+        self.wall_start = time.perf_counter()
+        self.tracks = TopTracksEngine(labels=dict(day.labels))
+        # Les diffusions antérieures à la journée alimentent les fenêtres jour/semaine
+        tracks, times = day.plays_between(-np.inf, day.timestamps[0])
+        if len(tracks):
+            self.tracks.ingest(tracks, times)
+        self._ranks = None
+
+        dashboard.historical_data = day.series()
+        dashboard.schedule = ProgramSchedule(load_weekly_grid(os.environ.get('SKYROCK_PROGRAMME')))
+        dashboard.live_data['current_listeners'] = int(day.listeners[0])
+        dashboard.live_data['peak_today'] = 0
+        dashboard.top_tracks = self.tracks.top(5, window='day')
+        dashboard.ranking = []
+
+    def virtual_now(self):
+        i = max(self.position - 1, 0)
+        return datetime.fromtimestamp(self.day.timestamps[i])
+
+    def apply(self, i):
+        """Injecte le point i dans le tableau de bord"""
+        day, dashboard = self.day, self.dashboard
+        t = day.timestamps[i]
+        # Les diffusions jusqu'au premier point sont intégrées par reset()
+        previous = day.timestamps[i - 1] if i else t
+        tracks, times = day.plays_between(previous, t)
+        if len(tracks):
+            self.tracks.ingest(tracks, times)
+        self.tracks.advance(t)
+        dashboard.top_tracks = self.tracks.top(5, window='day')
+
+        dashboard.geo_data = dict(zip(day.regions, day.region_listeners[i].tolist()))
+        # Classement des radios enregistrées (même format que StationEngine.ranking) et rang de Skyrock
+        totals = day.station_listeners[i]
+        order = np.argsort(-totals, kind='stable')
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(1, len(order) + 1)
+        previous = ranks if self._ranks is None else self._ranks
+        dashboard.ranking = [
+            {'station': day.stations[j], 'listeners': int(totals[j]), 'rank': position + 1,
+             'change': int(previous[j] - ranks[j])}
+            for position, j in enumerate(order[:10])
+        ]
+        skyrock = day.stations.index('Skyrock')
+        dashboard.live_data['rank'] = int(ranks[skyrock])
+        dashboard.live_data['rank_change'] = int(previous[skyrock] - ranks[skyrock])
+        self._ranks = ranks
+
+        dashboard.record_live_point(datetime.fromtimestamp(t), int(day.listeners[i]), int(day.engagement[i]))
+        for consumer in self.consumers:
+            consumer(dashboard)
+        self.position = i + 1
+
+    def _wrap(self):
+        if self.position >= len(self.day):
+            if not self.loop:
+                return False
+            self.reset()
+        return True
+
+    def catch_up(self):
+        """Applique les points dont l'heure est passée (affichage Streamlit, sans thread)"""
+        with self._lock:
+            elapsed = (time.perf_counter() - self.wall_start) * self.speed
+            target = np.searchsorted(self.day.timestamps, self.day.timestamps[0] + elapsed, side='right')
+            while self.position < min(target, len(self.day)):
+                self.apply(self.position)
+            if target >= len(self.day):
+                self._wrap()
+
+    def run(self, max_speed=False, duration=None, limit=None):
+        """Rejeu bloquant cadencé à self.speed (ou sans attente) ; retourne les statistiques"""
+        speed = None if max_speed else self.speed
+        timestamps = self.day.timestamps
+        end = len(self.day) if limit is None else min(len(self.day), self.position + limit)
+        start_index = self.position
+        wall_start = time.perf_counter()
+        lags = []
+        while self.position < end:
+            i = self.position
+            if speed is not None:
+                # Heure murale prévue pour ce point : pas de dérive cumulée
+                due = wall_start + (timestamps[i] - timestamps[start_index]) / speed
+                delay = due - time.perf_counter()
+                if delay > SPIN_SECONDS:
+                    time.sleep(delay - SPIN_SECONDS)
+                while time.perf_counter() < due:
+                    pass
+                lags.append(time.perf_counter() - due)
+            self.apply(i)
+            if duration is not None and time.perf_counter() - wall_start >= duration:
+                break
+        elapsed = time.perf_counter() - wall_start
+        frames = self.position - start_index
+        simulated = timestamps[self.position - 1] - timestamps[start_index] if frames else 0.0
+        stats = {
+            'frames': frames,
+            'elapsed': elapsed,
+            'simulated_seconds': float(simulated),
+            'effective_speed': simulated / elapsed if elapsed else float('inf'),
+            'frames_per_second': frames / elapsed if elapsed else float('inf')
+        }
+        if lags:
+            lags = np.array(lags) * 1000
+            stats.update(lag_p50_ms=float(np.percentile(lags, 50)), lag_p99_ms=float(np.percentile(lags, 99)),
+                         lag_max_ms=float(lags.max()))
+        return stats
+
+
+def _report(label, stats):
+    line = (f"{label} : {stats['frames']:,} points en {stats['elapsed']:.2f}s, "
+            f"{stats['frames_per_second']:,.0f} points/s, vitesse effective ×{stats['effective_speed']:,.0f}")
+    if 'lag_p50_ms' in stats:
+        line += f" — retard p50 {stats['lag_p50_ms']:.2f} ms, p99 {stats['lag_p99_ms']:.2f} ms, max {stats['lag_max_ms']:.2f} ms"
+    print(line)
+
+
+def benchmark(path=None, speeds=(100, 1000), paced_seconds=3.0):
+    """Précision du cadencement à ×100/×1000 et plafond de débit du pipeline (vitesse maximale)"""
+    from DLive import SkyrockLiveDashboard
+    from snapshot_publisher import SnapshotPublisher
+
+    day = ReplayDay.load(path) if path else record_day()
+    dashboard = SkyrockLiveDashboard()
+    replay = ReplayEngine(day, dashboard, loop=False)
+    for speed in speeds:
+        replay.speed = speed
+        replay.reset()
+        _report(f"×{speed}", replay.run(duration=paced_seconds))
+
+    replay.reset()
+    _report("Vitesse maximale (pipeline live)", replay.run(max_speed=True))
+
+    # Même rejeu avec le rendu des écrans muraux à chaque point
+    publisher = SnapshotPublisher(dashboard)
+    replay.consumers = [lambda _: publisher.publish()]
+    replay.reset()
+    _report("Vitesse maximale (+ rendu JSON/HTML)", replay.run(max_speed=True))
+    print(f"Pic rejoué : {dashboard.live_data['peak_today']:,} — top titre : {dashboard.top_tracks[0]['title']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rejeu d'une journée enregistrée")
+    parser.add_argument('--record', metavar='CHEMIN', help="enregistre une journée synthétique (npz)")
+    parser.add_argument('--day', help="date AAAA-MM-JJ de la journée enregistrée")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--benchmark', metavar='CHEMIN', nargs='?', const='')
+    args = parser.parse_args()
+
+    if args.record:
+        day = date.fromisoformat(args.day) if args.day else None
+        record_day(day, seed=args.seed).save(args.record)
+        print(f"Journée enregistrée dans {args.record}")
+    else:
+        benchmark(args.benchmark or None)
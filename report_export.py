@@ -0,0 +1,401 @@
+# report_export.py
+import argparse
+import html
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from string import Template
+
+import numpy as np
+import plotly.graph_objects as go
+
+from assets import vendor_sources
+from startup import WarmSnapshot
+
+EXPORT_DIR = 'exports'
+YEARS = list(range(2015, 2025))
+SKYROCK_COLOR = '#FF6B00'
+OTHER_COLOR = '#9E9E9E'
+# Concurrents affichés à côté de la station (les premiers du classement de l'année)
+LEADERS = 3
+RANKING_SIZE = 15
+
+PAGE = Template("""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<script src="$plotly"></script>
+<style>
+    body { font-family: "Source Sans Pro", sans-serif; margin: 2rem; color: #262730; }
+    h1 { color: $color; }
+    h2 { border-bottom: 2px solid $color; padding-bottom: 0.3rem; margin-top: 2rem; }
+    .kpis { display: flex; gap: 1rem; flex-wrap: wrap; }
+    .kpi { background: #F0F2F6; border-radius: 0.5rem; padding: 0.8rem 1.2rem; min-width: 10rem; }
+    .kpi b { display: block; font-size: 1.6rem; }
+    .kpi small { color: #666; }
+    .row { display: flex; flex-wrap: wrap; }
+    .row > div { flex: 1 1 32rem; }
+    footer { margin-top: 2rem; color: #888; font-size: 0.8rem; }
+</style>
+</head>
+<body>
+<p><a href="../index.html">← Index des rapports</a></p>
+<h1>📻 $title</h1>
+<div class="kpis">$kpis</div>
+$sections
+<footer>Données d'audience radio simulées $first-$last · rapport généré par report_export.py</footer>
+</body>
+</html>
+""")
+
+KPI = Template('<div class="kpi">$label<b>$value</b><small>$delta</small></div>')
+
+INDEX = Template("""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>Rapports d'audience $first-$last</title>
+<style>
+    body { font-family: "Source Sans Pro", sans-serif; margin: 2rem; }
+    table { border-collapse: collapse; font-size: 0.85rem; }
+    th, td { border: 1px solid #DDD; padding: 0.25rem 0.5rem; text-align: right; }
+    th:first-child, td:first-child { text-align: left; }
+    a { color: #262730; text-decoration: none; }
+    td.rank1 { background: #FFE0CC; }
+</style>
+</head>
+<body>
+<h1>📻 Rapports d'audience $first-$last</h1>
+<p>$count rapports ($stations stations × $years années) : audience moyenne (millions) et rang de l'année.</p>
+<table>
+<tr><th>Station</th>$header</tr>
+$rows
+</table>
+</body>
+</html>
+""")
+
+
+def dataset_years(dashboard):
+    """Années couvertes par les données du tableau de bord"""
+    return [int(year) for year in dashboard.get_competition().frame('yearly_audience').index]
+
+
+def shared_frames(dashboard):
+    """Agrégats partagés par tous les rapports (matrices annuelles et mensuelles, profils d'âge et horaires)"""
+    competition = dashboard.get_competition()
+    demographic_matrix, time_slot_matrix = dashboard.get_audience_matrices()
+    frames = {name: competition.frame(name) for name in ('yearly_audience', 'yearly_share', 'yearly_max',
+                                                          'yearly_rank', 'yoy_growth')}
+    frames['monthly_audience'] = competition.frame('monthly_audience').rename_axis('date')
+    frames['ages'] = demographic_matrix.pivot('part_audience')
+    frames['time_slots'] = time_slot_matrix.pivot('part_audience')
+    return frames
+
+
+class ReportData:
+    """Agrégats partagés relus en mémoire projetée : chaque rapport n'en lit que quelques cellules"""
+
+    def __init__(self, snapshot):
+        yearly = snapshot.frame('yearly_audience')
+        self.years = [int(year) for year in yearly.index]
+        self.stations = list(yearly.columns)
+        self.index = {station: i for i, station in enumerate(self.stations)}
+        # Matrices (station × année) et (station × mois)
+        for name in ('yearly_audience', 'yearly_share', 'yearly_max', 'yearly_rank', 'yoy_growth'):
+            setattr(self, name, snapshot.frame(name).to_numpy().T)
+        monthly = snapshot.frame('monthly_audience')
+        self.months = monthly.index
+        self.monthly_audience = monthly.to_numpy().T
+        self.ages = snapshot.frame('ages')
+        self.time_slots = snapshot.frame('time_slots')
+        # Classement de chaque année calculé une fois par worker
+        self.rankings = {year: np.argsort(-np.nan_to_num(self.yearly_audience[:, j], nan=-np.inf), kind='stable')
+                         for j, year in enumerate(self.years)}
+
+    def _cell(self, matrix, station, year):
+        return float(matrix[self.index[station], self.years.index(year)])
+
+    def leaders(self, station, year, n=LEADERS):
+        """Premières stations de l'année, hors station"""
+        return [self.stations[i] for i in self.rankings[year][:n + 1] if self.stations[i] != station][:n]
+
+    def kpis(self, station, year):
+        """Indicateurs de l'en-tête du tableau de bord pour la station et l'année"""
+        audience = self._cell(self.yearly_audience, station, year)
+        share = self._cell(self.yearly_share, station, year)
+        rank = int(self._cell(self.yearly_rank, station, year))
+        previous = year - 1 if year - 1 in self.years else None
+        return {
+            'audience': audience, 'share': share, 'rank': rank, 'stations': len(self.stations),
+            'max': self._cell(self.yearly_max, station, year),
+            'audience_delta': audience - self._cell(self.yearly_audience, station, previous) if previous else None,
+            'share_delta': share - self._cell(self.yearly_share, station, previous) if previous else None,
+            'rank_delta': int(self._cell(self.yearly_rank, station, previous)) - rank if previous else None,
+            'growth': self._cell(self.yoy_growth, station, year) if previous else None
+        }
+
+    def figures(self, station, year):
+        """Sections du rapport : (titre, figures) dans l'ordre du tableau de bord"""
+        def color(name):
+            return SKYROCK_COLOR if name == station else None
+
+        leaders = self.leaders(station, year)
+        shown = [station] + leaders
+        months = (self.months.year == year)
+        upto = [y for y in self.years if y <= year]
+
+        monthly = go.Figure([go.Scatter(x=self.months[months], y=self.monthly_audience[self.index[name], months],
+                                        name=name, line=dict(color=color(name), width=4 if name == station else 2))
+                             for name in shown])
+        monthly.update_layout(title=f"Audience Mensuelle {year}", height=420, yaxis_title='Audience (Millions)')
+        yearly = go.Figure([go.Scatter(x=upto, y=self.yearly_audience[self.index[name], :len(upto)], name=name,
+                                       mode='lines+markers', line=dict(color=color(name)))
+                            for name in shown])
+        yearly.update_layout(title=f"Évolution Annuelle ({self.years[0]}-{year})", height=420,
+                             yaxis_title='Audience Moyenne (Millions)')
+
+        # Classement de l'année (la station est ajoutée si elle est hors du haut du classement)
+        top = [self.stations[i] for i in self.rankings[year][:RANKING_SIZE]]
+        if station not in top:
+            top.append(station)
+        column = self.years.index(year)
+        ranking = go.Figure(go.Bar(x=top, y=[self.yearly_audience[self.index[name], column] for name in top],
+                                   marker_color=[SKYROCK_COLOR if name == station else OTHER_COLOR for name in top]))
+        ranking.update_layout(title=f"Classement {year} (Audience Moyenne)", height=420,
+                              yaxis_title='Audience (Millions)')
+        ranks = go.Figure(go.Scatter(x=upto, y=self.yearly_rank[self.index[station], :len(upto)], mode='lines+markers',
+                                     line=dict(color=SKYROCK_COLOR, width=4)))
+        ranks.update_yaxes(autorange='reversed', dtick=max(1, len(self.stations) // 10))
+        ranks.update_layout(title=f"Rang de {station} ({self.years[0]}-{year})", height=420, yaxis_title='Rang')
+        sections = [("📈 Évolution de l'Audience", [monthly, yearly]), ("🔍 Analyse Comparative", [ranking, ranks])]
+        if column > 0:
+            growth = go.Figure(go.Bar(x=shown, y=[self.yoy_growth[self.index[name], column] for name in shown],
+                                      marker_color=[SKYROCK_COLOR if name == station else OTHER_COLOR
+                                                    for name in shown]))
+            growth.update_layout(title=f"Croissance {year} vs {year - 1} (%)", height=420)
+            sections[1][1].append(growth)
+
+        ages = self.ages.loc[station]
+        slots = self.time_slots.loc[station]
+        age_figure = go.Figure(go.Bar(x=ages.to_numpy(), y=list(ages.index), orientation='h',
+                                      marker_color=SKYROCK_COLOR))
+        age_figure.update_layout(title=f"Répartition par Âge - {station}", height=380,
+                                 xaxis_title="Part d'Audience (%)")
+        slot_figure = go.Figure(go.Bar(x=list(slots.index), y=slots.to_numpy(), marker_color=SKYROCK_COLOR))
+        slot_figure.update_layout(title=f"Audience par Créneau Horaire - {station}", height=380,
+                                  yaxis_title="Part d'Audience (%)")
+        sections.append(("👥 Analyse Démographique", [age_figure, slot_figure]))
+        return sections
+
+
+def slug(station):
+    return re.sub(r'[^\w-]+', '_', station).strip('_')
+
+
+def _kpi_cards(kpis):
+    def delta(value, unit, digits):
+        return '&nbsp;' if value is None else f"{value:+.{digits}f}{unit} vs année précédente"
+
+    cards = [
+        ("Audience Moyenne", f"{kpis['audience']:.2f}M", delta(kpis['audience_delta'], 'M', 2)),
+        ("Part de Marché", f"{kpis['share']:.1f}%", delta(kpis['share_delta'], ' pt', 1)),
+        ("Classement", f"{kpis['rank']}ème/{kpis['stations']}",
+         '&nbsp;' if kpis['rank_delta'] is None else f"{kpis['rank_delta']:+d} place(s)"),
+        ("Audience Max", f"{kpis['max']:.2f}M", '&nbsp;'),
+        ("Tendance", '&nbsp;' if kpis['audience_delta'] is None else
+         "📈 Hausse" if kpis['audience_delta'] > 0 else "📉 Baisse",
+         '&nbsp;' if kpis['growth'] is None else f"{kpis['growth']:+.1f}% sur un an")
+    ]
+    return ''.join(KPI.substitute(label=label, value=value, delta=delta_text) for label, value, delta_text in cards)
+
+
+def plotly_source(directory):
+    """Copie plotly.js à la racine de l'export et retourne son chemin relatif aux rapports ;
+    sans le fichier du paquet plotly, script du CDN de la même version (rapports lisibles en ligne seulement)"""
+    plotly_js = vendor_sources().get('plotly.min.js')
+    if plotly_js:
+        shutil.copyfile(plotly_js, os.path.join(directory, 'plotly.min.js'))
+        return '../plotly.min.js'
+    from plotly.offline import get_plotlyjs_version
+    sys.stderr.write("plotly.min.js introuvable dans le paquet plotly : rapports liés au CDN de plotly\n")
+    return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+
+def render_report(data, station, year, directory, plotly='../plotly.min.js'):
+    """Page HTML autonome d'un rapport (plotly.js partagé à la racine de l'export) ; retourne sa ligne d'index"""
+    kpis = data.kpis(station, year)
+    sections = []
+    for title, figures in data.figures(station, year):
+        divs = ''.join(f"<div>{figure.to_html(full_html=False, include_plotlyjs=False)}</div>" for figure in figures)
+        sections.append(f'<h2>{title}</h2>\n<div class="row">{divs}</div>')
+    page = PAGE.substitute(title=html.escape(f"{station} — {year}"), plotly=plotly, color=SKYROCK_COLOR,
+                           kpis=_kpi_cards(kpis), sections='\n'.join(sections), first=data.years[0],
+                           last=data.years[-1])
+    path = os.path.join(str(year), f"{slug(station)}.html")
+    with open(os.path.join(directory, path), 'w', encoding='utf-8') as f:
+        f.write(page)
+    return {'station': station, 'year': year, 'path': path, 'audience': kpis['audience'], 'rank': kpis['rank']}
+
+
+_DATA = None
+
+
+def _init_worker(shared_dir):
+    """Chargement des agrégats partagés une fois par worker"""
+    global _DATA
+    _DATA = ReportData(WarmSnapshot.open(shared_dir))
+
+
+def _render_batch(task):
+    stations, year, directory, plotly = task
+    return [render_report(_DATA, station, year, directory, plotly) for station in stations]
+
+
+def write_index(rows, directory, years, stations):
+    """Tableau station × année des rapports exportés"""
+    cells = {(row['station'], row['year']): row for row in rows}
+    lines = []
+    for station in stations:
+        tds = []
+        for year in years:
+            row = cells.get((station, year))
+            if row is None:
+                tds.append('<td></td>')
+                continue
+            css = ' class="rank1"' if row['rank'] == 1 else ''
+            tds.append(f'<td{css}><a href="{html.escape(row["path"])}">{row["audience"]:.2f} · '
+                       f'{row["rank"]}e</a></td>')
+        lines.append(f"<tr><td>{html.escape(station)}</td>{''.join(tds)}</tr>")
+    page = INDEX.substitute(first=years[0], last=years[-1], count=len(rows), stations=len(stations),
+                            years=len(years), header=''.join(f"<th>{year}</th>" for year in years),
+                            rows='\n'.join(lines))
+    with open(os.path.join(directory, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(page)
+
+
+def print_progress(done, total, elapsed):
+    rate = done / elapsed if elapsed else 0.0
+    remaining = (total - done) / rate if rate else 0.0
+    sys.stderr.write(f"\r  {done}/{total} rapports ({rate:,.0f}/s), reste ~{remaining:.0f} s   ")
+    if done == total:
+        sys.stderr.write('\n')
+
+
+def export_reports(dashboard, directory=EXPORT_DIR, years=None, stations=None, workers=None, progress=None):
+    """Rapports (année × station) en HTML dans directory, rendus sur workers processus ; retourne les lignes d'index.
+    years : années des données par défaut ; ValueError si une année demandée n'y figure pas"""
+    available = dataset_years(dashboard)
+    years = list(years or available)
+    missing = [year for year in years if year not in available]
+    if missing:
+        raise ValueError(f"années absentes des données : {', '.join(map(str, missing))} "
+                         f"(disponibles : {available[0]}-{available[-1]})")
+    frames = shared_frames(dashboard)
+    stations = list(stations or dashboard.radios)
+    workers = workers or os.cpu_count() or 1
+    for year in years:
+        os.makedirs(os.path.join(directory, str(year)), exist_ok=True)
+    plotly = plotly_source(directory)
+
+    # Agrégats calculés une fois, écrits en colonnes .npy relues en mémoire projetée par chaque worker
+    shared_dir = tempfile.mkdtemp(prefix='skyrock_export_')
+    WarmSnapshot.write(shared_dir, frames, None)
+    total = len(years) * len(stations)
+    rows, start = [], time.perf_counter()
+    try:
+        if workers == 1:
+            _init_worker(shared_dir)
+            for year in years:
+                for station in stations:
+                    rows.append(render_report(_DATA, station, year, directory, plotly))
+                    if progress:
+                        progress(len(rows), total, time.perf_counter() - start)
+        else:
+            # Quelques lots par worker : les workers finissent ensemble
+            per_year = -(-workers * 4 // len(years))
+            size = -(-len(stations) // per_year)
+            tasks = [(stations[i:i + size], year, directory, plotly)
+                     for year in years for i in range(0, len(stations), size)]
+            with ProcessPoolExecutor(workers, mp_context=get_context('spawn'), initializer=_init_worker,
+                                     initargs=(shared_dir,)) as executor:
+                for future in as_completed([executor.submit(_render_batch, task) for task in tasks]):
+                    rows.extend(future.result())
+                    if progress:
+                        progress(len(rows), total, time.perf_counter() - start)
+    finally:
+        shutil.rmtree(shared_dir, ignore_errors=True)
+    write_index(rows, directory, years, stations)
+    return rows
+
+
+def build_dashboard(n_stations=None):
+    """Tableau de bord des 8 radios suivies, ou d'un panel synthétique de n_stations sur 2015-2024"""
+    from Dashboard import RadioAudienceDashboard
+    from what_if import WhatIfEngine
+
+    if n_stations is None:
+        return RadioAudienceDashboard(warm=False)
+    return RadioAudienceDashboard(engine=WhatIfEngine.synthetic(n_stations, len(YEARS), start=f"{YEARS[0]}-01-01"))
+
+
+def benchmark(station_counts=(8, 200), worker_counts=None):
+    """Durée totale d'export (10 années) selon le nombre de stations et de workers"""
+    cpus = os.cpu_count() or 1
+    worker_counts = worker_counts or sorted({1, 2, min(4, cpus), cpus})
+    print(f"{cpus} cœur(s) disponibles")
+    for n_stations in station_counts:
+        t = time.perf_counter()
+        dashboard = build_dashboard(None if n_stations == 8 else n_stations)
+        frames = shared_frames(dashboard)
+        print(f"{n_stations} stations × {len(YEARS)} années : agrégats partagés en {time.perf_counter() - t:.2f} s "
+              f"({sum(frame.size for frame in frames.values()):,} cellules)")
+        baseline = None
+        for workers in worker_counts:
+            directory = tempfile.mkdtemp(prefix='skyrock_reports_')
+            t = time.perf_counter()
+            rows = export_reports(dashboard, directory, workers=workers)
+            elapsed = time.perf_counter() - t
+            baseline = baseline or elapsed
+            size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory)
+                       for name in names)
+            print(f"  {workers:2d} worker(s) : {elapsed:6.1f} s ({len(rows) / elapsed:5.1f} rapports/s, "
+                  f"×{baseline / elapsed:.2f}) — {size / 1e6:.0f} Mo")
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export des rapports d'audience (année × station) en HTML")
+    parser.add_argument('--out', default=EXPORT_DIR)
+    parser.add_argument('--stations', type=int, default=None, help="panel synthétique de N stations (8 radios sinon)")
+    parser.add_argument('--years', default=None, help="ex. 2020-2024 ou 2024 (années des données par défaut)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--benchmark', action='store_true')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        years = None
+        if args.years:
+            bounds = args.years.split('-')
+            if len(bounds) > 2 or not all(bound.strip().isdigit() for bound in bounds):
+                parser.error(f"--years : {args.years!r} (attendu AAAA ou AAAA-AAAA)")
+            first, last = int(bounds[0]), int(bounds[-1])
+            if first > last:
+                parser.error(f"--years : {args.years!r} (première année après la dernière)")
+            years = list(range(first, last + 1))
+        start = time.perf_counter()
+        dashboard = build_dashboard(args.stations)
+        available = dataset_years(dashboard)
+        if years and not set(years) <= set(available):
+            parser.error(f"--years : {args.years} hors des années des données ({available[0]}-{available[-1]})")
+        rows = export_reports(dashboard, args.out, years, workers=args.workers, progress=print_progress)
+        print(f"{len(rows)} rapports dans {args.out}/ en {time.perf_counter() - start:.1f} s "
+              f"(index : {os.path.join(args.out, 'index.html')})")
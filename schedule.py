@@ -0,0 +1,247 @@
+# schedule.py
+import json
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+DAYS = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
+MINUTES_PER_WEEK = 7 * 24 * 60
+SEGMENT_MINUTES = 15
+
+# Grille de la semaine (jours ouvrés puis week-end) : (début, fin, émission, animateur)
+WEEKDAY_GRID = [
+    ('00:00', '06:00', 'La Nuit Skyrock', 'Playlist Automatisée'),
+    ('06:00', '09:00', 'Le 6-9 avec Ali', 'Ali'),
+    ('09:00', '12:00', 'Skyrock Non Stop', 'Playlist Automatisée'),
+    ('12:00', '16:00', 'Skyrock Non Stop', 'Playlist Automatisée'),
+    ('16:00', '20:00', 'Les Après-Midi Skyrock', 'Difool'),
+    ('20:00', '21:00', 'Planète Rap', 'Fred Musa'),
+    ('21:00', '24:00', 'Radio Libre', 'Difool')
+]
+WEEKEND_GRID = [
+    ('00:00', '08:00', 'La Nuit Skyrock', 'Playlist Automatisée'),
+    ('08:00', '12:00', 'Skyrock Week-End', 'Playlist Automatisée'),
+    ('12:00', '18:00', 'Skyrock Non Stop', 'Playlist Automatisée'),
+    ('18:00', '21:00', 'Le Mix du Week-End', 'DJ Resident'),
+    ('21:00', '24:00', 'Radio Libre', 'Difool')
+]
+
+
+def default_weekly_grid():
+    """Grille hebdomadaire par défaut (une entrée par créneau et par jour)"""
+    grid = []
+    for day in range(7):
+        for start, end, name, host in (WEEKDAY_GRID if day < 5 else WEEKEND_GRID):
+            grid.append({'day': DAYS[day], 'start': start, 'end': end, 'name': name, 'host': host})
+    return grid
+
+
+def load_weekly_grid(path=None):
+    """Charge la grille depuis un fichier JSON (liste de créneaux), sinon la grille par défaut"""
+    if path is None:
+        return default_weekly_grid()
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _minutes(hhmm):
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def minute_of_week(moment):
+    return moment.weekday() * 1440 + moment.hour * 60 + moment.minute
+
+
+class ScheduleIndex:
+    """Index d'intervalles trié sur la semaine : émission courante et suivante en O(log n)"""
+
+    def __init__(self, grid):
+        slots = []
+        for entry in grid:
+            day = DAYS.index(entry['day']) if isinstance(entry['day'], str) else int(entry['day'])
+            start = day * 1440 + _minutes(entry['start'])
+            duration = (_minutes(entry['end']) - _minutes(entry['start'])) % 1440 or 1440
+            slots.append({**entry, 'start_minute': start, 'duration': duration})
+        slots.sort(key=lambda slot: slot['start_minute'])
+
+        for previous, slot in zip(slots, slots[1:]):
+            if previous['start_minute'] + previous['duration'] > slot['start_minute']:
+                raise ValueError(f"Créneaux qui se chevauchent : {previous['name']} / {slot['name']}")
+        # Dernier créneau de la semaine qui déborde sur le lundi
+        if slots and slots[-1]['start_minute'] + slots[-1]['duration'] > MINUTES_PER_WEEK + slots[0]['start_minute']:
+            raise ValueError(f"Créneaux qui se chevauchent : {slots[-1]['name']} / {slots[0]['name']}")
+
+        self.slots = slots
+        self.starts = [slot['start_minute'] for slot in slots]
+
+    def locate(self, moment):
+        """Indice du créneau contenant moment (None si trou dans la grille)"""
+        minute = minute_of_week(moment)
+        i = bisect_right(self.starts, minute) - 1
+        # Avant le premier créneau : dernier créneau de la semaine précédente (passage dimanche/lundi)
+        slot = self.slots[i]
+        offset = (minute - slot['start_minute']) % MINUTES_PER_WEEK
+        return i % len(self.slots) if offset < slot['duration'] else None
+
+    def current(self, moment):
+        i = self.locate(moment)
+        return None if i is None else self.slots[i]
+
+    def locate_minutes(self, minutes):
+        """locate vectorisé : indice du créneau de chaque minute de la semaine (-1 si trou dans la grille)"""
+        starts = np.array(self.starts)
+        durations = np.array([slot['duration'] for slot in self.slots])
+        i = (np.searchsorted(starts, minutes, side='right') - 1) % len(starts)
+        offset = (minutes - starts[i]) % MINUTES_PER_WEEK
+        return np.where(offset < durations[i], i, -1)
+
+    def upcoming(self, moment):
+        """Prochain créneau commençant après moment"""
+        i = bisect_right(self.starts, minute_of_week(moment))
+        return self.slots[i % len(self.slots)]
+
+    def airing_start(self, slot, moment):
+        """Date/heure de début de la diffusion de slot qui contient moment"""
+        offset = (minute_of_week(moment) - slot['start_minute']) % MINUTES_PER_WEEK
+        return (moment - timedelta(minutes=offset)).replace(second=0, microsecond=0)
+
+
+def slot_key(slot):
+    """Clé d'un créneau quotidien (émission, début, fin) : une émission diffusée sur plusieurs créneaux
+    de la journée a des agrégats par créneau"""
+    return slot['name'], slot['start'], slot['end']
+
+
+class ShowAggregates:
+    """Agrégats par créneau d'émission et par segment de 15 minutes, mis à jour point par point"""
+
+    FIELDS = ('count', 'listeners_sum', 'listeners_peak', 'engagement_sum')
+
+    def __init__(self, max_airings=8):
+        self.max_airings = max_airings
+        self.by_show = {}  # créneau -> agrégats de toutes ses diffusions
+        self.by_airing = {}  # créneau -> OrderedDict(début de diffusion -> agrégats)
+
+    def _new(self, n_segments):
+        return {field: np.zeros(n_segments) for field in self.FIELDS}
+
+    def _update(self, aggregates, segment, listeners, engagement):
+        aggregates['count'][segment] += 1
+        aggregates['listeners_sum'][segment] += listeners
+        aggregates['engagement_sum'][segment] += engagement
+        if listeners > aggregates['listeners_peak'][segment]:
+            aggregates['listeners_peak'][segment] = listeners
+
+    def observe(self, slot, airing, segment, listeners, engagement):
+        n_segments = -(-slot['duration'] // SEGMENT_MINUTES)
+        key = slot_key(slot)
+        if key not in self.by_show:
+            self.by_show[key] = self._new(n_segments)
+        self._update(self.by_show[key], segment, listeners, engagement)
+
+        airings = self.by_airing.setdefault(key, OrderedDict())
+        if airing not in airings:
+            airings[airing] = self._new(n_segments)
+            while len(airings) > self.max_airings:
+                airings.popitem(last=False)
+        self._update(airings[airing], segment, listeners, engagement)
+
+    @staticmethod
+    def _frame(aggregates):
+        count = np.maximum(aggregates['count'], 1)
+        return pd.DataFrame({
+            'segment': np.arange(len(count)),
+            'minute': np.arange(len(count)) * SEGMENT_MINUTES,
+            'points': aggregates['count'].astype(int),
+            'avg_listeners': aggregates['listeners_sum'] / count,
+            'peak_listeners': aggregates['listeners_peak'],
+            'avg_engagement': aggregates['engagement_sum'] / count
+        })
+
+    def segments(self, slot, airing=None):
+        """Moyennes/pics par segment du créneau, toutes diffusions confondues ou pour une diffusion"""
+        if airing is None:
+            aggregates = self.by_show.get(slot_key(slot))
+        else:
+            aggregates = self.by_airing.get(slot_key(slot), {}).get(airing)
+        return None if aggregates is None else self._frame(aggregates)
+
+    def summary(self, aggregates):
+        count = aggregates['count'].sum()
+        if count == 0:
+            return None
+        return {
+            'avg_listeners': aggregates['listeners_sum'].sum() / count,
+            'peak_listeners': aggregates['listeners_peak'].max(),
+            'avg_engagement': aggregates['engagement_sum'].sum() / count
+        }
+
+    def airing_comparison(self, slot):
+        """Diffusion en cours/dernière du créneau contre la précédente (simple lecture des agrégats)"""
+        airings = self.by_airing.get(slot_key(slot))
+        if not airings or len(airings) < 2:
+            return None
+        (_, previous), (_, current) = list(airings.items())[-2:]
+        return {'current': self.summary(current), 'previous': self.summary(previous)}
+
+    def compare(self, show_a, show_b):
+        """Comparaison de deux émissions sur l'ensemble de leurs créneaux et diffusions"""
+        result = {}
+        for show in (show_a, show_b):
+            slots = [aggregates for key, aggregates in self.by_show.items() if key[0] == show]
+            if slots:
+                result[show] = self.summary({field: np.concatenate([aggregates[field] for aggregates in slots])
+                                             for field in self.FIELDS})
+        return result
+
+
+class ProgramSchedule:
+    """Grille des programmes et agrégats d'audience par émission"""
+
+    def __init__(self, grid=None):
+        self.index = ScheduleIndex(grid or default_weekly_grid())
+        self.aggregates = ShowAggregates()
+
+    def current(self, moment=None):
+        return self.index.current(moment or datetime.now())
+
+    def upcoming(self, moment=None):
+        return self.index.upcoming(moment or datetime.now())
+
+    def observe(self, moment, listeners, engagement):
+        """Intègre un point de la série live dans les agrégats de l'émission diffusée"""
+        slot = self.index.current(moment)
+        if slot is None:
+            return None
+        airing = self.index.airing_start(slot, moment)
+        segment = int((moment - airing).total_seconds() // (SEGMENT_MINUTES * 60))
+        self.aggregates.observe(slot, airing, segment, listeners, engagement)
+        return slot
+
+    def airing_start(self, slot, moment=None):
+        return self.index.airing_start(slot, moment or datetime.now())
+
+    def show_stats(self, moment):
+        """Segments et comparaison du créneau diffusé à moment, sérialisables en JSON (lecteurs de l'état live)"""
+        slot = self.index.current(moment)
+        if slot is None:
+            return None
+        segments = self.aggregates.segments(slot)
+        comparison = self.aggregates.airing_comparison(slot)
+        return {
+            'slot': list(slot_key(slot)),
+            'airing_start': self.index.airing_start(slot, moment).isoformat(),
+            'segments': None if segments is None else [
+                {'minute': int(row.minute), 'points': int(row.points), 'avg_listeners': float(row.avg_listeners),
+                 'avg_engagement': float(row.avg_engagement)}
+                for row in segments.itertuples() if row.points > 0
+            ],
+            'comparison': None if comparison is None else {
+                period: None if summary is None else {key: float(value) for key, value in summary.items()}
+                for period, summary in comparison.items()
+            }
+        }
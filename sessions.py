@@ -0,0 +1,497 @@
+# sessions.py
+import argparse
+import json
+import os
+import resource
+import shutil
+import struct
+import tempfile
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from schedule import DAYS, load_weekly_grid
+from startup import WarmSnapshot, source_fingerprint
+from stations import hour_factors
+
+# Répertoire de la journée sessionisée (python sessions.py --build)
+SESSIONS_DIR = os.environ.get('SKYROCK_SESSIONS', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sessions'))
+
+DAY_MS = 86_400_000
+DEVICES = ['mobile', 'car', 'home']
+DISCONNECT, CONNECT = 0, 1
+# Clé de tri sur 64 bits : auditeur | milliseconde du jour (27 bits) | type (1 bit) | support (2 bits) ;
+# à la même milliseconde, la déconnexion passe avant la reconnexion, quel que soit le support
+TIME_BITS = 27
+LISTENER_SHIFT = TIME_BITS + 3
+# Événements par run trié (phase 1) et par bloc lu dans chaque run pendant la fusion (phase 2)
+CHUNK_EVENTS = 5_000_000
+MERGE_BLOCK = 250_000
+
+# Créneaux horaires (libellés des créneaux de Dashboard.py)
+SLOTS = [('6h-9h', 6, 9), ('9h-12h', 9, 12), ('12h-14h', 12, 14), ('14h-17h', 14, 17), ('17h-20h', 17, 20),
+         ('20h-24h', 20, 24), ('0h-6h', 0, 6)]
+# Seaux des durées de session et des temps d'écoute par auditeur (secondes)
+LENGTH_BINS = np.geomspace(10, 86400, 49)
+
+
+def encode(ms, listener, kind, device):
+    """Clé de tri d'un événement (voir TIME_BITS)"""
+    return ((np.asarray(listener, dtype=np.int64) << LISTENER_SHIFT) | (np.asarray(ms, dtype=np.int64) << 3)
+            | (np.asarray(kind, dtype=np.int64) << 2) | np.asarray(device, dtype=np.int64))
+
+
+def decode(keys):
+    """(auditeur, milliseconde, support, type) de chaque clé"""
+    return keys >> LISTENER_SHIFT, (keys >> 3) & ((1 << TIME_BITS) - 1), keys & 3, (keys >> 2) & 1
+
+
+class ColumnWriter:
+    """Colonne .npy écrite par blocs : en-tête réservé, réécrit à la fermeture avec la longueur finale"""
+    MAGIC = b'\x93NUMPY\x01\x00'
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.rows = 0
+        # Place de l'en-tête le plus long (nombre de lignes maximal), arrondie à 64 octets
+        longest = len(self._header(2 ** 63)) + len(self.MAGIC) + 3
+        self.size = -(-longest // 64) * 64
+        self._file = open(path, 'wb')
+        self._file.write(b' ' * self.size)
+
+    def _header(self, rows):
+        return repr({'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                     'shape': (rows,)}).encode('latin1')
+
+    def append(self, values):
+        np.ascontiguousarray(values, dtype=self.dtype).tofile(self._file)
+        self.rows += len(values)
+
+    def close(self):
+        header = self._header(self.rows)
+        padding = self.size - len(self.MAGIC) - 2 - len(header) - 1
+        self._file.seek(0)
+        self._file.write(self.MAGIC + struct.pack('<H', len(header) + padding + 1) + header + b' ' * padding + b'\n')
+        self._file.close()
+
+
+def write_runs(chunks, directory, chunk_events=CHUNK_EVENTS):
+    """Phase 1 : blocs d'événements (ms, auditeur, type, support) → runs de clés triées sur disque"""
+    paths, buffer, buffered = [], [], 0
+
+    def flush():
+        keys = np.concatenate(buffer)
+        keys.sort()
+        path = os.path.join(directory, f"run.{len(paths)}.npy")
+        np.save(path, keys)
+        paths.append(path)
+        buffer.clear()
+
+    for ms, listener, kind, device in chunks:
+        # Événements hors de la journée ignorés
+        inside = (ms >= 0) & (ms < DAY_MS)
+        buffer.append(encode(ms[inside], listener[inside], kind[inside], device[inside]))
+        buffered += int(inside.sum())
+        if buffered >= chunk_events:
+            flush()
+            buffered = 0
+    if buffer:
+        flush()
+    return paths
+
+
+def merge_runs(paths, block=MERGE_BLOCK):
+    """Phase 2 : fusion des runs par blocs (mémoire bornée à runs × block clés), clés triées en sortie"""
+    runs = [np.load(path, mmap_mode='r') for path in paths]
+    positions = [0] * len(runs)
+    while True:
+        active = [i for i, run in enumerate(runs) if positions[i] < len(run)]
+        if not active:
+            return
+        blocks = {i: np.asarray(runs[i][positions[i]:positions[i] + block]) for i in active}
+        # Tout ce qui est <= à la plus petite dernière clé des blocs non terminaux peut sortir
+        bounds = [blocks[i][-1] for i in active if positions[i] + block < len(runs[i])]
+        watermark = min(bounds) if bounds else None
+        parts = []
+        for i in active:
+            keys = blocks[i]
+            n = len(keys) if watermark is None else int(np.searchsorted(keys, watermark, side='right'))
+            parts.append(keys[:n])
+            positions[i] += n
+        # Fusion de morceaux déjà triés : tri stable (timsort) en O(n log k)
+        merged = np.concatenate(parts)
+        merged.sort(kind='stable')
+        yield merged
+
+
+class Sessionizer:
+    """Sessions d'un flux de clés triées par (auditeur, instant), avec report du dernier événement d'un bloc au suivant"""
+
+    def __init__(self):
+        self._carry = np.empty(0, dtype=np.int64)
+        self._previous_listener = -1
+
+    def feed(self, keys, final=False):
+        """(auditeur, début ms, fin ms, support) des sessions dont la fin est connue"""
+        keys = np.concatenate([self._carry, keys]) if len(self._carry) else keys
+        n = len(keys)
+        # Dernier événement gardé pour le bloc suivant : son successeur n'est pas encore connu
+        m = n if final else max(n - 1, 0)
+        self._carry = keys[m:].copy()
+        if m == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty
+        listener, ms, device, kind = decode(keys)
+
+        # Événement suivant connu pour les k premiers événements traités
+        k = min(m, n - 1)
+        same_next = np.zeros(m, dtype=bool)
+        same_next[:k] = listener[1:k + 1] == listener[:k]
+        next_ms = np.full(m, DAY_MS, dtype=np.int64)
+        next_ms[:k] = ms[1:k + 1]
+        first = np.empty(m, dtype=bool)
+        first[0] = listener[0] != self._previous_listener
+        first[1:] = listener[1:m] != listener[:m - 1]
+        self._previous_listener = listener[m - 1]
+
+        # Connexion : jusqu'à l'événement suivant de l'auditeur (déconnexion ou reconnexion), sinon fin de journée
+        connect = kind[:m] == CONNECT
+        end = np.where(same_next, next_ms, DAY_MS)
+        # Déconnexion sans connexion dans la journée : écoute commencée avant minuit
+        orphan = (kind[:m] == DISCONNECT) & first
+        selected = connect | orphan
+        start = np.where(orphan, 0, ms[:m])[selected]
+        end = np.where(orphan, ms[:m], end)[selected]
+        keep = end > start
+        return listener[:m][selected][keep], start[keep], end[keep], device[:m][selected][keep]
+
+
+class DayGrid:
+    """Partition de la journée (créneaux horaires ou émissions) : bornes triées en ms et libellé de chaque intervalle"""
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals, key=lambda interval: interval[1])
+        self.labels = [label for label, _, _ in intervals]
+        self.starts = np.array([start for _, start, _ in intervals], dtype=np.int64)
+        self.ends = np.array([end for _, _, end in intervals], dtype=np.int64)
+        self.names = list(dict.fromkeys(self.labels))
+        self.group = np.array([self.names.index(label) for label in self.labels])
+
+    @classmethod
+    def slots(cls):
+        return cls([(label, first * 3_600_000, last * 3_600_000) for label, first, last in SLOTS])
+
+    @classmethod
+    def shows(cls, day, grid=None):
+        """Émissions de la grille pour le jour de la semaine de day"""
+        weekday = DAYS[day.weekday()]
+        intervals = []
+        for entry in grid or load_weekly_grid(os.environ.get('SKYROCK_PROGRAMME')):
+            if entry['day'] == weekday:
+                start = _ms(entry['start'])
+                end = _ms(entry['end']) or DAY_MS
+                intervals.append((entry['name'], start, end if end > start else DAY_MS))
+        return cls(intervals)
+
+    def listening(self, start, end, device):
+        """Temps d'écoute (ms) des sessions dans chaque intervalle, par support : (intervalles × supports)"""
+        totals = np.zeros((len(self.starts), len(DEVICES)))
+        for i, (first, last) in enumerate(zip(self.starts, self.ends)):
+            overlap = np.minimum(end, last) - np.maximum(start, first)
+            totals[i] = np.bincount(device, weights=np.clip(overlap, 0, None), minlength=len(DEVICES))
+        return totals
+
+    def locate(self, ms):
+        return np.clip(np.searchsorted(self.starts, ms, side='right') - 1, 0, len(self.starts) - 1)
+
+
+def _ms(hhmm):
+    hours, minutes = hhmm.split(':')
+    return (int(hours) * 60 + int(minutes)) * 60_000
+
+
+class SessionAccumulator:
+    """Agrégats de la journée mis à jour bloc par bloc : temps d'écoute et supports par créneau/émission, durées, TSL"""
+
+    def __init__(self, grids):
+        self.grids = grids
+        self.listening = {name: np.zeros((len(grid.starts), len(DEVICES))) for name, grid in grids.items()}
+        self.started = {name: np.zeros(len(grid.starts)) for name, grid in grids.items()}
+        self.lengths = np.zeros((len(DEVICES), len(LENGTH_BINS) + 1), dtype=np.int64)
+        self.tsl = np.zeros(len(LENGTH_BINS) + 1, dtype=np.int64)
+        self.sessions = 0
+        self.listeners = 0
+        self.total_ms = 0.0
+        # Temps d'écoute de l'auditeur en cours (ses sessions peuvent continuer au bloc suivant)
+        self._listener = -1
+        self._listener_ms = 0
+
+    def add(self, listener, start, end, device):
+        duration = end - start
+        self.sessions += len(duration)
+        self.total_ms += float(duration.sum())
+        for name, grid in self.grids.items():
+            self.listening[name] += grid.listening(start, end, device)
+            self.started[name] += np.bincount(grid.locate(start), minlength=len(grid.starts))
+        bins = np.searchsorted(LENGTH_BINS, duration / 1000, side='right')
+        self.lengths += np.bincount(device * (len(LENGTH_BINS) + 1) + bins,
+                                    minlength=self.lengths.size).reshape(self.lengths.shape)
+        self._add_listeners(listener, duration)
+
+    def _add_listeners(self, listener, duration):
+        """Temps d'écoute par auditeur : sessions consécutives d'un même auditeur (flux trié par auditeur)"""
+        if len(listener) == 0:
+            return
+        boundaries = np.flatnonzero(np.diff(listener)) + 1
+        starts = np.concatenate([[0], boundaries])
+        totals = np.add.reduceat(duration, starts)
+        ids = listener[starts]
+        if ids[0] == self._listener:
+            totals[0] += self._listener_ms
+        else:
+            self._close_listener()
+        # Le dernier auditeur du bloc reste ouvert
+        self._record_tsl(totals[:-1])
+        self._listener, self._listener_ms = ids[-1], totals[-1]
+
+    def _record_tsl(self, totals):
+        self.listeners += len(totals)
+        self.tsl += np.bincount(np.searchsorted(LENGTH_BINS, np.asarray(totals) / 1000, side='right'),
+                                minlength=len(self.tsl))
+
+    def _close_listener(self):
+        if self._listener >= 0:
+            self._record_tsl([self._listener_ms])
+        self._listener, self._listener_ms = -1, 0
+
+    def frames(self):
+        """Tableaux de synthèse (créneaux, émissions, distributions, indicateurs)"""
+        self._close_listener()
+        frames = {}
+        for name, grid in self.grids.items():
+            rows = []
+            for i, label in enumerate(grid.names):
+                members = grid.group == i
+                listening = self.listening[name][members].sum(axis=0)
+                span = float((grid.ends - grid.starts)[members].sum())
+                total = listening.sum()
+                rows.append({
+                    'libelle': label,
+                    'heures_ecoute': total / 3_600_000,
+                    'auditeurs_moyens': total / span,
+                    'part_ecoute': total / self.total_ms * 100 if self.total_ms else 0.0,
+                    'sessions_commencees': float(self.started[name][members].sum()),
+                    **{f"{device}_pourcent": listening[d] / total * 100 if total else 0.0
+                       for d, device in enumerate(DEVICES)}
+                })
+            frames[name] = pd.DataFrame(rows)
+        edges = np.concatenate([[0.0], LENGTH_BINS])
+        frames['durees'] = pd.DataFrame({
+            'min_secondes': edges, 'max_secondes': np.concatenate([LENGTH_BINS, [np.inf]]),
+            **{device: self.lengths[d] for d, device in enumerate(DEVICES)},
+            'tsl_auditeurs': self.tsl
+        })
+        frames['indicateurs'] = pd.DataFrame([{
+            'sessions': self.sessions, 'auditeurs': self.listeners,
+            'heures_ecoute': self.total_ms / 3_600_000,
+            'tsl_minutes': self.total_ms / self.listeners / 60_000 if self.listeners else 0.0,
+            'tsl_mediane_minutes': _histogram_quantile(self.tsl, 0.5) / 60,
+            'session_mediane_minutes': _histogram_quantile(self.lengths.sum(axis=0), 0.5) / 60
+        }])
+        return frames
+
+
+def _histogram_quantile(counts, q):
+    """Quantile (secondes) d'une distribution en seaux LENGTH_BINS (milieu géométrique du seau)"""
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    i = int(np.searchsorted(np.cumsum(counts), q * total))
+    edges = np.concatenate([[LENGTH_BINS[0] / 2], LENGTH_BINS, [LENGTH_BINS[-1]]])
+    return float(np.sqrt(edges[i] * edges[i + 1]))
+
+
+def sessionize_day(chunks, output_dir, day=None, grid=None, chunk_events=CHUNK_EVENTS, merge_block=MERGE_BLOCK):
+    """Événements bruts d'une journée → sessions en colonnes .npy et tableaux de synthèse ; retourne les synthèses"""
+    day = day or date.today()
+    timings = {}
+    workdir = tempfile.mkdtemp(prefix='skyrock_runs_', dir=output_dir if os.path.isdir(output_dir) else None)
+    os.makedirs(os.path.join(output_dir, 'sessions'), exist_ok=True)
+    try:
+        t = time.perf_counter()
+        paths = write_runs(chunks, workdir, chunk_events)
+        timings['runs'] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        columns = {name: ColumnWriter(os.path.join(output_dir, 'sessions', f"sessions.{i}.npy"), dtype)
+                   for i, (name, dtype) in enumerate([('listener', np.int64), ('start_ms', np.int32),
+                                                      ('duration_ms', np.int32), ('device', np.int8)])}
+        sessionizer = Sessionizer()
+        accumulator = SessionAccumulator({'creneaux': DayGrid.slots(), 'emissions': DayGrid.shows(day, grid)})
+        events = 0
+        blocks = merge_runs(paths, merge_block)
+        block = next(blocks, None)
+        while block is not None:
+            following = next(blocks, None)
+            events += len(block)
+            listener, start, end, device = sessionizer.feed(block, final=following is None)
+            for name, values in (('listener', listener), ('start_ms', start), ('duration_ms', end - start),
+                                 ('device', device)):
+                columns[name].append(values)
+            accumulator.add(listener, start, end, device)
+            block = following
+        for writer in columns.values():
+            writer.close()
+        timings['merge'] = time.perf_counter() - t
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # Manifeste au format des instantanés (relecture : WarmSnapshot.open(...).frame('sessions'))
+    manifest = {'fingerprint': source_fingerprint(__file__), 'created': time.time(), 'day': day.isoformat(),
+                'frames': {'sessions': {'rows': columns['listener'].rows, 'index': [], 'columns_name': None,
+                                        'columns': [{'name': name, 'file': os.path.basename(writer.path),
+                                                     'kind': 'numeric'} for name, writer in columns.items()]}}}
+    with open(os.path.join(output_dir, 'sessions', 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    frames = accumulator.frames()
+    WarmSnapshot.write(os.path.join(output_dir, 'summary'), frames, source_fingerprint(__file__))
+    return SessionSummary(frames, day, events, timings)
+
+
+class SessionSummary:
+    """Synthèse d'une journée sessionisée : temps d'écoute, durées, mix des supports par créneau et par émission"""
+
+    def __init__(self, frames, day=None, events=None, timings=None):
+        self.frames = frames
+        self.day = day
+        self.events = events
+        self.timings = timings or {}
+
+    @classmethod
+    def open(cls, directory=SESSIONS_DIR):
+        snapshot = WarmSnapshot.open(os.path.join(directory, 'summary'), source_fingerprint(__file__))
+        if snapshot is None:
+            return None
+        names = ['creneaux', 'emissions', 'durees', 'indicateurs']
+        return cls({name: snapshot.frame(name) for name in names})
+
+    @property
+    def indicators(self):
+        return self.frames['indicateurs'].iloc[0]
+
+    def peak_slot(self):
+        """Créneau au plus grand nombre moyen d'auditeurs"""
+        slots = self.frames['creneaux']
+        return slots.loc[slots['auditeurs_moyens'].idxmax(), 'libelle']
+
+    def device_mix(self, hour=None):
+        """Part (%) de chaque support dans le temps d'écoute, sur la journée ou sur le créneau de hour"""
+        slots = self.frames['creneaux']
+        if hour is None:
+            weights = slots['heures_ecoute'] / slots['heures_ecoute'].sum()
+            return {device: float((slots[f"{device}_pourcent"] * weights).sum()) for device in DEVICES}
+        label = next(label for label, first, last in SLOTS if first <= hour < last)
+        row = slots[slots['libelle'] == label].iloc[0]
+        return {device: float(row[f"{device}_pourcent"]) for device in DEVICES}
+
+
+def simulate_events(n_events, n_listeners=None, chunk_events=CHUNK_EVENTS, seed=0):
+    """Journée synthétique de connexions/déconnexions (ms depuis minuit), par blocs dans le désordre"""
+    rng = np.random.default_rng(seed)
+    n_listeners = n_listeners or max(1, n_events // 8)
+    hours = hour_factors('Musique')
+    hours = hours / hours.sum()
+    # Supports par heure : voiture aux heures de trajet, domicile le soir
+    mix = np.tile([0.65, 0.22, 0.13], (24, 1))
+    mix[[7, 8, 17, 18]] = [0.45, 0.45, 0.10]
+    mix[20:24] = [0.60, 0.08, 0.32]
+    mix[0:6] = [0.72, 0.03, 0.25]
+    cumulative = np.cumsum(mix, axis=1)
+    produced = 0
+    while produced < n_events:
+        n_sessions = min(chunk_events, n_events - produced) // 2 or 1
+        hour = rng.choice(24, n_sessions, p=hours)
+        start = hour * 3_600_000 + rng.integers(0, 3_600_000, n_sessions)
+        duration = np.minimum(rng.lognormal(np.log(25 * 60_000), 1.1, n_sessions), 6 * 3_600_000).astype(np.int64)
+        end = np.minimum(start + duration, DAY_MS - 1)
+        listener = rng.integers(0, n_listeners, n_sessions)
+        device = (rng.random(n_sessions)[:, None] > cumulative[hour]).sum(axis=1)
+        # Quelques déconnexions perdues (coupure réseau : la session dure jusqu'à l'événement suivant)
+        lost = rng.random(n_sessions) < 0.03
+        ms = np.concatenate([start, end[~lost]])
+        kind = np.concatenate([np.full(n_sessions, CONNECT), np.full(int((~lost).sum()), DISCONNECT)])
+        yield ms, np.concatenate([listener, listener[~lost]]), kind, np.concatenate([device, device[~lost]])
+        produced += len(ms)
+
+
+def read_event_csv(path, day, chunk_rows=CHUNK_EVENTS):
+    """Journal d'événements CSV (timestamp, listener, event=connect|disconnect|play, device=mobile|car|home), par blocs"""
+    midnight = pd.Timestamp(day)
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        # Autres événements du journal (lectures de titres) ignorés
+        chunk = chunk[chunk['event'].isin(['connect', 'disconnect'])]
+        ms = ((pd.to_datetime(chunk['timestamp']) - midnight) // pd.Timedelta(milliseconds=1)).to_numpy(np.int64)
+        kind = (chunk['event'].to_numpy() == 'connect').astype(np.int64)
+        device = pd.Categorical(chunk['device'], categories=DEVICES).codes.astype(np.int64)
+        yield ms, chunk['listener'].to_numpy(np.int64), kind, np.where(device < 0, 0, device)
+
+
+@st.cache_resource
+def get_session_summary():
+    """Journée sessionisée (SKYROCK_SESSIONS) ; sinon une journée simulée réduite, sessionisée au premier accès"""
+    summary = SessionSummary.open()
+    if summary is None:
+        directory = tempfile.mkdtemp(prefix='skyrock_sessions_')
+        summary = sessionize_day(simulate_events(400_000), directory)
+        shutil.rmtree(directory, ignore_errors=True)
+    return summary
+
+
+def benchmark(n_events=50_000_000, directory=None):
+    """Sessionisation d'une journée de n_events événements : débit, mémoire et taille de la sortie
+    (répertoire temporaire supprimé à la fin si directory n'est pas donné)"""
+    owned = directory is None
+    directory = directory or tempfile.mkdtemp(prefix='skyrock_sessions_')
+    try:
+        _benchmark(n_events, directory)
+    finally:
+        if owned:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _benchmark(n_events, directory):
+    start = time.perf_counter()
+    summary = sessionize_day(simulate_events(n_events), directory)
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+    indicators = summary.indicators
+    print(f"{summary.events:,} événements en {elapsed:.1f} s ({summary.events / elapsed / 1e6:.1f} M/s) — "
+          f"runs triés {summary.timings['runs']:.1f} s, fusion + sessions {summary.timings['merge']:.1f} s")
+    print(f"  mémoire max du processus {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} Mo ; "
+          f"sortie {size / 1e6:.0f} Mo")
+    print(f"  {int(indicators['sessions']):,} sessions, {int(indicators['auditeurs']):,} auditeurs, "
+          f"TSL moyen {indicators['tsl_minutes']:.0f} min (médiane {indicators['tsl_mediane_minutes']:.0f} min), "
+          f"session médiane {indicators['session_mediane_minutes']:.0f} min ; pic {summary.peak_slot()}")
+    print(summary.frames['creneaux'].round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sessions d'écoute à partir des connexions/déconnexions")
+    parser.add_argument('--build', action='store_true', help=f"sessionise une journée dans {SESSIONS_DIR}")
+    parser.add_argument('--events', type=int, default=50_000_000, help="taille de la journée simulée")
+    parser.add_argument('--csv', help="journal CSV (timestamp, listener, event, device) au lieu de la simulation")
+    parser.add_argument('--day', default=None, help="jour du journal (AAAA-MM-JJ)")
+    args = parser.parse_args()
+
+    day = datetime.strptime(args.day, '%Y-%m-%d').date() if args.day else date.today()
+    if args.build:
+        chunks = read_event_csv(args.csv, day) if args.csv else simulate_events(args.events)
+        os.makedirs(SESSIONS_DIR, exist_ok=True)
+        summary = sessionize_day(chunks, SESSIONS_DIR, day)
+        print(f"{summary.events:,} événements sessionisés dans {SESSIONS_DIR}")
+    else:
+        benchmark(args.events)
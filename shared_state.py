@@ -0,0 +1,392 @@
+# shared_state.py
+import argparse
+import fcntl
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Dimensions du segment (fixes : tous les processus projettent la même disposition)
+MAGIC = b'SKYLIVE1'
+SERIES_CAPACITY = 1024
+MAX_REGIONS = 32
+META_CAPACITY = 16384
+HEADER_SIZE = 64
+DEVICES = ['mobile_listeners', 'car_listeners', 'home_listeners']
+
+# Champs d'un emplacement : (nom, type, nombre d'éléments)
+SLOT_FIELDS = [
+    ('stamp', np.uint64, 1),
+    ('n_points', np.int64, 1),
+    ('n_regions', np.int64, 1),
+    ('series_version', np.int64, 1),
+    ('meta_length', np.int64, 1),
+    ('timestamps', np.int64, SERIES_CAPACITY),
+    ('listeners', np.int64, SERIES_CAPACITY),
+    ('engagement', np.int64, SERIES_CAPACITY),
+    ('mobile_percent', np.int64, SERIES_CAPACITY),
+    ('regions', np.int64, MAX_REGIONS),
+    ('devices', np.int64, len(DEVICES)),
+    ('meta', np.uint8, META_CAPACITY),
+    # Recopie de stamp écrite en dernier (contrôle de cohérence du banc d'essai)
+    ('stamp_end', np.uint64, 1),
+]
+SLOT_SIZE = sum(np.dtype(dtype).itemsize * count for _, dtype, count in SLOT_FIELDS)
+SEGMENT_SIZE = HEADER_SIZE + 2 * SLOT_SIZE
+
+
+def _slot_views(buffer, offset):
+    """Tableaux numpy posés sur un emplacement du segment (aucune copie)"""
+    views = {}
+    for name, dtype, count in SLOT_FIELDS:
+        views[name] = np.ndarray((count,), dtype=dtype, buffer=buffer, offset=offset)
+        offset += np.dtype(dtype).itemsize * count
+    return views
+
+
+class LiveView:
+    """Instantané lu dans le segment : vues sans copie, valides tant que l'écrivain n'a pas réécrit l'emplacement"""
+
+    def __init__(self, state, base, slot, meta):
+        self.state = state
+        self.base = base
+        self.version = base // 2
+        self.meta = meta
+        n, r = int(slot['n_points'][0]), int(slot['n_regions'][0])
+        self.series_version = int(slot['series_version'][0])
+        self.timestamps = slot['timestamps'][:n]
+        self.listeners = slot['listeners'][:n]
+        self.engagement = slot['engagement'][:n]
+        self.mobile_percent = slot['mobile_percent'][:n]
+        self.regions = slot['regions'][:r]
+        self.devices = slot['devices']
+        self.stamps = (int(slot['stamp'][0]), int(slot['stamp_end'][0]))
+
+    def valid(self):
+        """Vrai tant que l'emplacement lu n'a pas commencé à être réécrit (à vérifier après usage des vues)"""
+        return self.state.sequence() <= self.base + 2
+
+    def series(self):
+        """Série live (format de SkyrockLiveDashboard.historical_data), copiée hors du segment"""
+        timestamps = pd.to_datetime(self.timestamps.copy().view('datetime64[ns]'))
+        return pd.DataFrame({
+            'timestamp': timestamps,
+            'listeners': self.listeners.copy(),
+            'hour': timestamps.hour,
+            'mobile_percent': self.mobile_percent.copy(),
+            'engagement': self.engagement.copy()
+        })
+
+
+class SharedLiveState:
+    """État live publié une fois dans un fichier projeté en mémoire, lu par tous les processus workers
+
+    Seqlock à double emplacement : l'écrivain passe le compteur à impair, remplit l'emplacement
+    inactif, puis le repasse à pair. Un lecteur prend l'emplacement du dernier compteur pair, sans
+    verrou ni aller-retour IPC, et vérifie ensuite que le compteur n'a pas avancé de plus d'une
+    publication (l'emplacement lu n'est réécrit qu'à la publication suivante).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mm = None
+        self._seq = None
+        self._slots = None
+        self._lock_fd = None
+        self._election = threading.Lock()
+        # Publieur démarré dans ce processus s'il a été élu écrivain
+        self.publisher = None
+        self._meta_base = None
+        self._meta = None
+        self.retries = 0
+
+    def _attach(self, create=False):
+        """Projette le segment ; False s'il n'a pas encore été initialisé par un écrivain"""
+        if self._mm is not None:
+            return True
+        import mmap
+
+        flags = os.O_RDWR | (os.O_CREAT if create else 0)
+        try:
+            fd = os.open(self.path, flags, 0o644)
+        except FileNotFoundError:
+            return False
+        try:
+            if create and os.fstat(fd).st_size != SEGMENT_SIZE:
+                os.ftruncate(fd, SEGMENT_SIZE)
+            elif os.fstat(fd).st_size != SEGMENT_SIZE:
+                return False
+            mm = mmap.mmap(fd, SEGMENT_SIZE)
+        finally:
+            os.close(fd)
+        header = np.ndarray((HEADER_SIZE,), dtype=np.uint8, buffer=mm)
+        if create and bytes(header[:8]) != MAGIC:
+            header[8:] = 0
+            # Le marqueur en dernier : un lecteur ne voit jamais un en-tête à moitié écrit
+            header[:8] = np.frombuffer(MAGIC, dtype=np.uint8)
+        elif bytes(header[:8]) != MAGIC:
+            mm.close()
+            return False
+        self._mm = mm
+        self._seq = np.ndarray((1,), dtype=np.uint64, buffer=mm, offset=8)
+        self._slots = [_slot_views(mm, HEADER_SIZE), _slot_views(mm, HEADER_SIZE + SLOT_SIZE)]
+        return True
+
+    def sequence(self):
+        return int(self._seq[0])
+
+    # Écrivain
+
+    def acquire_writer(self):
+        """Élection de l'écrivain : verrou exclusif non bloquant, libéré à la mort du processus"""
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        self._attach(create=True)
+        return True
+
+    def ensure_writer(self, dashboard_factory, interval=1.0):
+        """Démarre le publieur si ce processus obtient le verrou d'écrivain (tenté à chaque rerun)"""
+        with self._election:
+            if self.publisher is None and self.acquire_writer():
+                self.publisher = SharedLivePublisher(self, dashboard_factory(), interval).start()
+        return self.publisher is not None
+
+    def publish(self, dashboard, series_version=0):
+        """Écrit l'état du tableau de bord dans l'emplacement inactif puis le rend visible"""
+        seq = self._seq
+        if int(seq[0]) % 2 == 0:
+            seq[0] += 1
+        # Compteur impair : une publication interrompue est reprise sur le même emplacement
+        current = int(seq[0])
+        slot = self._slots[((current + 1) // 2) % 2]
+
+        state = dashboard.snapshot()
+        geo = state.pop('geo_data')
+        if len(geo) > MAX_REGIONS:
+            raise ValueError(f"{len(geo)} régions (maximum {MAX_REGIONS})")
+        devices = [state['live_data'].pop(device) for device in DEVICES]
+        state['regions'] = list(geo)
+        meta = json.dumps(state, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if len(meta) > META_CAPACITY:
+            raise ValueError(f"état live de {len(meta)} octets (maximum {META_CAPACITY})")
+
+        df = dashboard.historical_data.tail(SERIES_CAPACITY)
+        n = len(df)
+        slot['stamp'][0] = current
+        slot['n_points'][0] = n
+        slot['n_regions'][0] = len(geo)
+        slot['series_version'][0] = series_version
+        slot['meta_length'][0] = len(meta)
+        slot['timestamps'][:n] = df['timestamp'].to_numpy('datetime64[ns]').view(np.int64)
+        slot['listeners'][:n] = df['listeners'].to_numpy()
+        slot['engagement'][:n] = df['engagement'].to_numpy()
+        slot['mobile_percent'][:n] = df['mobile_percent'].to_numpy()
+        slot['regions'][:len(geo)] = list(geo.values())
+        slot['devices'][:] = devices
+        slot['meta'][:len(meta)] = np.frombuffer(meta, dtype=np.uint8)
+        slot['stamp_end'][0] = current
+        # Écritures ordonnées (x86 TSO) : le compteur pair publie l'emplacement complet
+        seq[0] = current + 1
+        return (current + 1) // 2
+
+    # Lecteurs
+
+    def read(self, max_retries=100):
+        """Dernier instantané cohérent (LiveView), ou None si rien n'a encore été publié"""
+        if not self._attach():
+            return None
+        for _ in range(max_retries):
+            current = int(self._seq[0])
+            base = current - current % 2
+            if base == 0:
+                return None
+            slot = self._slots[(base // 2) % 2]
+            if base != self._meta_base:
+                length = int(slot['meta_length'][0])
+                raw = slot['meta'][:length].tobytes()
+            view = LiveView(self, base, slot, None)
+            if not view.valid():
+                self.retries += 1
+                continue
+            if base != self._meta_base:
+                # Métadonnées décodées une fois par publication et par processus
+                self._meta, self._meta_base = json.loads(raw), base
+            view.meta = self._meta
+            return view
+        return None
+
+    def apply(self, dashboard):
+        """Charge le dernier instantané dans un tableau de bord local ; False si aucun n'est disponible"""
+        view = self.read()
+        if view is None:
+            return False
+        if view.version == getattr(dashboard, 'shared_version', None):
+            # Publication déjà chargée (lecteur de longue durée : API)
+            return True
+        meta = view.meta
+        # Métadonnées partagées entre lectures : le tableau de bord reçoit des copies
+        state = json.loads(json.dumps(meta))
+        state['live_data'].update(zip(DEVICES, view.devices.tolist()))
+        state['geo_data'] = dict(zip(state.pop('regions'), view.regions.tolist()))
+        series = view.series() if view.series_version != getattr(dashboard, 'shared_series_version', None) else None
+        if not view.valid():
+            # Écrivain passé deux fois pendant la copie : on garde l'état précédent jusqu'au rerun suivant
+            return False
+        dashboard.apply_snapshot(state, series)
+        dashboard.shared_version = view.version
+        if series is not None:
+            dashboard.shared_series_version = view.series_version
+        return True
+
+
+class SharedLivePublisher:
+    """Processus écrivain : avance l'état live à intervalle fixe et le publie dans le segment"""
+
+    def __init__(self, state, dashboard, interval=1.0):
+        self.state = state
+        self.dashboard = dashboard
+        self.interval = interval
+        self.publishes = 0
+        self._series = None
+        self._series_version = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def tick(self):
+        with self.dashboard.lock:
+            self.dashboard.advance()
+            # La série n'est recopiée par les lecteurs que lorsqu'elle est remplacée (point de 5 minutes, bouclage du rejeu)
+            if self.dashboard.historical_data is not self._series:
+                self._series = self.dashboard.historical_data
+                self._series_version += 1
+            self.state.publish(self.dashboard, self._series_version)
+        self.publishes += 1
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.wait(max(0.0, next_tick - time.monotonic())):
+            self.tick()
+            next_tick += self.interval
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def default_path():
+    """Fichier du segment : mémoire partagée du noyau (/dev/shm) si disponible"""
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, 'skyrock_live')
+
+
+def _reader_process(path, seconds, ready, start):
+    """Lecteur du banc d'essai : lectures en boucle, durée de chaque lecture"""
+    state = SharedLiveState(path)
+    ready.set()
+    start.wait()
+    durations, torn, versions = [], 0, set()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        t = time.perf_counter_ns()
+        view = state.read()
+        total = int(view.regions.sum()) + int(view.listeners[-1])
+        ok = view.valid()
+        durations.append(time.perf_counter_ns() - t)
+        if ok and view.stamps[0] != view.stamps[1]:
+            torn += 1
+        versions.add(view.version)
+    durations = np.array(durations) / 1000
+    return {'reads': len(durations), 'p50_us': float(np.percentile(durations, 50)),
+            'p99_us': float(np.percentile(durations, 99)), 'torn': torn, 'retries': state.retries,
+            'versions': len(versions), 'checksum': total}
+
+
+def benchmark(workers=(1, 2, 4, 8, 16), seconds=2.0, interval=0.001):
+    """Coût d'une lecture cohérente selon le nombre de processus lecteurs, écrivain à 1 kHz"""
+    from DLive import SkyrockLiveDashboard
+
+    path = default_path() + f'.bench{os.getpid()}'
+    dashboard = SkyrockLiveDashboard()
+    t = time.perf_counter()
+    for _ in range(20):
+        dashboard.advance()
+    tick_ms = (time.perf_counter() - t) / 20 * 1000
+    print(f"Mise à jour live : {tick_ms:.2f} ms par tick, faite par chaque worker sans état partagé "
+          f"et une seule fois avec ({os.cpu_count()} CPU)")
+
+    state = SharedLiveState(path)
+    state.acquire_writer()
+    publisher = SharedLivePublisher(state, dashboard, interval=interval)
+    publisher.tick()
+    t = time.perf_counter()
+    for _ in range(1000):
+        state.publish(dashboard)
+    print(f"Publication : {(time.perf_counter() - t) * 1000:.1f} µs par écriture "
+          f"(segment de {SEGMENT_SIZE:,} octets)")
+
+    context = multiprocessing.get_context('spawn')
+    try:
+        for n in workers:
+            manager = context.Manager()
+            ready = [manager.Event() for _ in range(n)]
+            start = manager.Event()
+            with context.Pool(n) as pool:
+                results = [pool.apply_async(_reader_process, (path, seconds, ready[i], start)) for i in range(n)]
+                for event in ready:
+                    event.wait()
+                before = publisher.publishes
+                publisher.start()
+                start.set()
+                results = [result.get() for result in results]
+                publisher.stop()
+            manager.shutdown()
+            reads = sum(r['reads'] for r in results)
+            print(f"{n:3d} lecteurs : p50 {np.median([r['p50_us'] for r in results]):5.1f} µs, "
+                  f"p99 {np.median([r['p99_us'] for r in results]):6.1f} µs par lecture — {reads:,} lectures, "
+                  f"{publisher.publishes - before:,} publications, {sum(r['retries'] for r in results)} reprises, "
+                  f"{sum(r['torn'] for r in results)} lectures incohérentes")
+    finally:
+        state._mm.close()
+        for suffix in ('', '.lock'):
+            os.unlink(path + suffix)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="État live partagé entre processus")
+    parser.add_argument('--publish', metavar='CHEMIN', nargs='?', const='',
+                        help="processus écrivain dédié (sinon un worker Streamlit est élu)")
+    parser.add_argument('--interval', type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.publish is not None:
+        from DLive import SkyrockLiveDashboard
+
+        state = SharedLiveState(args.publish or os.environ.get('SKYROCK_SHARED_STATE') or default_path())
+        if not state.acquire_writer():
+            raise SystemExit(f"Un écrivain publie déjà dans {state.path}")
+        SharedLivePublisher(state, SkyrockLiveDashboard(), args.interval).start()
+        print(f"Publication de l'état live dans {state.path} toutes les {args.interval:g}s")
+        threading.Event().wait()
+    else:
+        benchmark()
@@ -0,0 +1,285 @@
+# snapshot_publisher.py
+import argparse
+import asyncio
+import hashlib
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from DLive import SkyrockLiveDashboard
+
+# Page autonome pour les écrans muraux : CSS et données inline, puis
+# interrogation conditionnelle de /snapshot.json (If-None-Match)
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>Skyrock Live - Mur</title>
+<style>
+    body {{ font-family: sans-serif; background: #111; color: #eee; margin: 2rem; }}
+    h1 {{ color: #FF6B00; font-size: 3rem; margin: 0; }}
+    .live-badge {{ background: #FF6B00; color: white; padding: 0.3rem 1rem; border-radius: 20px; font-weight: bold; }}
+    .grid {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; margin: 2rem 0; }}
+    .metric-card {{ background: rgba(255, 107, 0, 0.15); padding: 1.2rem; border-radius: 15px; border-left: 5px solid #FF6B00; }}
+    .metric-card h2 {{ margin: 0.3rem 0; font-size: 2.2rem; }}
+    ol li {{ margin: 0.4rem 0; font-size: 1.3rem; }}
+</style>
+</head>
+<body>
+<h1>SKYROCK LIVE</h1>
+<span class="live-badge">🔴 EN DIRECT</span> <small id="updated">{updated_at}</small>
+<div class="grid">
+    <div class="metric-card"><p>AUDITEURS ACTUELS</p><h2 id="listeners">{listeners}</h2></div>
+    <div class="metric-card"><p>PIC DU JOUR</p><h2 id="peak">{peak}</h2></div>
+    <div class="metric-card"><p>ÉCOUTE MOBILE</p><h2 id="mobile">{mobile}%</h2></div>
+    <div class="metric-card"><p>ÉMISSION</p><h2 id="show">{show}</h2></div>
+</div>
+<h3>🎵 TOP 5 EN COURS</h3>
+<ol id="tracks">{tracks}</ol>
+<script>
+const POLL_MS = {poll_ms};
+let etag = {etag_js};
+const fmt = n => n.toLocaleString('fr-FR');
+const esc = s => String(s).replace(/[&<>"]/g, c => ({{'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}}[c]));
+async function poll() {{
+    try {{
+        const response = await fetch('snapshot.json', {{headers: {{'If-None-Match': etag}}, cache: 'no-cache'}});
+        if (response.status === 200) {{
+            etag = response.headers.get('ETag');
+            const s = await response.json();
+            document.getElementById('updated').textContent = s.updated_at;
+            document.getElementById('listeners').textContent = fmt(s.live_data.current_listeners);
+            document.getElementById('peak').textContent = fmt(s.live_data.peak_today);
+            document.getElementById('mobile').textContent = s.live_data.mobile_listeners + '%';
+            document.getElementById('show').textContent = s.current_show.name;
+            document.getElementById('tracks').innerHTML = s.top_tracks.slice(0, 5)
+                .map(t => `<li><strong>${{esc(t.artist)}}</strong> - ${{esc(t.title)}} (${{t.plays}})</li>`).join('');
+        }}
+    }} catch (e) {{}}
+    setTimeout(poll, POLL_MS);
+}}
+setTimeout(poll, POLL_MS);
+</script>
+</body>
+</html>
+"""
+
+
+def quote_etag(digest):
+    return f'"{digest}"'
+
+
+class Snapshot:
+    """Rendu figé de l'état live (JSON + HTML) avec son empreinte"""
+
+    def __init__(self, state, poll_interval):
+        self.version = state['version']
+        self.json = json.dumps(state, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        self.etag = quote_etag(hashlib.sha256(self.json).hexdigest()[:32])
+
+        live = state['live_data']
+        tracks = ''.join(
+            f"<li><strong>{html.escape(track['artist'])}</strong> - {html.escape(track['title'])} ({track['plays']})</li>"
+            for track in state['top_tracks'][:5]
+        )
+        self.html = PAGE_TEMPLATE.format(
+            updated_at=state['updated_at'],
+            listeners=f"{live['current_listeners']:,}".replace(',', ' '),
+            peak=f"{live['peak_today']:,}".replace(',', ' '),
+            mobile=live['mobile_listeners'],
+            show=html.escape(state['current_show']['name']),
+            tracks=tracks,
+            poll_ms=int(poll_interval * 1000),
+            etag_js=json.dumps(self.etag)
+        ).encode('utf-8')
+        # La page embarque les données : empreinte propre
+        self.html_etag = quote_etag(hashlib.sha256(self.html).hexdigest()[:32])
+
+
+class SnapshotPublisher:
+    """Calcule l'état live une fois par tick et le publie pour tous les écrans"""
+
+    def __init__(self, dashboard=None, interval=5.0, poll_interval=None):
+        self.dashboard = dashboard or SkyrockLiveDashboard()
+        self.interval = interval
+        self.poll_interval = poll_interval or interval
+        self.renders = 0
+        self.changes = 0
+        self.ticks = 0
+        self.current = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.publish()
+
+    def publish(self):
+        """Rend l'état courant ; le rendu est remplacé d'un bloc (lecture sans verrou)"""
+        snapshot = Snapshot(self.dashboard.snapshot(), self.poll_interval)
+        self.renders += 1
+        if self.current is None or snapshot.etag != self.current.etag:
+            self.current = snapshot
+            self.changes += 1
+        return self.current
+
+    def tick(self):
+        self.dashboard.update_live_data()
+        self.ticks += 1
+        return self.publish()
+
+    def _run(self):
+        next_tick = time.monotonic() + self.interval
+        while not self._stop.wait(max(0.0, next_tick - time.monotonic())):
+            self.tick()
+            next_tick += self.interval
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class SnapshotRequestHandler(BaseHTTPRequestHandler):
+    """Sert le dernier rendu avec ETag / If-None-Match"""
+    protocol_version = 'HTTP/1.1'
+    publisher = None
+    responses_sent = {200: 0, 304: 0, 404: 0}
+
+    def do_GET(self):
+        snapshot = self.publisher.current
+        path = self.path.split('?', 1)[0]
+        if path in ('/', '/index.html', '/snapshot.html'):
+            body, etag, content_type = snapshot.html, snapshot.html_etag, 'text/html; charset=utf-8'
+        elif path == '/snapshot.json':
+            body, etag, content_type = snapshot.json, snapshot.etag, 'application/json'
+        else:
+            self._respond(404, b'', None, 'text/plain')
+            return
+
+        if etag in self.headers.get('If-None-Match', ''):
+            self._respond(304, b'', etag, content_type)
+        else:
+            self._respond(200, body, etag, content_type)
+
+    def _respond(self, status, body, etag, content_type):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        if status != 304:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        self.responses_sent[status] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(publisher, host='127.0.0.1', port=8502):
+    """Démarre le serveur HTTP dans un thread et retourne l'instance"""
+    handler = type('Handler', (SnapshotRequestHandler,), {
+        'publisher': publisher,
+        'responses_sent': {200: 0, 304: 0, 404: 0}
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _screen(host, port, poll_interval, offset, deadline, results):
+    """Un écran : connexion persistante, interrogation conditionnelle"""
+    reader, writer = await asyncio.open_connection(host, port)
+    etag = None
+    # Décalage initial : les écrans ne démarrent pas tous ensemble
+    await asyncio.sleep(offset)
+    try:
+        while time.monotonic() < deadline:
+            request = f"GET /snapshot.json HTTP/1.1\r\nHost: {host}\r\n"
+            if etag:
+                request += f"If-None-Match: {etag}\r\n"
+            start = time.perf_counter()
+            writer.write((request + "\r\n").encode('ascii'))
+            status_line = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            if length:
+                await reader.readexactly(length)
+            status = int(status_line.split()[1])
+            etag = headers.get('etag', etag)
+            results['latencies'].append(time.perf_counter() - start)
+            results[status] = results.get(status, 0) + 1
+            results['bytes'] += length
+            await asyncio.sleep(poll_interval)
+    finally:
+        writer.close()
+
+
+async def _load(host, port, screens, poll_interval, duration):
+    results = {'latencies': [], 'bytes': 0}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        _screen(host, port, poll_interval, poll_interval * i / screens, deadline, results)
+        for i in range(screens)
+    ))
+    return results
+
+
+def load_test(screens=500, duration=20.0, interval=2.0, poll_interval=1.0, port=8599):
+    """Test de charge : N écrans interrogent le publieur pendant duration secondes"""
+    publisher = SnapshotPublisher(interval=interval, poll_interval=poll_interval).start()
+    server = serve(publisher, port=port)
+    renders_before = publisher.renders
+    start = time.perf_counter()
+    results = asyncio.run(_load('127.0.0.1', port, screens, poll_interval, duration))
+    elapsed = time.perf_counter() - start
+    publisher.stop()
+    server.shutdown()
+
+    latencies = sorted(results['latencies'])
+    requests = len(latencies)
+    p50 = latencies[requests // 2] * 1000
+    p99 = latencies[int(requests * 0.99)] * 1000
+    print(f"Écrans : {screens}, durée : {elapsed:.1f}s, tick : {interval}s, interrogation : {poll_interval}s")
+    print(f"Ticks : {publisher.ticks}, rendus : {publisher.renders - renders_before}, "
+          f"contenus distincts : {publisher.changes}")
+    print(f"Requêtes : {requests} ({requests / elapsed:,.0f}/s) — 200 : {results.get(200, 0)}, 304 : {results.get(304, 0)}")
+    print(f"Octets de corps : {results['bytes']:,} — latence p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publication de l'état live pour les écrans muraux")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--interval', type=float, default=5.0, help="durée d'un tick (secondes)")
+    parser.add_argument('--load-test', type=int, metavar='SCREENS', help="lance un test de charge avec N écrans")
+    parser.add_argument('--duration', type=float, default=20.0)
+    args = parser.parse_args()
+
+    if args.load_test:
+        load_test(screens=args.load_test, duration=args.duration, interval=args.interval)
+    else:
+        publisher = SnapshotPublisher(interval=args.interval).start()
+        server = serve(publisher, args.host, args.port)
+        print(f"Publication sur http://{args.host}:{args.port}/ (tick {args.interval}s)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+            publisher.stop()
@@ -0,0 +1,213 @@
+# social_feed.py
+import random
+import threading
+import time
+from collections import Counter
+
+
+# Messages simulés (repris du flux d'origine)
+SEED_MESSAGES = [
+    {"user": "Sarah_23", "message": "🔥🔥 Gazo qui passe en boucle sur Skyrock ! #MamiWata", "age": 120, "likes": 42},
+    {"user": "Mike_THE_GOAT", "message": "Le 6-9 avec Ali c'est le meilleur réveil 🎧", "age": 240, "likes": 38},
+    {"user": "LéaFromParis", "message": "Qui écoute Skyrock en cours ? 🙋‍♀️", "age": 420, "likes": 29},
+    {"user": "RapAddict", "message": "SDM qui cartonne en ce moment sur Skyrock 💯", "age": 720, "likes": 51},
+    {"user": "SkyrockFan93", "message": "Le son de Tiakola passe trop en ce moment !", "age": 900, "likes": 33}
+]
+
+SIMULATED_USERS = ["Mathis_75", "Clara_Love", "RapEnForce", "Skyrock4Ever", "UrbanMusic"]
+SIMULATED_MESSAGES = [
+    "Skyrock meilleure radio sans discussion 🎯",
+    "Ali trop drôle ce matin 😂",
+    "Qui va au concert de Ninho ?",
+    "Skyrock devrait passer plus de Fresh !",
+    "Le mix de ce matin est incroyable 🎧"
+]
+
+
+def format_age(seconds):
+    """Âge d'un message au format du flux ("Maintenant", "4 min", "2 h")"""
+    if seconds < 60:
+        return "Maintenant"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min"
+    return f"{int(seconds // 3600)} h"
+
+
+class SocialFeedStore:
+    """Anneau borné de messages indexés par identifiant, avec compteur de likes agrégé"""
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._head = 0  # prochain emplacement à écrire
+        self._count = 0
+        self._next_id = 1
+        self._index = {}  # id -> emplacement
+        self.likes = Counter()  # id -> likes
+        self.likes_by_user = Counter()
+        self.total_likes = 0
+        self.evicted = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def _publish_locked(self, user, message, timestamp, likes):
+        old = self._slots[self._head]
+        if old is not None:
+            # Le plus ancien message sort de l'anneau
+            del self._index[old['id']]
+            self.likes.pop(old['id'], None)
+            self.evicted += 1
+
+        message_id = self._next_id
+        self._next_id += 1
+        self._slots[self._head] = {'id': message_id, 'user': user, 'message': message, 'timestamp': timestamp}
+        self._index[message_id] = self._head
+        if likes:
+            self.likes[message_id] = likes
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        return message_id
+
+    def publish(self, user, message, timestamp=None, likes=0):
+        """Ajoute un message et retourne son identifiant"""
+        with self._lock:
+            message_id = self._publish_locked(user, message, timestamp or time.time(), likes)
+            self.version += 1
+        return message_id
+
+    def publish_many(self, messages):
+        """Ajoute un lot de messages (user, message, timestamp) sous un seul verrou"""
+        with self._lock:
+            ids = [self._publish_locked(user, message, timestamp, 0) for user, message, timestamp in messages]
+            self.version += 1
+        return ids
+
+    def like(self, message_id):
+        """Ajoute un like ; False si le message a déjà quitté l'anneau"""
+        with self._lock:
+            slot = self._index.get(message_id)
+            if slot is None:
+                return False
+            self.likes[message_id] += 1
+            self.likes_by_user[self._slots[slot]['user']] += 1
+            self.total_likes += 1
+            self.version += 1
+        return True
+
+    def get(self, message_id):
+        """Retourne un message par identifiant (None s'il a été évincé)"""
+        with self._lock:
+            slot = self._index.get(message_id)
+            if slot is None:
+                return None
+            return dict(self._slots[slot], likes=self.likes[message_id])
+
+    def page_count(self, per_page=8):
+        return max(1, -(-self._count // per_page))
+
+    def page(self, page=0, per_page=8, now=None):
+        """Messages d'une page, du plus récent au plus ancien"""
+        now = now or time.time()
+        with self._lock:
+            start = page * per_page
+            end = min(start + per_page, self._count)
+            messages = []
+            for position in range(start, end):
+                msg = self._slots[(self._head - 1 - position) % self.capacity]
+                messages.append(dict(
+                    msg,
+                    likes=self.likes[msg['id']],
+                    time=format_age(now - msg['timestamp'])
+                ))
+        return messages
+
+
+class FeedSimulator:
+    """Simulateur local de messages entrants à débit configurable"""
+
+    def __init__(self, store, rate_per_minute=120, seed=None):
+        self.store = store
+        self.rate_per_minute = rate_per_minute
+        self.random = random.Random(seed)
+        self.published = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def seed(self):
+        """Publie les messages d'ouverture du flux"""
+        now = time.time()
+        for msg in reversed(SEED_MESSAGES):
+            self.store.publish(msg['user'], msg['message'], now - msg['age'], msg['likes'])
+
+    def generate(self, count, now=None):
+        """Génère et publie un lot de messages"""
+        now = now or time.time()
+        batch = [
+            (self.random.choice(SIMULATED_USERS), self.random.choice(SIMULATED_MESSAGES), now)
+            for _ in range(count)
+        ]
+        self.store.publish_many(batch)
+        self.published += count
+
+    def _run(self, tick):
+        carry = 0.0
+        while not self._stop.wait(tick):
+            # Débit moyen respecté, lots de la taille d'un tick
+            carry += self.rate_per_minute * tick / 60
+            count = int(carry)
+            carry -= count
+            if count:
+                self.generate(count)
+
+    def start(self, tick=0.5):
+        """Démarre la génération en arrière-plan"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(tick,), daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def benchmark(rate_per_minute=6000, duration=5.0, capacity=5000):
+    """Mesure le débit soutenu du stockage sous charge du simulateur"""
+    store = SocialFeedStore(capacity)
+    simulator = FeedSimulator(store, rate_per_minute, seed=42).start(tick=0.05)
+
+    reads = 0
+    read_time = 0.0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        t = time.perf_counter()
+        messages = store.page(reads % store.page_count(), 8)
+        if messages:
+            store.like(messages[0]['id'])
+        read_time += time.perf_counter() - t
+        reads += 1
+        time.sleep(0.001)
+    simulator.stop()
+    elapsed = time.perf_counter() - start
+
+    print(f"Messages reçus : {simulator.published} en {elapsed:.1f}s "
+          f"({simulator.published / elapsed * 60:,.0f}/min, cible {rate_per_minute:,}/min)")
+    print(f"Lectures de page + like : {reads} (moyenne {read_time / max(reads, 1) * 1e6:.1f} µs)")
+    print(f"Messages conservés : {len(store)}/{capacity}, évincés : {store.evicted}, likes : {store.total_likes}")
+
+    # Débit brut d'insertion, sans cadence
+    store = SocialFeedStore(capacity)
+    batch = [("bench", "message", time.time())] * 1000
+    t = time.perf_counter()
+    for _ in range(200):
+        store.publish_many(batch)
+    print(f"Insertion brute : {200_000 / (time.perf_counter() - t) * 60:,.0f} messages/min")
+
+
+if __name__ == "__main__":
+    benchmark()
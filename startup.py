@@ -0,0 +1,237 @@
+# startup.py
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Répertoire des instantanés construits au déploiement
+WARM_DIR = os.environ.get('SKYROCK_WARM_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.warm'))
+
+
+def lazy_import(name):
+    """Module chargé au premier accès à un attribut (import différé jusqu'à la section qui l'utilise)"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def lazy_callable(module_name, attribute):
+    """Fonction d'un module importé au premier appel"""
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module_name), attribute)(*args, **kwargs)
+    call.__name__ = attribute
+    return call
+
+
+def source_fingerprint(*paths):
+    """Empreinte du code qui construit les données : un instantané d'une autre version est ignoré"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def frame_fingerprint(df, *extra):
+    """Empreinte du contenu d'un DataFrame (et de valeurs associées) : clé des caches partagés du processus"""
+    import pandas as pd
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    for value in extra:
+        digest.update(repr(value).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class SharedCache:
+    """Valeurs dérivées partagées par les sessions et les reruns d'un processus, par clé (nom, empreinte) ;
+    au-delà de capacity, les plus anciennes sont oubliées"""
+
+    def __init__(self, capacity=8):
+        self.capacity = capacity
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """(valeur, trouvée) ; build() est appelée hors du verrou si la clé est absente"""
+        with self._lock:
+            value = self._values.get(key)
+        if value is not None:
+            return value, True
+        value = build()
+        with self._lock:
+            self._values[key] = value
+            while len(self._values) > self.capacity:
+                del self._values[next(iter(self._values))]
+        return value, False
+
+
+class WarmSnapshot:
+    """Jeux de données construits au déploiement : une colonne par fichier .npy, relue en mémoire projetée"""
+
+    def __init__(self, directory, manifest):
+        self.directory = directory
+        self.manifest = manifest
+        self._frames = {}
+
+    @staticmethod
+    def write(directory, frames, fingerprint):
+        """Écrit les DataFrames (colonnes numériques, dates, catégories) et le manifeste"""
+        os.makedirs(directory, exist_ok=True)
+        manifest = {'fingerprint': fingerprint, 'created': time.time(), 'frames': {}}
+        for name, df in frames.items():
+            index = [level for level in df.index.names if level is not None]
+            flat = df.reset_index() if index else df.reset_index(drop=True)
+            columns = []
+            for column in flat.columns:
+                series = flat[column]
+                path = f"{name}.{len(columns)}.npy"
+                entry = {'name': str(column), 'file': path}
+                if series.dtype.kind == 'M':
+                    values = series.to_numpy().astype('datetime64[ns]').view(np.int64)
+                    entry['kind'] = 'datetime'
+                elif series.dtype.kind in 'biuf':
+                    values = series.to_numpy()
+                    entry['kind'] = 'numeric'
+                else:
+                    # Chaînes : codes entiers + catégories dans le manifeste
+                    codes, categories = series.factorize()
+                    values = codes.astype(np.int32)
+                    entry['kind'] = 'category'
+                    entry['categories'] = [str(category) for category in categories]
+                np.save(os.path.join(directory, path), np.ascontiguousarray(values))
+                columns.append(entry)
+            manifest['frames'][name] = {'columns': columns, 'index': index, 'rows': len(flat),
+                                        'columns_name': df.columns.name}
+        tmp = os.path.join(directory, 'manifest.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(directory, 'manifest.json'))
+        return manifest
+
+    @classmethod
+    def open(cls, directory, fingerprint=None):
+        """Instantané du répertoire, ou None s'il manque ou ne correspond pas au code courant"""
+        try:
+            with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if fingerprint is not None and manifest.get('fingerprint') != fingerprint:
+            return None
+        return cls(directory, manifest)
+
+    def __contains__(self, name):
+        return name in self.manifest['frames']
+
+    def frame(self, name):
+        """DataFrame dont les colonnes sont des vues sur les fichiers projetés en mémoire"""
+        import pandas as pd
+
+        if name not in self._frames:
+            spec = self.manifest['frames'][name]
+            data = {}
+            for entry in spec['columns']:
+                values = np.load(os.path.join(self.directory, entry['file']), mmap_mode='r')
+                if entry['kind'] == 'datetime':
+                    data[entry['name']] = pd.to_datetime(values.view('datetime64[ns]'))
+                elif entry['kind'] == 'category':
+                    data[entry['name']] = pd.Categorical.from_codes(values, entry['categories'])
+                else:
+                    data[entry['name']] = values
+            df = pd.DataFrame(data, copy=False)
+            for entry in spec['columns']:
+                if entry['kind'] == 'category':
+                    # Les traitements existants attendent des chaînes (filtres, isin, libellés)
+                    df[entry['name']] = df[entry['name']].astype(object)
+            if spec['index']:
+                df = df.set_index(spec['index'])
+            df.columns.name = spec.get('columns_name')
+            self._frames[name] = df
+        return self._frames[name]
+
+
+def build(directory=WARM_DIR):
+    """Construit les instantanés au déploiement (à lancer avant de démarrer les pods)"""
+    from Dashboard import RadioAudienceDashboard, warm_fingerprint
+
+    dashboard = RadioAudienceDashboard(warm=False)
+    manifest = WarmSnapshot.write(os.path.join(directory, 'audience'), dashboard.warm_state(), warm_fingerprint())
+    rows = {name: spec['rows'] for name, spec in manifest['frames'].items()}
+    print(f"Instantané audience écrit dans {directory} : {rows}")
+
+
+# Mesure dans un processus neuf : de l'import de Streamlit au premier rendu complet
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_string('''
+import sys, time
+sys.path.insert(0, {root!r})
+import streamlit as st
+t0 = time.perf_counter()
+import {module} as M
+t1 = time.perf_counter()
+dashboard = M.{cls}({args})
+t2 = time.perf_counter()
+M.configure_page()
+dashboard.run_dashboard()
+st.session_state['_startup'] = (t1 - t0, t2 - t1, time.perf_counter() - t2)
+''', default_timeout=120)
+at.run()
+total = time.perf_counter() - start
+print(json.dumps({{'import': at.session_state['_startup'][0], 'init': at.session_state['_startup'][1],
+       'render': at.session_state['_startup'][2], 'first_render': total,
+       'errors': [str(e.value) for e in at.exception]}}))
+"""
+
+
+def measure(module, cls, env=None, args=''):
+    root = os.path.dirname(os.path.abspath(__file__))
+    code = PROBE.format(root=root, module=module, cls=cls, args=args)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            env={**os.environ, **(env or {})})
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark(runs=3, directory=WARM_DIR):
+    """Temps d'import et de premier rendu, à froid, avec et sans instantané"""
+    build(directory)
+    cases = [
+        ('Dashboard', 'RadioAudienceDashboard', {'SKYROCK_WARM_DIR': os.path.join(directory, 'absent')}, '', 'sans instantané'),
+        ('Dashboard', 'RadioAudienceDashboard', {'SKYROCK_WARM_DIR': directory}, '', 'instantané projeté'),
+        # Lecteur du rerun : l'état live initial est construit par le producteur du processus, pendant le rendu
+        ('DLive', 'SkyrockLiveDashboard', {}, 'simulate=False', 'imports différés'),
+    ]
+    for module, cls, env, args, label in cases:
+        results = [measure(module, cls, env, args) for _ in range(runs)]
+        best = min(results, key=lambda r: r['first_render'])
+        print(f"{module:<10} {label:<20} import {best['import'] * 1000:6.0f} ms, données {best['init'] * 1000:5.0f} ms, "
+              f"rendu {best['render'] * 1000:5.0f} ms — premier rendu {best['first_render'] * 1000:6.0f} ms"
+              + (f"  erreurs : {best['errors']}" if best['errors'] else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Démarrage à froid : instantanés et mesure")
+    parser.add_argument('--build', action='store_true', help="construit les instantanés (déploiement)")
+    parser.add_argument('--dir', default=WARM_DIR)
+    args = parser.parse_args()
+
+    if args.build:
+        build(args.dir)
+    else:
+        benchmark(directory=args.dir)
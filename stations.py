@@ -0,0 +1,204 @@
+# stations.py
+import time
+
+import numpy as np
+
+# Radios suivies (ordre d'affichage des tableaux de bord)
+RADIOS = ['Skyrock', 'NRJ', 'Fun Radio', 'RTL', 'Europe 1', 'France Inter', 'RMC', 'Virgin Radio']
+
+# Audience de base (millions d'auditeurs)
+BASE_AUDIENCE = {
+    'Skyrock': 3.2, 'NRJ': 4.1, 'Fun Radio': 2.8, 'RTL': 3.9,
+    'Europe 1': 2.5, 'France Inter': 4.3, 'RMC': 2.9, 'Virgin Radio': 2.7
+}
+
+CATEGORIES = {
+    radio: 'Musique' if radio in ['Skyrock', 'NRJ', 'Fun Radio', 'Virgin Radio'] else 'Généraliste'
+    for radio in RADIOS
+}
+
+# Répartition régionale de référence des auditeurs Skyrock
+REGION_LISTENERS = {
+    'Île-de-France': 850000,
+    'Auvergne-Rhône-Alpes': 420000,
+    'Provence-Alpes-Côte d\'Azur': 380000,
+    'Occitanie': 320000,
+    'Hauts-de-France': 280000,
+    'Nouvelle-Aquitaine': 250000,
+    'Grand Est': 220000,
+    'Normandie': 180000,
+    'Pays de la Loire': 160000,
+    'Bretagne': 140000,
+    'Bourgogne-Franche-Comté': 120000,
+    'Centre-Val de Loire': 110000,
+    'Corse': 40000,
+    'Outre-Mer': 90000
+}
+
+# Profil horaire d'écoute par catégorie : (première heure, dernière heure, facteur)
+HOUR_PROFILES = {
+    'Musique': [(0, 5, 0.5), (6, 9, 1.0), (10, 15, 0.8), (16, 19, 0.9), (20, 23, 1.1)],
+    'Généraliste': [(0, 5, 0.35), (6, 9, 1.3), (10, 15, 0.9), (16, 19, 0.8), (20, 23, 0.55)]
+}
+
+# Série live de Skyrock par tranche horaire : (première heure, dernière heure, auditeurs de base, bruit min, bruit max)
+LIVE_HOUR_PROFILE = [
+    (0, 5, 1200000, -200000, 300000), (6, 9, 2800000, -100000, 200000), (10, 15, 2200000, -150000, 150000),
+    (16, 19, 2600000, -150000, 150000), (20, 23, 3000000, -200000, 300000)
+]
+
+# Rappel vers l'audience cible à chaque pas, et bruit relatif par région
+MEAN_REVERSION = 0.2
+NOISE_SCALE = 0.1
+MIN_REGION_LISTENERS = 1000.0
+
+
+def hour_factors(category):
+    """Facteurs des 24 heures pour une catégorie de radio"""
+    factors = np.ones(24)
+    for first, last, factor in HOUR_PROFILES[category]:
+        factors[first:last + 1] = factor
+    return factors
+
+
+def live_hour_profile(hour):
+    """(auditeurs de base, bruit min, bruit max) de la série live à cette heure"""
+    for first, last, base, low, high in LIVE_HOUR_PROFILE:
+        if first <= hour <= last:
+            return base, low, high
+
+
+def live_base_listeners():
+    """Auditeurs de base de la série live pour les 24 heures"""
+    return np.array([live_hour_profile(hour)[0] for hour in range(24)], dtype=np.float64)
+
+
+def hour_volatility(hour):
+    """Volatilité de l'audience selon l'heure"""
+    if 6 <= hour <= 9:  # Morning peak
+        return 0.1
+    elif 16 <= hour <= 19:  # Evening commute
+        return 0.08
+    elif 20 <= hour <= 23:  # Prime time
+        return 0.12
+    elif 0 <= hour <= 5:  # Night
+        return 0.15
+    return 0.06  # Day time
+
+
+class StationEngine:
+    """Auditeurs live de N radios × R régions dans des tableaux, avancés d'un pas vectorisé"""
+
+    def __init__(self, stations, categories, base, regions, seed=None, hour=None):
+        # base : audience cible (S, R) au facteur horaire 1
+        self.stations = list(stations)
+        self.regions = list(regions)
+        self.index = {station: i for i, station in enumerate(self.stations)}
+        self.base = np.asarray(base, dtype=np.float64)
+        self.factors = np.array([hour_factors(category) for category in categories])  # (S, 24)
+        self.rng = np.random.default_rng(seed)
+
+        hour = time.localtime().tm_hour if hour is None else hour
+        self.listeners = self.base * self.factors[:, hour][:, None]
+        self.totals = self.listeners.sum(axis=1)
+        self.order = np.argsort(-self.totals, kind='stable')
+        self.rank = np.empty(len(self.stations), dtype=np.intp)
+        self.rank[self.order] = np.arange(len(self.stations))
+        self.previous_rank = self.rank.copy()
+        self.ticks = 0
+        # Tampons réutilisés à chaque pas (pas d'allocation dans la boucle live)
+        self._noise = np.empty_like(self.listeners)
+        self._work = np.empty_like(self.listeners)
+
+    @classmethod
+    def for_radios(cls, region_listeners, station_listeners, extra_stations=0, seed=None, hour=None):
+        """Moteur des radios suivies, calé sur la répartition régionale d'une station (Skyrock)"""
+        rng = np.random.default_rng(seed)
+        regions = list(region_listeners)
+        weights = np.array([region_listeners[region] for region in regions], dtype=np.float64)
+        weights /= weights.sum()
+
+        stations = list(RADIOS)
+        totals = [station_listeners * BASE_AUDIENCE[radio] / BASE_AUDIENCE['Skyrock'] for radio in RADIOS]
+        categories = [CATEGORIES[radio] for radio in RADIOS]
+        for i in range(extra_stations):
+            stations.append(f"Station locale {i + 1}")
+            totals.append(station_listeners * rng.lognormal(-2.0, 0.8))
+            categories.append('Musique' if i % 2 else 'Généraliste')
+
+        # Implantation régionale propre à chaque radio (la première garde la répartition de référence)
+        spread = rng.lognormal(0, 0.25, (len(stations), len(regions)))
+        spread[0] = 1
+        shares = weights * spread
+        shares /= shares.sum(axis=1, keepdims=True)
+        return cls(stations, categories, np.array(totals)[:, None] * shares, regions, seed, hour)
+
+    def step(self, hour=None, volatility=0.08):
+        """Un pas de simulation pour toutes les radios et régions, puis mise à jour du classement"""
+        hour = time.localtime().tm_hour if hour is None else hour
+        listeners, work, noise = self.listeners, self._work, self._noise
+        # work = cible - auditeurs
+        np.multiply(self.base, self.factors[:, hour, None], out=work)
+        work -= listeners
+        work *= MEAN_REVERSION
+        self.rng.standard_normal(out=noise)
+        noise *= volatility * NOISE_SCALE
+        noise *= listeners
+        listeners += work
+        listeners += noise
+        np.maximum(listeners, MIN_REGION_LISTENERS, out=listeners)
+        listeners.sum(axis=1, out=self.totals)
+        self._rerank()
+        self.ticks += 1
+
+    def _rerank(self):
+        """Classement repris de l'ordre précédent : presque trié, le tri stable (timsort) y est quasi linéaire"""
+        order = self.order[np.argsort(-self.totals[self.order], kind='stable')]
+        self.previous_rank, self.rank = self.rank, self.previous_rank
+        self.rank[order] = np.arange(len(order))
+        self.order = order
+
+    def rank_of(self, station):
+        """Rang (1 = premier)"""
+        return int(self.rank[self.index[station]]) + 1
+
+    def rank_change(self, station):
+        """Places gagnées (+) ou perdues (-) au dernier pas"""
+        i = self.index[station]
+        return int(self.previous_rank[i] - self.rank[i])
+
+    def total(self, station):
+        return float(self.totals[self.index[station]])
+
+    def region_listeners(self, station):
+        row = self.listeners[self.index[station]]
+        return {region: int(value) for region, value in zip(self.regions, row)}
+
+    def ranking(self, k=10):
+        """Les k premières radios : [{'station', 'listeners', 'rank', 'change'}]"""
+        return [
+            {'station': self.stations[i], 'listeners': int(self.totals[i]), 'rank': position + 1,
+             'change': int(self.previous_rank[i] - self.rank[i])}
+            for position, i in enumerate(self.order[:k])
+        ]
+
+
+def benchmark(n_stations=500, n_regions=100, ticks=500):
+    """Durée d'un pas (simulation + classement) pour n_stations × n_regions"""
+    regions = {f"Région {i + 1}": 1.0 / (i + 1) for i in range(n_regions)}
+    engine = StationEngine.for_radios(regions, 2_850_000, extra_stations=n_stations - len(RADIOS), seed=5)
+    durations = []
+    for tick in range(ticks):
+        t = time.perf_counter()
+        engine.step(hour=(tick // 20) % 24)
+        durations.append(time.perf_counter() - t)
+        # Le classement incrémental doit rester identique à un tri complet
+        assert np.array_equal(engine.totals[engine.order], np.sort(engine.totals)[::-1])
+    durations = np.array(durations) * 1000
+    print(f"{n_stations} stations × {n_regions} régions : pas moyen {durations.mean():.2f} ms, "
+          f"p99 {np.percentile(durations, 99):.2f} ms, max {durations.max():.2f} ms")
+    print("Classement final :", ", ".join(f"{r['rank']}. {r['station']}" for r in engine.ranking(5)))
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,469 @@
+# stream_logs.py
+import atexit
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Lecture par blocs (les lignes incomplètes sont gardées pour le bloc suivant)
+READ_CHUNK = 1 << 20
+# Fenêtre des distributions affichées (minutes)
+WINDOW_MINUTES = 5
+# Capacité nominale d'un serveur edge (requêtes/s) pour la charge en %
+SERVER_CAPACITY_RPS = 400
+# Horodatage des journaux (format combined : 01/Oct/2025:20:00:00 +0200)
+LOG_TIME_FORMAT = '%d/%b/%Y:%H:%M:%S %z'
+# Secondes gardées pour les débits
+RATE_SECONDS = 60
+# Taille d'un journal simulé avant rotation (une génération gardée : disque borné)
+SIMULATED_LOG_BYTES = 1 << 20
+
+# Horodatages déjà convertis (une valeur par seconde de journal)
+_request_times = {}
+
+
+class LatencySketch:
+    """Histogramme à seaux logarithmiques (précision relative fixe), fusionnable par addition"""
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-4, max_value=120.0):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.min_value = min_value
+        self.n_buckets = int(np.ceil(np.log(max_value / min_value) / self.log_gamma)) + 1
+        self.counts = np.zeros(self.n_buckets, dtype=np.int64)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        index = np.ceil(np.log(np.maximum(values, self.min_value) / self.min_value) / self.log_gamma)
+        index = np.clip(index, 0, self.n_buckets - 1).astype(np.intp)
+        self.counts += np.bincount(index, minlength=self.n_buckets)
+
+    def merge(self, other):
+        self.counts += other.counts
+        return self
+
+    def empty_like(self):
+        return LatencySketch(self.relative_accuracy, self.min_value, self.min_value * self.gamma ** (self.n_buckets - 1))
+
+    def quantiles(self, qs):
+        """Quantiles (en secondes) ; None si le sketch est vide"""
+        total = self.counts.sum()
+        if total == 0:
+            return [None for _ in qs]
+        cumulative = np.cumsum(self.counts)
+        result = []
+        for q in qs:
+            i = int(np.searchsorted(cumulative, q * (total - 1) + 1))
+            # Milieu (relatif) du seau : erreur bornée par relative_accuracy
+            result.append(self.min_value * 2 * self.gamma ** i / (self.gamma + 1))
+        return result
+
+
+def request_time(stamp):
+    """Heure (epoch) d'un horodatage de journal ; None s'il est invalide"""
+    moment = _request_times.get(stamp)
+    if moment is None:
+        try:
+            moment = datetime.strptime(stamp.decode('ascii'), LOG_TIME_FORMAT).timestamp()
+        except (UnicodeDecodeError, ValueError):
+            return None
+        if len(_request_times) > 100_000:
+            _request_times.clear()
+        _request_times[stamp] = moment
+    return moment
+
+
+def parse_lines(lines):
+    """Analyse de lignes au format combined + temps de requête final (nginx $request_time)
+
+    Retourne (heures de requête, statuts, octets, durées) ; les lignes mal formées sont ignorées.
+    """
+    stamps, statuses, sizes, durations = [], [], [], []
+    for line in lines:
+        parts = line.split(b'"')
+        if len(parts) < 7:
+            continue
+        fields = parts[2].split()
+        tail = parts[-1].split()
+        if len(fields) < 2 or not tail:
+            continue
+        # « ip - - [01/Oct/2025:20:00:00 +0200] " : horodatage de longueur fixe avant « ] »
+        stamps.append(parts[0][-28:-2])
+        statuses.append(fields[0])
+        sizes.append(fields[1] if fields[1] != b'-' else b'0')
+        durations.append(tail[-1])
+    empty = np.empty(0), np.empty(0, np.int16), np.empty(0, np.int64), np.empty(0)
+    if not statuses:
+        return empty
+
+    # Un horodatage par seconde de journal : conversion des seules valeurs distinctes (lignes consécutives identiques)
+    heads = np.array(stamps)
+    change = np.flatnonzero(heads[1:] != heads[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    moments = np.array([request_time(stamp) or np.nan for stamp in heads[starts].tolist()])
+    times = np.repeat(moments, np.diff(np.append(starts, len(heads))))
+    valid = ~np.isnan(times)
+    try:
+        columns = (times, np.array(statuses).astype(np.int16), np.array(sizes).astype(np.int64),
+                   np.array(durations).astype(np.float64))
+    except ValueError:
+        # Conversion ligne à ligne seulement si un bloc contient un champ invalide
+        rows = []
+        for moment, status, size, duration in zip(times.tolist(), statuses, sizes, durations):
+            try:
+                rows.append((moment, int(status), int(size), float(duration)))
+            except ValueError:
+                continue
+        if not rows:
+            return empty
+        moment, status, size, duration = zip(*rows)
+        columns = np.array(moment), np.array(status, np.int16), np.array(size, np.int64), np.array(duration)
+        valid = ~np.isnan(columns[0])
+    return columns if valid.all() else tuple(column[valid] for column in columns)
+
+
+class LogTailer:
+    """Lecture incrémentale d'un journal : suivi inode/offset, rotation et troncature gérées"""
+
+    def __init__(self, path, inode=None, offset=0):
+        self.path = path
+        self.inode = inode
+        self.offset = offset
+        self._file = None
+        self._partial = b''
+
+    def _open(self):
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        inode = os.fstat(f.fileno()).st_ino
+        if inode != self.inode:
+            # Nouveau fichier (premier passage ou rotation) : lecture depuis le début
+            self.inode, self.offset, self._partial = inode, 0, b''
+        f.seek(self.offset)
+        self._file = f
+        return True
+
+    def _drain(self):
+        while True:
+            data = self._file.read(READ_CHUNK)
+            if not data:
+                return
+            data = self._partial + data
+            cut = data.rfind(b'\n') + 1
+            self._partial = data[cut:]
+            self.offset += cut
+            if cut:
+                yield data[:cut].splitlines()
+
+    def read(self):
+        """Nouvelles lignes complètes depuis le dernier appel, par blocs (mémoire bornée)"""
+        if self._file is None and not self._open():
+            return
+        yield from self._drain()
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self.inode:
+            # Rotation : l'ancien fichier est lu jusqu'au bout, puis on passe au nouveau
+            self._file.close()
+            self._file = None
+            if self._open():
+                yield from self._drain()
+        elif stat.st_size < self.offset + len(self._partial):
+            # Troncature (copytruncate) : on repart du début
+            self._file.seek(0)
+            self.offset, self._partial = 0, b''
+            yield from self._drain()
+
+    def state(self):
+        return {'inode': self.inode, 'offset': self.offset}
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ServerStats:
+    """Compteurs d'un serveur edge : latences par minute, octets et requêtes par seconde de requête"""
+
+    def __init__(self):
+        self.minutes = {}  # minute → LatencySketch
+        self.seconds = {}  # seconde → [requêtes, octets, erreurs]
+        self.requests = 0
+        self.bytes = 0
+        self.errors = 0
+        self.last_seen = None
+
+    def add(self, times, statuses, sizes, durations):
+        """Lignes d'un bloc, rangées à l'heure de leur requête (un arriéré de journal ne tombe pas dans la seconde lue)"""
+        errors = statuses >= 500
+        n_bytes, n_errors = int(sizes.sum()), int(np.count_nonzero(errors))
+        self.requests += len(statuses)
+        self.bytes += n_bytes
+        self.errors += n_errors
+        latest = float(times.max())
+        self.last_seen = latest if self.last_seen is None else max(self.last_seen, latest)
+
+        # Lignes plus anciennes que les fenêtres : totaux seulement
+        seconds = times.astype(np.int64)
+        first, newest = int(seconds.min()), int(self.last_seen)
+        if first == int(latest):
+            # Cas courant : bloc écrit dans une même seconde
+            if first > newest - RATE_SECONDS:
+                self._bucket(first, len(statuses), n_bytes, n_errors)
+        else:
+            recent = seconds > newest - RATE_SECONDS
+            keys, index = np.unique(seconds[recent], return_inverse=True)
+            requests = np.bincount(index, minlength=len(keys))
+            per_bytes = np.bincount(index, weights=sizes[recent], minlength=len(keys))
+            per_errors = np.bincount(index, weights=errors[recent], minlength=len(keys))
+            for second, count, size, error in zip(keys.tolist(), requests.tolist(), per_bytes.tolist(),
+                                                  per_errors.tolist()):
+                self._bucket(second, count, int(size), int(error))
+
+        oldest_minute = newest // 60 - WINDOW_MINUTES
+        if first // 60 == int(latest) // 60:
+            if first // 60 > oldest_minute:
+                self._sketch(first // 60).add(durations)
+        else:
+            minutes = seconds // 60
+            for minute in np.unique(minutes[minutes > oldest_minute]).tolist():
+                self._sketch(minute).add(durations[minutes == minute])
+
+    def _bucket(self, second, requests, n_bytes, errors):
+        bucket = self.seconds.get(second)
+        if bucket is None:
+            # Nouvelle seconde : on oublie celles sorties de la fenêtre
+            newest = int(self.last_seen)
+            for old in [old for old in self.seconds if old <= newest - RATE_SECONDS]:
+                del self.seconds[old]
+            bucket = self.seconds[second] = [0, 0, 0]
+        bucket[0] += requests
+        bucket[1] += n_bytes
+        bucket[2] += errors
+
+    def _sketch(self, minute):
+        sketch = self.minutes.get(minute)
+        if sketch is None:
+            oldest_minute = int(self.last_seen) // 60 - WINDOW_MINUTES
+            for old in [old for old in self.minutes if old <= oldest_minute]:
+                del self.minutes[old]
+            sketch = self.minutes[minute] = LatencySketch()
+        return sketch
+
+    def sketch(self, now):
+        merged = LatencySketch()
+        for minute, sketch in self.minutes.items():
+            if minute > now // 60 - WINDOW_MINUTES:
+                merged.merge(sketch)
+        return merged
+
+    def rates(self, now, window=10):
+        """Requêtes/s, octets/s et taux d'erreur sur les dernières secondes"""
+        recent = [bucket for second, bucket in self.seconds.items() if now - window < second <= now]
+        requests = sum(bucket[0] for bucket in recent)
+        return {
+            'rps': requests / window,
+            'bytes_per_second': sum(bucket[1] for bucket in recent) / window,
+            'error_rate': sum(bucket[2] for bucket in recent) / requests if requests else 0.0
+        }
+
+
+class StreamLogCollector:
+    """Collecte des journaux Icecast/HLS de la flotte edge"""
+
+    def __init__(self, sources, state_path=None):
+        # sources : {serveur: chemin du journal}
+        self.state_path = state_path
+        state = {}
+        if state_path and os.path.exists(state_path):
+            with open(state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        self.tailers = {
+            server: LogTailer(path, **state.get(server, {}))
+            for server, path in sources.items()
+        }
+        self.stats = {server: ServerStats() for server in sources}
+        self.lines = 0
+        self._lock = threading.Lock()
+
+    def poll(self):
+        """Lit les nouvelles lignes de chaque journal ; retourne le nombre de lignes intégrées"""
+        total = 0
+        with self._lock:
+            for server, tailer in self.tailers.items():
+                for lines in tailer.read():
+                    times, statuses, sizes, durations = parse_lines(lines)
+                    if len(statuses):
+                        self.stats[server].add(times, statuses, sizes, durations)
+                    total += len(statuses)
+            self.lines += total
+            self.save_state()
+        return total
+
+    def save_state(self):
+        if not self.state_path:
+            return
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({server: tailer.state() for server, tailer in self.tailers.items()}, f)
+        os.replace(tmp, self.state_path)
+
+    def panel_metrics(self, now=None, online_after=30):
+        """Métriques du panneau de monitoring technique"""
+        now = time.time() if now is None else now
+        with self._lock:
+            merged = LatencySketch()
+            servers = {}
+            total_rps = total_bps = errors = 0.0
+            for server, stats in self.stats.items():
+                sketch = stats.sketch(now)
+                merged.merge(sketch)
+                rates = stats.rates(now)
+                online = stats.last_seen is not None and now - stats.last_seen <= online_after
+                p50, p95, p99 = sketch.quantiles([0.5, 0.95, 0.99])
+                servers[server] = {
+                    'online': online,
+                    'load': min(100.0, rates['rps'] / SERVER_CAPACITY_RPS * 100),
+                    'p95_ms': None if p95 is None else p95 * 1000,
+                    **rates
+                }
+                total_rps += rates['rps']
+                total_bps += rates['bytes_per_second']
+                errors += rates['error_rate'] * rates['rps']
+
+        p50, p95, p99 = merged.quantiles([0.5, 0.95, 0.99])
+        return {
+            'p50_ms': None if p50 is None else p50 * 1000,
+            'p95_ms': None if p95 is None else p95 * 1000,
+            'p99_ms': None if p99 is None else p99 * 1000,
+            'servers_online': sum(1 for s in servers.values() if s['online']),
+            'servers_total': len(servers),
+            'bandwidth_mbps': total_bps * 8 / 1e6,
+            'quality': 100 * (1 - errors / total_rps) if total_rps else 100.0,
+            'servers': servers
+        }
+
+
+def format_line(rng, status=200, stamp=None):
+    """Ligne de journal HLS synthétique (format combined + $request_time), horodatée maintenant par défaut"""
+    stamp = stamp or time.strftime(LOG_TIME_FORMAT, time.localtime())
+    ip = f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}"
+    segment = rng.randrange(100000)
+    size = rng.randrange(150_000, 400_000)
+    latency = rng.lognormvariate(-2.8, 0.6)
+    return (f'{ip} - - [{stamp}] "GET /skyrock/hls/seg_{segment}.ts HTTP/1.1" '
+            f'{status} {size} "-" "Mozilla/5.0 (Linux; Android 14)" {latency:.3f}\n')
+
+
+class LogSimulator:
+    """Écrit des journaux synthétiques pour une flotte locale (démo, benchmark), avec rotation à max_bytes ;
+    un répertoire temporaire créé ici est supprimé à la sortie du processus"""
+
+    def __init__(self, n_servers=20, directory=None, lines_per_second=200, seed=None, max_bytes=SIMULATED_LOG_BYTES):
+        self.owns_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix='skyrock-logs-')
+        if self.owns_directory:
+            atexit.register(self.close)
+        self.rng = random.Random(seed)
+        self.lines_per_second = lines_per_second
+        self.max_bytes = max_bytes
+        self.sources = {f"edge-{i + 1:02d}": os.path.join(self.directory, f"edge-{i + 1:02d}.access.log")
+                        for i in range(n_servers)}
+        # Quelques serveurs silencieux (hors ligne)
+        self.offline = set(self.rng.sample(sorted(self.sources), k=max(0, n_servers // 10)))
+        self._stop = threading.Event()
+
+    def write(self, seconds=1.0):
+        for server, path in self.sources.items():
+            if server in self.offline:
+                continue
+            n = int(self.lines_per_second * seconds * self.rng.uniform(0.5, 1.5))
+            stamp = time.strftime(LOG_TIME_FORMAT, time.localtime())
+            if self.max_bytes and os.path.exists(path) and os.path.getsize(path) >= self.max_bytes:
+                # Rotation avant écriture : le collecteur lit l'ancien fichier jusqu'au bout puis suit le nouveau
+                os.replace(path, path + '.1')
+            with open(path, 'a', encoding='utf-8') as f:
+                f.writelines(format_line(self.rng, 503 if self.rng.random() < 0.01 else 200, stamp) for _ in range(n))
+
+    def start(self, tick=1.0):
+        def run():
+            while not self._stop.wait(tick):
+                self.write(tick)
+        self.write(tick)
+        threading.Thread(target=run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        """Arrête l'écriture et supprime le répertoire temporaire créé pour la flotte"""
+        self.stop()
+        if self.owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def sources_from_env(value):
+    """SKYROCK_STREAM_LOGS="edge-01=/var/log/icecast/access.log,edge-02=..." -> {serveur: chemin}"""
+    sources = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        server, _, path = item.partition('=')
+        sources[server] = path
+    return sources
+
+
+def benchmark(n_lines=2_000_000):
+    """Débit du collecteur (lecture + analyse + sketches) sur un cœur"""
+    rng = random.Random(5)
+    directory = tempfile.mkdtemp(prefix='skyrock-bench-')
+    try:
+        _benchmark(rng, directory, n_lines)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _benchmark(rng, directory, n_lines):
+    path = os.path.join(directory, 'edge-01.access.log')
+    template = [format_line(rng) for _ in range(10_000)]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n_lines // len(template)):
+            f.writelines(template)
+    size = os.path.getsize(path)
+
+    collector = StreamLogCollector({'edge-01': path}, os.path.join(directory, 'state.json'))
+    t = time.perf_counter()
+    lines = collector.poll()
+    elapsed = time.perf_counter() - t
+    print(f"{lines:,} lignes ({size / 1e6:.0f} Mo) en {elapsed:.2f}s : {lines / elapsed:,.0f} lignes/s")
+
+    # Reprise : rien n'est relu, seules les lignes ajoutées sont intégrées
+    with open(path, 'a', encoding='utf-8') as f:
+        f.writelines(template[:1000])
+    restarted = StreamLogCollector({'edge-01': path}, os.path.join(directory, 'state.json'))
+    print(f"Après redémarrage : {restarted.poll()} nouvelles lignes lues")
+
+    metrics = collector.panel_metrics()
+    print(f"p50 {metrics['p50_ms']:.1f} ms, p95 {metrics['p95_ms']:.1f} ms, p99 {metrics['p99_ms']:.1f} ms")
+    exact = np.percentile([float(line.rsplit(' ', 1)[1]) for line in template], [50, 95, 99]) * 1000
+    print(f"Exact : p50 {exact[0]:.1f} ms, p95 {exact[1]:.1f} ms, p99 {exact[2]:.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
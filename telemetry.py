@@ -0,0 +1,364 @@
+# telemetry.py
+import argparse
+import bisect
+import os
+import sys
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+METRICS_PORT = int(os.environ.get('SKYROCK_METRICS_PORT', 8505))
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Bornes des histogrammes (secondes) : rendu d'une section, construction d'un jeu de données
+RENDER_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BUILD_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _ThreadMarker:
+    """Objet détenu par le seul stockage local d'un thread : sa destruction signale la fin du thread"""
+    __slots__ = ('__weakref__',)
+
+
+class _Shards:
+    """Cellules par thread : chaque thread écrit dans sa propre liste, sans verrou ; la collecte les additionne.
+    Les cellules d'un thread terminé (un par rerun Streamlit) sont reportées dans un total de base puis oubliées"""
+
+    def __init__(self, size):
+        self.size = size
+        self._local = threading.local()
+        self._lists = []
+        self._base = [0.0] * size
+        self._lock = threading.Lock()
+
+    def cells(self):
+        try:
+            return self._local.cells
+        except AttributeError:
+            # Premier accès du thread : seul moment où le verrou est pris
+            cells = [0.0] * self.size
+            marker = _ThreadMarker()
+            weakref.finalize(marker, self._retire, cells).atexit = False
+            with self._lock:
+                self._lists.append(cells)
+            self._local.cells = cells
+            self._local.marker = marker
+            return cells
+
+    def _retire(self, cells):
+        with self._lock:
+            self._base = [base + value for base, value in zip(self._base, cells)]
+            self._lists = [other for other in self._lists if other is not cells]
+
+    def totals(self):
+        with self._lock:
+            lists = [self._base] + self._lists
+        return [sum(column) for column in zip(*lists)]
+
+
+class _CounterChild:
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount=1):
+        self._shards.cells()[0] += amount
+
+    def value(self):
+        return self._shards.totals()[0]
+
+
+class _Timer:
+    """Contexte qui observe sa durée dans un histogramme"""
+    __slots__ = ('child', 'start')
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+
+
+class _HistogramChild:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # Une cellule par borne, une pour +Inf, puis la somme
+        self._shards = _Shards(len(bounds) + 2)
+
+    def observe(self, value):
+        cells = self._shards.cells()
+        cells[bisect.bisect_left(self.bounds, value)] += 1
+        cells[-1] += value
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Family:
+    """Métrique étiquetée : un enfant par combinaison de valeurs d'étiquettes, créé une fois"""
+    kind = None
+
+    def __init__(self, name, documentation, labels=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_dict(self, values):
+        return dict(zip(self.label_names, values))
+
+
+class Counter(_Family):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name, self._label_dict(values), child.value()
+
+
+class Histogram(_Family):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=RENDER_BUCKETS, registry=None):
+        self.bounds = tuple(buckets)
+        super().__init__(name, documentation, labels, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            labels = self._label_dict(values)
+            totals = child._shards.totals()
+            cumulative = 0.0
+            for bound, count in zip(self.bounds + (float('inf'),), totals):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, 'le': _format_value(bound)}, cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, totals[-1]
+
+
+class Registry:
+    """Métriques enregistrées et objets observés (jauges lues au moment de la collecte)"""
+
+    def __init__(self):
+        self.metrics = []
+        self._watched = {}
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def watch(self, name, source):
+        """source.exposition_samples() est appelée à chaque collecte (dernière instance observée sous ce nom)"""
+        self._watched[name] = source
+
+    def collect(self):
+        """Familles (nom, type, aide, échantillons) dans l'ordre d'enregistrement, puis celles des objets observés"""
+        for metric in self.metrics:
+            yield metric.name, metric.kind, metric.documentation, list(metric.samples())
+        for source in list(self._watched.values()):
+            yield from source.exposition_samples()
+
+    def exposition(self):
+        """Format texte Prometheus (version 0.0.4)"""
+        lines = []
+        for name, kind, documentation, samples in self.collect():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if value is None or value != value:
+        return 'NaN'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def gauge(name, documentation, samples):
+    """Famille de jauges pour exposition_samples() : samples = [(étiquettes, valeur)]"""
+    return name, 'gauge', documentation, [(name, labels, value) for labels, value in samples]
+
+
+REGISTRY = Registry()
+
+# Métriques internes des deux tableaux de bord
+RERUNS = Counter('skyrock_reruns_total', "Reruns Streamlit exécutés", ['dashboard'])
+RENDER_SECONDS = Histogram('skyrock_section_render_seconds', "Durée de rendu d'une section", ['dashboard', 'section'])
+BUILD_SECONDS = Histogram('skyrock_data_build_seconds', "Durée de construction d'un jeu de données dérivé",
+                          ['dataset'], buckets=BUILD_BUCKETS)
+FIGURE_SECONDS = Histogram('skyrock_figure_seconds', "Durée de construction et d'émission d'une figure planifiée",
+                           ['dashboard', 'figure', 'stage'])
+CACHE_REQUESTS = Counter('skyrock_cache_requests_total', "Accès aux caches de données et de rendu (hit / miss)",
+                         ['cache', 'result'])
+
+
+def cache_lookup(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """GET /metrics : exposition du registre"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = self.registry.exposition().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(registry=REGISTRY, host='0.0.0.0', port=None):
+    """Démarre l'endpoint dans un thread. Port explicite (argument ou SKYROCK_METRICS_PORT) déjà pris : erreur ;
+    port par défaut pris (plusieurs workers) : port libre, annoncé sur stderr"""
+    handler = type('Handler', (MetricsRequestHandler,), {'registry': registry})
+    explicit = port is not None or 'SKYROCK_METRICS_PORT' in os.environ
+    port = METRICS_PORT if port is None else port
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError:
+        if explicit:
+            raise
+        server = ThreadingHTTPServer((host, 0), handler)
+        print(f"Port {port} occupé : /metrics servi sur le port {server.server_port}", file=sys.stderr)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@st.cache_resource
+def get_metrics_server():
+    """Endpoint /metrics du processus, démarré au premier rerun"""
+    return serve()
+
+
+def benchmark(n=200_000, threads=8):
+    """Coût par opération des compteurs et histogrammes, et contention entre threads (contre un verrou)"""
+    registry = Registry()
+    counter = Counter('bench_total', "bench", ['section'], registry=registry).labels('header')
+    histogram = Histogram('bench_seconds', "bench", ['section'], registry=registry).labels('header')
+
+    def per_op(run):
+        start = time.perf_counter()
+        run()
+        return (time.perf_counter() - start) / n * 1e9
+
+    def loop_counter():
+        for _ in range(n):
+            counter.inc()
+
+    def loop_histogram():
+        for _ in range(n):
+            histogram.observe(0.003)
+
+    def loop_timer():
+        for _ in range(n):
+            with histogram.time():
+                pass
+
+    def loop_empty():
+        for _ in range(n):
+            pass
+
+    base = per_op(loop_empty)
+    print("Coût par opération (thread unique, boucle vide déduite) :")
+    print(f"  compteur inc()          {per_op(loop_counter) - base:6.0f} ns")
+    print(f"  histogramme observe()   {per_op(loop_histogram) - base:6.0f} ns")
+    print(f"  with histogram.time()   {per_op(loop_timer) - base:6.0f} ns")
+    print(f"  labels(...) + inc()     {per_op(lambda: [CACHE_REQUESTS.labels('bench', 'hit').inc() for _ in range(n)]) - base:6.0f} ns")
+
+    # Contention : cellules par thread contre un compteur protégé par un verrou
+    lock, shared = threading.Lock(), [0]
+
+    def locked():
+        for _ in range(n // threads):
+            with lock:
+                shared[0] += 1
+
+    def sharded():
+        for _ in range(n // threads):
+            counter.inc()
+
+    for label, target in (('verrou partagé', locked), ('cellules par thread', sharded)):
+        workers = [threading.Thread(target=target) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        print(f"  {threads} threads, {label:<20} {(time.perf_counter() - start) / n * 1e9:6.0f} ns/inc")
+    assert counter.value() == n + (n // threads) * threads
+
+    # Instrumentation d'un rerun : ~10 sections chronométrées, 1 rerun compté, ~10 accès cache
+    start = time.perf_counter()
+    for _ in range(n // 20):
+        counter.inc()
+        for _ in range(10):
+            with histogram.time():
+                pass
+            counter.inc()
+    rerun_cost = (time.perf_counter() - start) / (n // 20)
+    print(f"Instrumentation d'un rerun : {rerun_cost * 1e6:.1f} µs "
+          f"({rerun_cost / 0.3:.4%} d'un rerun de 300 ms du tableau de bord live)")
+    start = time.perf_counter()
+    body = registry.exposition()
+    print(f"Collecte : {(time.perf_counter() - start) * 1e6:.0f} µs pour {len(body.splitlines())} lignes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exposition Prometheus des métriques des tableaux de bord")
+    parser.add_argument('--ops', type=int, default=200_000)
+    args = parser.parse_args()
+    benchmark(args.ops)
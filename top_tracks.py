@@ -0,0 +1,306 @@
+# top_tracks.py
+import heapq
+import threading
+import time
+from collections import deque
+from operator import itemgetter
+
+import numpy as np
+
+# Fenêtres glissantes : (durée d'un seau en secondes, nombre de seaux)
+WINDOWS = {
+    'hour': (60, 60),
+    'day': (3600, 24),
+    'week': (86400, 7)
+}
+
+# Écart de part d'écoute (fenêtre courte vs longue) au-delà duquel un titre monte ou descend
+TREND_RATIO = 1.15
+
+# Catalogue simulé de la play-list (artiste, titre, poids de rotation)
+CATALOG = [
+    ('Gazo', 'MAMI WATA', 14), ('Ninho', 'DÉSOLÉ', 13), ('Tiakola', 'PAS BÊTE', 12),
+    ('SDM', 'BÉNÉFICE', 11), ('Fresh', 'CELINE 3X', 10), ('Jul', 'TATI', 9),
+    ('PLK', 'ÉMILIE', 8), ('Werenoi', 'SOLITAIRE', 8), ('Damso', 'BEYAH', 7),
+    ('Naps', 'LA KICHTA', 7), ('Aya Nakamura', 'DJADJA', 6), ('Niska', 'RÉSEAUX', 6),
+    ('Hamza', 'DOLCE', 5), ('Leto', 'MACARENA', 5), ('SCH', 'MARIA', 4)
+]
+
+
+class WindowCounter:
+    """Compteurs par seaux sur une fenêtre glissante, bornés en mémoire, top-k maintenu"""
+
+    def __init__(self, bucket_seconds, n_buckets, capacity=10000, top_size=50):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self.capacity = capacity
+        self.top_size = top_size
+        self.buckets = deque()  # [identifiant de seau, {titre: lectures}]
+        self.totals = {}
+        self.total = 0
+        # Erreur maximale due à l'élagage (compte le plus élevé retiré)
+        self.max_error = 0
+        self._top = []  # [lectures, titre] trié décroissant
+        self._top_members = set()
+
+    def _expire(self, bucket_id):
+        """Retire les seaux sortis de la fenêtre"""
+        expired = False
+        while self.buckets and self.buckets[0][0] <= bucket_id - self.n_buckets:
+            _, counts = self.buckets.popleft()
+            for track, count in counts.items():
+                remaining = self.totals.get(track, 0) - count
+                if remaining > 0:
+                    self.totals[track] = remaining
+                else:
+                    self.totals.pop(track, None)
+                self.total -= count
+            expired = True
+        if expired:
+            self._rebuild_top()
+
+    def _bucket(self, bucket_id):
+        if not self.buckets or bucket_id > self.buckets[-1][0]:
+            self._expire(bucket_id)
+            self.buckets.append([bucket_id, {}])
+            return self.buckets[-1][1]
+        if bucket_id <= self.buckets[-1][0] - self.n_buckets:
+            return None  # événement trop ancien pour la fenêtre
+        for existing_id, counts in reversed(self.buckets):
+            if existing_id == bucket_id:
+                return counts
+            if existing_id < bucket_id:
+                break
+        # Événement en retard sur un seau absent : insertion à sa place
+        position = sum(1 for existing_id, _ in self.buckets if existing_id < bucket_id)
+        self.buckets.insert(position, [bucket_id, {}])
+        return self.buckets[position][1]
+
+    def add(self, track, timestamp, count=1):
+        self.add_counts({track: count}, timestamp)
+
+    def add_counts(self, counts, timestamp):
+        """Ajoute un lot de lectures tombant dans le même seau"""
+        bucket = self._bucket(int(timestamp // self.bucket_seconds))
+        if bucket is None:
+            return
+        totals = self.totals
+        for track, count in counts.items():
+            bucket[track] = bucket.get(track, 0) + count
+            new_count = totals.get(track, 0) + count
+            totals[track] = new_count
+            self._touch_top(track, new_count)
+        self.total += sum(counts.values())
+        if len(totals) > self.capacity:
+            self._prune()
+
+    def advance(self, timestamp):
+        """Fait glisser la fenêtre jusqu'à timestamp sans ajouter de lecture"""
+        bucket_id = int(timestamp // self.bucket_seconds)
+        if not self.buckets or bucket_id > self.buckets[-1][0]:
+            self._expire(bucket_id)
+
+    def _touch_top(self, track, count):
+        """Mise à jour O(k) du top après un incrément"""
+        top = self._top
+        if track in self._top_members:
+            i = next(i for i, entry in enumerate(top) if entry[1] == track)
+            top[i][0] = count
+        elif len(top) < self.top_size or count > top[-1][0]:
+            top.append([count, track])
+            self._top_members.add(track)
+            i = len(top) - 1
+        else:
+            return
+        while i > 0 and top[i - 1][0] < top[i][0]:
+            top[i - 1], top[i] = top[i], top[i - 1]
+            i -= 1
+        if len(top) > self.top_size:
+            self._top_members.discard(top.pop()[1])
+
+    def _rebuild_top(self):
+        """Reconstruit le top après une décrémentation (expiration, élagage)"""
+        best = heapq.nlargest(self.top_size, self.totals.items(), key=itemgetter(1))
+        self._top = [[count, track] for track, count in best]
+        self._top_members = {track for track, _ in best}
+
+    def _prune(self):
+        """Élagage façon lossy counting : on garde la moitié la plus écoutée"""
+        keep = heapq.nlargest(self.capacity // 2, self.totals.items(), key=itemgetter(1))
+        kept = dict(keep)
+        dropped = max((count for track, count in self.totals.items() if track not in kept), default=0)
+        self.max_error = max(self.max_error, dropped)
+        for _, counts in self.buckets:
+            for track in [track for track in counts if track not in kept]:
+                del counts[track]
+        self.total = sum(kept.values())
+        self.totals = kept
+        self._rebuild_top()
+
+    def top(self, k):
+        """Les k titres les plus joués, en O(k)"""
+        return [(track, count) for count, track in self._top[:k]]
+
+    def count(self, track):
+        return self.totals.get(track, 0)
+
+    def share(self, track):
+        return self.totals.get(track, 0) / self.total if self.total else 0.0
+
+    def memory_entries(self):
+        return len(self.totals) + sum(len(counts) for _, counts in self.buckets)
+
+
+class TopTracksEngine:
+    """Classement des titres sur les fenêtres heure/jour/semaine à partir du journal de diffusion"""
+
+    def __init__(self, capacity=10000, top_size=50, labels=None):
+        # labels : identifiant de titre -> (artiste, titre)
+        self.labels = labels or {}
+        self.windows = {
+            name: WindowCounter(bucket_seconds, n_buckets, capacity, top_size)
+            for name, (bucket_seconds, n_buckets) in WINDOWS.items()
+        }
+        self.plays = 0
+        self._lock = threading.Lock()
+
+    def play(self, track, timestamp=None):
+        """Intègre une diffusion (track : identifiant de titre)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for window in self.windows.values():
+                window.add(track, timestamp)
+            self.plays += 1
+
+    def ingest(self, tracks, timestamps):
+        """Intègre un lot de diffusions (tableaux parallèles), regroupé par minute"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        tracks = np.asarray(tracks)
+        if len(timestamps) == 0:
+            return
+        # Un seul comptage vectorisé des couples (minute, titre), puis un lot par minute
+        minutes = (timestamps // 60).astype(np.int64)
+        values, codes = np.unique(tracks, return_inverse=True)
+        first_minute = minutes.min()
+        keys, counts = np.unique((minutes - first_minute) * len(values) + codes, return_counts=True)
+        key_minutes, key_codes = np.divmod(keys, len(values))
+        boundaries = (np.flatnonzero(np.diff(key_minutes)) + 1).tolist()
+        labels = values[key_codes].tolist()
+        counts = counts.tolist()
+        starts = [0] + boundaries
+        ends = boundaries + [len(keys)]
+
+        with self._lock:
+            for start, end in zip(starts, ends):
+                batch = dict(zip(labels[start:end], counts[start:end]))
+                minute_start = (int(key_minutes[start]) + first_minute) * 60
+                for window in self.windows.values():
+                    window.add_counts(batch, minute_start)
+            self.plays += len(timestamps)
+
+    def advance(self, timestamp=None):
+        with self._lock:
+            for window in self.windows.values():
+                window.advance(time.time() if timestamp is None else timestamp)
+
+    def trend(self, track, short='day', long='week'):
+        """'up' / 'down' / 'stable' selon la part d'écoute récente vs la fenêtre longue"""
+        short_share = self.windows[short].share(track)
+        long_share = self.windows[long].share(track)
+        if long_share == 0:
+            return 'up' if short_share > 0 else 'stable'
+        ratio = short_share / long_share
+        if ratio > TREND_RATIO:
+            return 'up'
+        if ratio < 1 / TREND_RATIO:
+            return 'down'
+        return 'stable'
+
+    def top(self, k=5, window='day'):
+        """Top-k au format de SkyrockLiveDashboard.top_tracks"""
+        with self._lock:
+            result = []
+            for track, plays in self.windows[window].top(k):
+                artist, title = self.labels.get(track, (str(track), ''))
+                result.append({'artist': artist, 'title': title, 'plays': plays, 'trend': self.trend(track)})
+            return result
+
+    def memory_entries(self):
+        return {name: window.memory_entries() for name, window in self.windows.items()}
+
+
+class PlayoutSimulator:
+    """Journal de diffusion simulé (rotation pondérée du catalogue)"""
+
+    def __init__(self, engine, plays_per_hour=14, seed=None):
+        self.engine = engine
+        self.plays_per_hour = plays_per_hour
+        self.rng = np.random.default_rng(seed)
+        engine.labels.update({i: (artist, title) for i, (artist, title, _) in enumerate(CATALOG)})
+        weights = np.array([weight for _, _, weight in CATALOG], dtype=np.float64)
+        self.weights = weights / weights.sum()
+        self.last_time = None
+        self._lock = threading.Lock()
+
+    def draw(self, start, end):
+        """Tire les diffusions entre start et end (secondes epoch) : (titres, timestamps)"""
+        n = self.rng.poisson(self.plays_per_hour * (end - start) / 3600)
+        timestamps = np.sort(self.rng.uniform(start, end, n))
+        # Dérive lente des rotations : certains titres montent, d'autres descendent
+        drift = 1 + 0.5 * np.sin(np.outer(timestamps / 86400, np.arange(1, len(CATALOG) + 1)))
+        probabilities = self.weights * drift
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        tracks = (probabilities.cumsum(axis=1) > self.rng.random((n, 1))).argmax(axis=1)
+        return tracks, timestamps
+
+    def generate(self, start, end):
+        """Diffusions entre start et end intégrées au moteur, poids de rotation qui dérivent"""
+        tracks, timestamps = self.draw(start, end)
+        if len(tracks):
+            self.engine.ingest(tracks, timestamps)
+
+    def backfill(self, now=None, days=7):
+        now = time.time() if now is None else now
+        self.run_until(now, start=now - days * 86400)
+
+    def run_until(self, now=None, start=None):
+        """Génère les diffusions écoulées depuis le dernier appel"""
+        now = time.time() if now is None else now
+        with self._lock:
+            start = self.last_time if start is None else start
+            if start is not None and now > start:
+                self.generate(start, now)
+            self.engine.advance(now)
+            self.last_time = now
+
+
+def benchmark(n_plays=5_000_000, n_tracks=200_000, capacity=20000, batch=500_000):
+    """Débit d'ingestion et exactitude du top-10 sur un journal synthétique (loi de Zipf)"""
+    rng = np.random.default_rng(7)
+    start = time.time() - 7 * 86400
+    timestamps = np.sort(rng.uniform(start, start + 7 * 86400, n_plays))
+    tracks = np.minimum(rng.zipf(1.2, n_plays), n_tracks) - 1
+
+    engine = TopTracksEngine(capacity=capacity)
+    t = time.perf_counter()
+    for i in range(0, n_plays, batch):
+        engine.ingest(tracks[i:i + batch], timestamps[i:i + batch])
+    elapsed = time.perf_counter() - t
+    print(f"Ingestion : {n_plays:,} diffusions en {elapsed:.2f}s ({n_plays / elapsed:,.0f}/s)")
+
+    t = time.perf_counter()
+    for _ in range(10000):
+        engine.windows['day'].top(5)
+    print(f"Requête top-5 : {(time.perf_counter() - t) / 10000 * 1e6:.2f} µs")
+    print(f"Entrées en mémoire (cap {capacity:,} par fenêtre et par seau) : {engine.memory_entries()}")
+
+    # Top-10 exact de la dernière semaine pour comparaison
+    week = timestamps >= timestamps[-1] - 7 * 86400
+    exact = np.bincount(tracks[week]).argsort()[::-1][:10].tolist()
+    approx = [track for track, _ in engine.windows['week'].top(10)]
+    print(f"Top-10 semaine : {len(set(exact) & set(approx))}/10 titres communs avec le calcul exact, "
+          f"erreur max d'élagage {engine.windows['week'].max_error}")
+
+
+if __name__ == "__main__":
+    benchmark()
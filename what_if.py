@@ -0,0 +1,326 @@
+# what_if.py
+import time
+
+import numpy as np
+import pandas as pd
+
+from stations import BASE_AUDIENCE, RADIOS
+
+# Tendance annuelle de chaque radio (fraction de l'audience de base par an)
+TRENDS = {
+    'Skyrock': -0.02,  # Légère baisse
+    'NRJ': 0.01,       # Stabilité
+    'Fun Radio': -0.01, # Légère baisse
+    'RTL': 0.005,      # Très légère hausse
+    'Europe 1': -0.015,# Légère baisse
+    'France Inter': 0.02, # Hausse
+    'RMC': 0.01,       # Légère hausse
+    'Virgin Radio': 0.005 # Stabilité
+}
+
+# Amplitude de la saisonnalité (variation mensuelle), bruit et plancher d'audience (millions)
+SEASONALITY = 0.1
+NOISE_SD = 0.05
+NOISE_SEED = 42
+MIN_AUDIENCE = 0.1
+
+
+class Shock:
+    """Choc d'audience : effet relatif interpolé linéairement du premier au dernier mois (inclus)"""
+
+    def __init__(self, label, start, end, impact_start, impact_end=None, radios=None):
+        self.label = label
+        self.start = pd.Period(start, 'M')
+        self.end = pd.Period(end, 'M')
+        self.impact_start = impact_start
+        self.impact_end = impact_start if impact_end is None else impact_end
+        # None : toutes les radios
+        self.radios = None if radios is None else frozenset(radios)
+
+    def applies_to(self, radio):
+        return self.radios is None or radio in self.radios
+
+    def effect(self, months):
+        """Effet sur chaque mois (ordinaux de périodes mensuelles)"""
+        start, end = self.start.ordinal, self.end.ordinal
+        inside = (months >= start) & (months <= end)
+        position = (months - start) / max(end - start, 1)
+        return np.where(inside, self.impact_start + position * (self.impact_end - self.impact_start), 0.0)
+
+
+# Effet COVID (baisse en 2020, reprise progressive) : -0.3 + mois/12 × 0.2 en 2020, -0.1 + mois/12 × 0.1 en 2021
+COVID_SHOCKS = [
+    Shock('COVID 2020', '2020-01', '2020-12', -0.3 + 0.2 / 12, -0.1),
+    Shock('COVID 2021', '2021-01', '2021-12', -0.1 + 0.1 / 12, 0.0),
+]
+
+
+class IncrementalGraph:
+    """Graphe de calcul à dépendances suivies : une entrée modifiée ne recalcule que les nœuds en aval"""
+
+    def __init__(self):
+        self.values = {}
+        self.versions = {}
+        self._compute = {}
+        self._update = {}
+        self._deps = {}
+        self._dependents = {}
+        self._seen = {}
+        self._dirty = set()
+        # Nœuds recalculés depuis le dernier appel à take_recomputed()
+        self._recomputed = []
+
+    def input(self, key, value):
+        self.values[key] = value
+        self.versions[key] = 0
+        self._dependents.setdefault(key, [])
+
+    def node(self, key, compute, deps, update=None):
+        """Nœud calculé ; update(précédent, indices des dépendances changées, valeurs) évite le recalcul complet"""
+        self._compute[key] = compute
+        self._deps[key] = list(deps)
+        if update is not None:
+            self._update[key] = update
+        self.versions[key] = 0
+        self._dependents.setdefault(key, [])
+        for dep in self._deps[key]:
+            self._dependents[dep].append(key)
+        self._dirty.add(key)
+
+    def set(self, key, value):
+        """Modifie une entrée et invalide ses descendants (sans recalcul immédiat)"""
+        if self.values.get(key) == value:
+            return False
+        self.values[key] = value
+        self.versions[key] += 1
+        stack = list(self._dependents[key])
+        while stack:
+            node = stack.pop()
+            # Un nœud déjà invalide a déjà invalidé ses descendants
+            if node not in self._dirty:
+                self._dirty.add(node)
+                stack.extend(self._dependents[node])
+        return True
+
+    def get(self, key):
+        if key in self._dirty:
+            self._evaluate(key)
+        return self.values[key]
+
+    def _evaluate(self, key):
+        deps = self._deps[key]
+        args = [self.get(dep) for dep in deps]
+        seen = self._seen.get(key)
+        update = self._update.get(key)
+        if update is not None and seen is not None:
+            changed = [i for i, dep in enumerate(deps) if seen[i] != self.versions[dep]]
+            self.values[key] = update(self.values[key], changed, args)
+        else:
+            self.values[key] = self._compute[key](*args)
+        self._seen[key] = [self.versions[dep] for dep in deps]
+        self.versions[key] += 1
+        self._dirty.discard(key)
+        self._recomputed.append(key)
+
+    def take_recomputed(self):
+        recomputed, self._recomputed = self._recomputed, []
+        return recomputed
+
+
+class WhatIfEngine:
+    """Panel d'audience (stations × mois) paramétré par radio, recalculé partiellement à chaque réglage"""
+
+    def __init__(self, dates, stations, base, trends, seasonality=SEASONALITY, shocks=COVID_SHOCKS, noise=None):
+        self.dates = pd.DatetimeIndex(dates)
+        self.stations = list(stations)
+        self.index = {station: i for i, station in enumerate(self.stations)}
+        self.base = np.asarray(base, dtype=np.float64)
+        year, month = self.dates.year.to_numpy(), self.dates.month.to_numpy()
+        self.years = np.unique(year)
+        self._months = self.dates.to_period('M').asi8
+        self._years_from_start = (year - year[0]) + (month - 1) / 12
+        self._season = np.sin(2 * np.pi * month / 12)
+        # Début de chaque année dans la série (moyennes annuelles par reduceat)
+        self._year_starts = np.searchsorted(year, self.years)
+        self._year_lengths = np.diff(np.append(self._year_starts, len(self.dates)))
+        # Bruit (mois × stations) ; copie transposée pour lire chaque colonne en mémoire contiguë
+        self.noise = np.zeros((len(self.dates), len(self.stations))) if noise is None else noise
+        self._noise_rows = np.ascontiguousarray(self.noise.T)
+
+        self.defaults = {'trends': list(trends), 'seasonality': seasonality, 'shocks': list(shocks)}
+        self.shocks = list(shocks)
+        # Effet cumulé par combinaison de chocs (partagé par les radios touchées par les mêmes chocs)
+        self._effects = {}
+        self.graph = IncrementalGraph()
+        self._build(trends, seasonality)
+        self.last_duration_ms = 0.0
+        self.last_recomputed = []
+
+    @classmethod
+    def for_dataset(cls, dates, radios=RADIOS):
+        """Paramètres de référence du jeu de données du tableau de bord (bruit tiré comme dans load_data)"""
+        noise = np.random.RandomState(NOISE_SEED).normal(0, NOISE_SD, (len(dates), len(radios)))
+        return cls(dates, radios, [BASE_AUDIENCE[radio] for radio in radios],
+                   [TRENDS[radio] for radio in radios], noise=noise)
+
+    @classmethod
+    def synthetic(cls, n_stations=500, years=20, seed=0, start='2005-01-01'):
+        """Panel de n_stations (radios suivies + stations locales) sur `years` années à partir de start"""
+        rng = np.random.default_rng(seed)
+        dates = pd.date_range(start, periods=years * 12, freq='ME')
+        extra = n_stations - len(RADIOS)
+        stations = list(RADIOS) + [f"Station locale {i + 1}" for i in range(extra)]
+        base = [BASE_AUDIENCE[radio] for radio in RADIOS] + list(rng.lognormal(-1.5, 0.6, extra))
+        trends = [TRENDS[radio] for radio in RADIOS] + list(rng.normal(0, 0.015, extra))
+        noise = rng.normal(0, NOISE_SD, (len(dates), n_stations))
+        return cls(dates, stations, base, trends, noise=noise)
+
+    def _build(self, trends, seasonality):
+        graph = self.graph
+        columns = []
+        for i, station in enumerate(self.stations):
+            graph.input(('growth', i), float(trends[i]))
+            graph.input(('seasonality', i), float(seasonality))
+            graph.input(('shocks', i), tuple(shock for shock in self.shocks if shock.applies_to(station)))
+            graph.node(('column', i), self._column_function(i), [('growth', i), ('seasonality', i), ('shocks', i)])
+            columns.append(('column', i))
+
+        def write_rows(panel, changed, rows):
+            # Seules les lignes des radios modifiées sont recopiées
+            for i in changed:
+                panel[i] = rows[i]
+            return panel
+
+        graph.node('panel', lambda *rows: np.vstack(rows), columns, update=write_rows)
+        graph.node('total', lambda panel: panel.sum(axis=0), ['panel'])
+        graph.node('shares', lambda panel, total: panel / total * 100, ['panel', 'total'])
+        graph.node('yearly_audience', self._yearly, ['panel'])
+        graph.node('yearly_shares', self._yearly, ['shares'])
+
+    def _column_function(self, i):
+        base, noise = self.base[i], self._noise_rows[i]
+        years, season = self._years_from_start, self._season
+
+        def column(growth, seasonality, shocks):
+            effect = self._shock_effect(shocks)
+            audience = base * (1 + growth * years + seasonality * season + effect) + noise
+            return np.maximum(audience, MIN_AUDIENCE)
+        return column
+
+    def _shock_effect(self, shocks):
+        if shocks not in self._effects:
+            self._effects[shocks] = sum((shock.effect(self._months) for shock in shocks), np.zeros(len(self._months)))
+        return self._effects[shocks]
+
+    def _yearly(self, matrix):
+        """Moyennes annuelles (stations × années)"""
+        return np.add.reduceat(matrix, self._year_starts, axis=1) / self._year_lengths
+
+    # Réglages de l'analyste
+
+    def set_growth(self, station, growth):
+        return self.graph.set(('growth', self.index[station]), float(growth))
+
+    def set_seasonality(self, station, amplitude):
+        return self.graph.set(('seasonality', self.index[station]), float(amplitude))
+
+    def growth(self, station):
+        return self.graph.values[('growth', self.index[station])]
+
+    def seasonality(self, station):
+        return self.graph.values[('seasonality', self.index[station])]
+
+    def set_shocks(self, shocks):
+        """Remplace la liste des chocs ; seules les radios dont les chocs changent sont invalidées"""
+        self.shocks = list(shocks)
+        self._effects = {}
+        for i, station in enumerate(self.stations):
+            self.graph.set(('shocks', i), tuple(shock for shock in self.shocks if shock.applies_to(station)))
+
+    def add_shock(self, shock):
+        self.set_shocks(self.shocks + [shock])
+
+    def remove_shock(self, label):
+        self.set_shocks([shock for shock in self.shocks if shock.label != label])
+
+    def reset(self):
+        """Retour aux paramètres de référence"""
+        for i in range(len(self.stations)):
+            self.graph.set(('growth', i), float(self.defaults['trends'][i]))
+            self.graph.set(('seasonality', i), float(self.defaults['seasonality']))
+        self.set_shocks(self.defaults['shocks'])
+
+    # Résultats
+
+    def evaluate(self, *keys):
+        """Valeurs des nœuds demandés ; mémorise la durée et les nœuds recalculés"""
+        start = time.perf_counter()
+        values = [self.graph.get(key) for key in keys]
+        self.last_duration_ms = (time.perf_counter() - start) * 1000
+        self.last_recomputed = self.graph.take_recomputed()
+        return values
+
+    def panel(self):
+        """Audience (stations × mois)"""
+        return self.evaluate('panel')[0]
+
+    def yearly(self):
+        """Audience et part de marché moyennes par année : deux DataFrames (années × stations)"""
+        audience, shares = self.evaluate('yearly_audience', 'yearly_shares')
+        columns = pd.Index(self.stations, name='radio')
+        return (pd.DataFrame(audience.T, index=pd.Index(self.years, name='annee'), columns=columns),
+                pd.DataFrame(shares.T, index=pd.Index(self.years, name='annee'), columns=columns))
+
+
+def _regenerate(engine):
+    """Chemin complet : moteur neuf, format long et agrégats pandas (ce que coûtait une régénération)"""
+    fresh = WhatIfEngine(engine.dates, engine.stations, engine.base, engine.defaults['trends'], noise=engine.noise)
+    panel = fresh.panel()
+    df = pd.DataFrame({
+        'date': np.repeat(engine.dates, len(engine.stations)),
+        'radio': np.tile(np.array(engine.stations, dtype=object), len(engine.dates)),
+        'audience_millions': panel.T.ravel()
+    })
+    df['annee'] = df['date'].dt.year
+    df['part_marche_pourcent'] = df['audience_millions'] / df.groupby('date')['audience_millions'].transform('sum') * 100
+    df.groupby(['annee', 'radio'])[['audience_millions', 'part_marche_pourcent']].mean()
+
+
+def benchmark(n_stations=500, years=20, rounds=50):
+    """Durée d'un réglage (recalcul partiel) contre une régénération complète du panel"""
+    t = time.perf_counter()
+    engine = WhatIfEngine.synthetic(n_stations, years)
+    engine.yearly()
+    print(f"Construction {n_stations} stations × {years} ans : {(time.perf_counter() - t) * 1000:.0f} ms "
+          f"({len(engine.last_recomputed)} nœuds)")
+
+    t = time.perf_counter()
+    _regenerate(engine)
+    print(f"Régénération complète (panel + agrégats pandas) : {(time.perf_counter() - t) * 1000:.0f} ms")
+
+    rng = np.random.default_rng(1)
+    cases = [
+        ("croissance d'une radio", lambda k: engine.set_growth('Skyrock', -0.02 + k * 1e-4)),
+        ("saisonnalité d'une radio", lambda k: engine.set_seasonality(engine.stations[rng.integers(n_stations)],
+                                                                      0.05 + k * 1e-3)),
+        ("choc sur une radio", lambda k: engine.set_shocks(COVID_SHOCKS + [
+            Shock('Grève', '2015-03', '2015-06', -0.2 - k * 1e-3, radios=['NRJ'])])),
+        ("choc sur toutes les radios", lambda k: engine.set_shocks(COVID_SHOCKS + [
+            Shock('Crise', '2018-01', '2018-12', -0.1 - k * 1e-3)])),
+    ]
+    for label, move in cases:
+        durations = []
+        for k in range(rounds):
+            move(k)
+            t = time.perf_counter()
+            engine.yearly()
+            durations.append((time.perf_counter() - t) * 1000)
+        durations = np.array(durations)
+        print(f"Réglage ({label:<26}) : p50 {np.percentile(durations, 50):6.2f} ms, "
+              f"max {durations.max():6.2f} ms — {len(engine.last_recomputed)} nœuds recalculés")
+        engine.reset()
+        engine.yearly()
+
+
+if __name__ == "__main__":
+    benchmark()